@@ -10,6 +10,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.reactions_BMD_SFD import SFDvals, BMDvals
 from src.cross_section_geometry.designs import design0, simple_square
+from src.core.station_grid import StationGrid
 
 def plot_bmd_sfd(x, loadcase, mass, design_name="design"):
     """
@@ -25,10 +26,8 @@ def plot_bmd_sfd(x, loadcase, mass, design_name="design"):
     sfd = SFDvals(x, loadcase, mass)
     bmd = BMDvals(x, loadcase, mass)
 
-    # create position array (10,000 points from 0 to 1250)
-    num_points = 10000
-    bridge_length = 1250
-    positions = [i * bridge_length / (num_points - 1) for i in range(num_points)]
+    # create position array (same 10,000 points from 0 to 1250 the values were found at)
+    positions = StationGrid.uniform(10000).x
 
     # create plots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
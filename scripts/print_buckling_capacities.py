@@ -10,7 +10,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.core.buckling_analysis import get_buckling_capacities, get_unsupported_width, get_flange_overhang_widths, get_stacked_thickness_vertical
 from src.core.geometric_properties import y_bar
 from src.materials.material_properties import get_matboard_properties
-from src.cross_section_geometry.designs import design0, simple_square
+from src.cross_section_geometry.designs import design0, simple_square, is_prismatic, get_segment_ranges, get_diaphragm_spacing_at_x
 
 def print_buckling_capacities(geometry, design_name="design"):
     """
@@ -18,8 +18,17 @@ def print_buckling_capacities(geometry, design_name="design"):
 
     Input =
         geometry: dict from design function with 'plates' and 'glue_joints'
+            (segmented designs print each segment)
         design_name: name for display
     """
+    if not is_prismatic(geometry):
+        for x_start, x_end, segment in get_segment_ranges(geometry):
+            # segments without their own spacing use the design's
+            segment = {**segment, 'diaphragm_spacing': get_diaphragm_spacing_at_x(geometry, x_start)}
+            print_buckling_capacities(segment, design_name=f"{design_name} (x = {x_start} to {x_end} mm)")
+            print()
+        return
+
     plates = geometry['plates']
     material = get_matboard_properties()
 
@@ -8,7 +8,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.geometric_properties import y_bar, I, Q
-from src.cross_section_geometry.designs import design0, simple_square
+from src.cross_section_geometry.designs import design0, simple_square, is_prismatic, get_segment_ranges
 
 def print_section_properties(geometry, design_name="design"):
     """
@@ -16,8 +16,15 @@ def print_section_properties(geometry, design_name="design"):
 
     Input =
         geometry: dict from design function with 'plates' and 'glue_joints'
+            (segmented designs print each segment)
         design_name: name for display
     """
+    if not is_prismatic(geometry):
+        for x_start, x_end, segment in get_segment_ranges(geometry):
+            print_section_properties(segment, design_name=f"{design_name} (x = {x_start} to {x_end} mm)")
+            print()
+        return
+
     plates = geometry['plates']
 
     # calculate geometric properties
@@ -11,9 +11,10 @@ from src.core.reactions_BMD_SFD import SFDvals, BMDvals
 from src.core.stress_envelope import get_section_properties
 from src.core.stresses import sigma_top, sigma_bot, tau_cent, tau_glue
 from src.core.geometric_properties import Q, glue_width
-from src.cross_section_geometry.designs import design0
+from src.core.station_grid import as_grid
+from src.cross_section_geometry.designs import design0, is_prismatic, get_segment_ranges
 
-def print_stresses(geometry, x_train, loadcase, mass, design_name="design"):
+def print_stresses(geometry, x_train, loadcase, mass, design_name="design", grid=None):
     """
     calculate and print stresses for a train position using max M and V from that position's BMD/SFD
 
@@ -23,7 +24,21 @@ def print_stresses(geometry, x_train, loadcase, mass, design_name="design"):
         loadcase: 1, 2, or 3
         mass: total mass of train
         design_name: name for display
+        grid: stations to take max M and V over (default the usual 10,000 across the bridge)
+
+    segmented designs print each segment, using the max M and V over that segment's stations only
     """
+    if not is_prismatic(geometry):
+        stations = as_grid(grid).x
+        ranges = get_segment_ranges(geometry)
+        for i, (x_start, x_end, segment) in enumerate(ranges):
+            # the last segment includes the far end of the bridge
+            inside = (stations >= x_start) & ((stations < x_end) | (i == len(ranges) - 1))
+            print_stresses(segment, x_train, loadcase, mass, design_name=f"{design_name} (x = {x_start} to {x_end} mm)",
+                           grid=stations[inside])
+            print()
+        return
+
     plates = geometry['plates']
     glue_joints = geometry['glue_joints']
 
@@ -31,8 +46,8 @@ def print_stresses(geometry, x_train, loadcase, mass, design_name="design"):
     props = get_section_properties(plates, glue_joints)
 
     # get full BMD and SFD for this train position
-    sfd = SFDvals(x_train, loadcase, mass)
-    bmd = BMDvals(x_train, loadcase, mass)
+    sfd = SFDvals(x_train, loadcase, mass, grid=grid)
+    bmd = BMDvals(x_train, loadcase, mass, grid=grid)
 
     # find max values from the diagrams
     M_max = max(bmd)
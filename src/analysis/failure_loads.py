@@ -1,14 +1,24 @@
 """
 calculate failure loads and capacities along the bridge
+
+every stress is proportional to the train mass, so FOS * mass is the same for any mass.
+solve_failure_load uses that: one analysis at mass = 1 gives the failure load directly
+(no trial masses needed)
 """
 
-from src.core.BME_SFE import SFEvals, BMEvals
-from src.analysis.fos import find_FOS
+from src.core.envelope_cache import get_envelopes
+from src.core.station_grid import as_grid
+from src.analysis.fos import find_FOS_arrays
+from src.analysis.failure_results import FailureResults
+from src.core.section_cache import get_section_data
 from src.core.buckling_capacities import euler_buckling_load
 from src.core.stress_envelope import get_section_properties
-from src.cross_section_geometry.designs import get_geometry_at_x
+from src.cross_section_geometry.designs import get_geometry_at_x, get_segment_ranges, get_diaphragm_spacing_at_x
+from src.materials.material_properties import get_matboard_properties, get_glue_properties
+import numpy as np
+
 
-def calculate_failure_loads(geometry, loadcase, mass, material_props, num_points=10000, bridge_length=1250):
+def calculate_failure_loads(geometry, loadcase, mass, material_props, num_points=10000, bridge_length=1250, grid=None):
     """
     calculate Vfail and Mfail along the bridge, plus FOS for each failure mode
 
@@ -19,8 +29,10 @@ def calculate_failure_loads(geometry, loadcase, mass, material_props, num_points
         material_props: matboard and glue properties
         num_points: number of points along bridge (default 10000)
         bridge_length: length of bridge for euler buckling (mm), default 1250
+        grid: StationGrid (or array of stations) to check, overrides num_points
 
-    Output = dict with FOS arrays, failure capacities, min_fos, failure_load
+    Output = FailureResults with FOS arrays, failure capacities, min_fos, failure_load
+        (dict style access still works, e.g. results['fos_tens'], results['failure_load'])
     """
 
     # calculate euler buckling load (global, not position-dependent)
@@ -34,101 +46,91 @@ def calculate_failure_loads(geometry, loadcase, mass, material_props, num_points
     total_load = mass
     fos_euler = P_euler / total_load if total_load > 0 else float('inf')
 
-    # calculate shear force and bending moment envelopes
-    sfe_min, sfe_max = SFEvals(loadcase, mass)
-    bme_min, bme_max = BMEvals(loadcase, mass)
-
-    # take maximum absolute values for shear envelope
-    V_env = [max(abs(sfe_min[i]), abs(sfe_max[i])) for i in range(num_points)]
-    M_max = bme_max
-    M_min = bme_min
-
-    x_positions = [i * bridge_length / (num_points - 1) for i in range(num_points)]
-    
-    fos_tens_array = []
-    fos_comp_array = []
-    fos_shear_array = []
-    fos_glue_array = []
-    fos_buck1_array = []
-    fos_buck2_array = []
-    fos_buck3_array = []
-    fos_buckV_array = []
-    min_fos_array = []
-
-    # calculate FOS at each position
-    for i, x in enumerate(x_positions):
-        fos_results = find_FOS(x, geometry, V_env[i], M_max[i], M_min[i], material_props)
-
-        fos_tens_array.append(fos_results['fos_tens'])
-        fos_comp_array.append(fos_results['fos_comp'])
-        fos_shear_array.append(fos_results['fos_shear'])
-        fos_glue_array.append(fos_results['fos_glue'])
-        fos_buck1_array.append(fos_results['fos_buck1'])
-        fos_buck2_array.append(fos_results['fos_buck2'])
-        fos_buck3_array.append(fos_results['fos_buck3'])
-        fos_buckV_array.append(fos_results['fos_buckV'])
-        min_fos_array.append(fos_results['min_fos'])
-    
-    # calculate Vfail and Mfail for each failure mode
-    Vfail_shear = [fos_shear_array[i] * V_env[i] for i in range(num_points)]
-    Vfail_glue = [fos_glue_array[i] * V_env[i] for i in range(num_points)]
-    Vfail_buckV = [fos_buckV_array[i] * V_env[i] for i in range(num_points)]
-
-    # for moment failures, use the envelope magnitude
-    M_env_mag = [max(abs(M_max[i]), abs(M_min[i])) for i in range(num_points)]
-    Mfail_tens = [fos_tens_array[i] * M_env_mag[i] for i in range(num_points)]
-    Mfail_comp = [fos_comp_array[i] * M_env_mag[i] for i in range(num_points)]
-    Mfail_buck1 = [fos_buck1_array[i] * M_env_mag[i] for i in range(num_points)]
-    Mfail_buck2 = [fos_buck2_array[i] * M_env_mag[i] for i in range(num_points)]
-    Mfail_buck3 = [fos_buck3_array[i] * M_env_mag[i] for i in range(num_points)]
-    
+    # shear force and bending moment envelopes together (cached at unit mass and scaled)
+    grid = as_grid(grid, num_points)
+    envelope = get_envelopes(loadcase, mass, grid=grid)
+
+    # the cross section is constant within each segment (one segment if prismatic), so the
+    # capacities are found once per segment and every FOS is an array expression over its stations
+    x = envelope.x
+    fos = {name: np.empty(len(x)) for name in FailureResults.fos_names}
+    fos['failure_mode'] = np.empty(len(x), dtype='<U32')
+
+    ranges = get_segment_ranges(geometry, bridge_length)
+    starts = np.array([x_start for x_start, _, _ in ranges], dtype=float)
+    segment_of_station = np.maximum(np.searchsorted(starts, x, side='right') - 1, 0)
+
+    for k, (x_start, _, segment) in enumerate(ranges):
+        on = segment_of_station == k
+        if not on.any():
+            continue
+        diaphragm_spacing = get_diaphragm_spacing_at_x(geometry, x_start)
+        section_data = get_section_data(segment['plates'], segment['glue_joints'], diaphragm_spacing, material_props)
+        segment_fos = find_FOS_arrays(section_data, segment['glue_joints'], envelope.V_env[on],
+                                      envelope.bme_max[on], envelope.bme_min[on], material_props)
+        for name in fos:
+            fos[name][on] = segment_fos[name]
+
     # find overall minimum FOS (include euler buckling)
-    overall_min_fos = min(min(min_fos_array), fos_euler)
+    overall_min_fos = min(float(fos['min_fos'].min()), fos_euler)
     failure_load = overall_min_fos * mass
 
-    return {
-        'x': x_positions,
-        'V_env': V_env,
-        'M_max': M_max,
-        'M_min': M_min,
-        'M_env': [max(abs(M_max[i]), abs(M_min[i])) for i in range(num_points)],  # for backward compatibility
-        'fos_tens': fos_tens_array,
-        'fos_comp': fos_comp_array,
-        'fos_shear': fos_shear_array,
-        'fos_glue': fos_glue_array,
-        'fos_buck1': fos_buck1_array,
-        'fos_buck2': fos_buck2_array,
-        'fos_buck3': fos_buck3_array,
-        'fos_buckV': fos_buckV_array,
-        'fos_euler': fos_euler,
-        'P_euler': P_euler,
-        'min_fos': min_fos_array,
-        'Vfail_shear': Vfail_shear,
-        'Vfail_glue': Vfail_glue,
-        'Vfail_buckV': Vfail_buckV,
-        'Mfail_tens': Mfail_tens,
-        'Mfail_comp': Mfail_comp,
-        'Mfail_buck1': Mfail_buck1,
-        'Mfail_buck2': Mfail_buck2,
-        'Mfail_buck3': Mfail_buck3,
-        'overall_min_fos': overall_min_fos,
-        'failure_load': failure_load
-    }
+    # Vfail / Mfail and M_env are worked out from these when they're first used
+    return FailureResults(envelope.x, envelope.V_env, envelope.bme_max, envelope.bme_min, fos,
+                          fos_euler, P_euler, overall_min_fos, failure_load, failure_mode=fos['failure_mode'])
 
 def find_critical_location(failure_results):
     """
     find the location with minimum FOS
 
-    Input = failure_results dict from calculate_failure_loads()
+    Input = failure_results from calculate_failure_loads() (FailureResults or the old dict of lists)
     Output = dict with x position (mm), min_fos value, and array index
     """
-    min_fos_array = failure_results['min_fos']
-    min_fos_value = min(min_fos_array)
-    min_index = min_fos_array.index(min_fos_value)
-    x_critical = failure_results['x'][min_index]
-    
+    min_fos_array = np.asarray(failure_results['min_fos'])
+    min_index = int(np.argmin(min_fos_array))
+    x_critical = float(failure_results['x'][min_index])
+
     return {
         'x': x_critical,
-        'min_fos': min_fos_value,
+        'min_fos': float(min_fos_array[min_index]),
         'index': min_index
     }
+
+def solve_failure_load(geometry, loadcase=None, material_props=None, num_points=10000, bridge_length=1250, grid=None):
+    """
+    failure load of the bridge from a single unit mass analysis (no mass needed)
+
+    Input =
+        geometry: bridge geometry dict
+        loadcase: 1, 2, 3 (or a TrainDefinition), None for all three load cases
+        material_props: matboard and glue properties (default from material_properties)
+        num_points: number of points along bridge (default 10000)
+        bridge_length: length of bridge for euler buckling (mm), default 1250
+        grid: StationGrid (or array of stations) to check, overrides num_points
+
+    Output =
+        dict with failure_load (N), failure_mode, x (critical station, mm) and index
+        (failure_mode is 'euler' if global buckling governs, x is still the worst station for the other modes)
+        if loadcase is None: dict of those for loadcases 1, 2 and 3
+    """
+    if material_props is None:
+        material_props = {**get_matboard_properties(), **get_glue_properties()}
+
+    if loadcase is None:
+        return {lc: solve_failure_load(geometry, lc, material_props, num_points, bridge_length, grid) for lc in (1, 2, 3)}
+
+    # at mass = 1 every FOS is the mass that would make that mode fail
+    results = calculate_failure_loads(geometry, loadcase, 1.0, material_props, num_points=num_points,
+                                      bridge_length=bridge_length, grid=grid)
+    critical = find_critical_location(results)
+
+    failure_mode = str(results.failure_mode[critical['index']])
+    if results.fos_euler < critical['min_fos']:
+        failure_mode = 'euler'
+
+    return {
+        'failure_load': results.overall_min_fos,
+        'failure_mode': failure_mode,
+        'x': critical['x'],
+        'index': critical['index']
+    }
@@ -0,0 +1,105 @@
+"""
+results of calculate_failure_loads kept as numpy arrays
+
+only x, the envelopes and the FOS arrays are stored, everything else (M_env, Vfail_*, Mfail_*)
+is worked out the first time it's asked for. works like the old dict of lists too
+(results['fos_tens'], results['failure_load'], 'Vfail_glue' in results, ...)
+"""
+
+import numpy as np
+
+# Vfail / Mfail = fos for the mode * the shear / moment envelope magnitude
+FAILURE_CAPACITIES = {
+    'Vfail_shear': ('fos_shear', 'V_env'),
+    'Vfail_glue': ('fos_glue', 'V_env'),
+    'Vfail_buckV': ('fos_buckV', 'V_env'),
+    'Mfail_tens': ('fos_tens', 'M_env'),
+    'Mfail_comp': ('fos_comp', 'M_env'),
+    'Mfail_buck1': ('fos_buck1', 'M_env'),
+    'Mfail_buck2': ('fos_buck2', 'M_env'),
+    'Mfail_buck3': ('fos_buck3', 'M_env')
+}
+
+
+class FailureResults:
+    fos_names = ('fos_tens', 'fos_comp', 'fos_shear', 'fos_glue', 'fos_buck1', 'fos_buck2', 'fos_buck3', 'fos_buckV', 'min_fos')
+    array_names = ('x', 'V_env', 'M_max', 'M_min', 'M_env') + fos_names + tuple(FAILURE_CAPACITIES)
+    scalar_names = ('fos_euler', 'P_euler', 'overall_min_fos', 'failure_load')
+
+    def __init__(self, x, V_env, M_max, M_min, fos, fos_euler, P_euler, overall_min_fos, failure_load, failure_mode=None):
+        """
+        Input =
+            x: station positions (mm)
+            V_env: shear envelope magnitude at each station (N)
+            M_max, M_min: max and min moment at each station (N·mm)
+            fos: dict with an array for each of fos_names
+            fos_euler, P_euler: euler buckling FOS and load (N)
+            overall_min_fos, failure_load: lowest FOS (including euler) and the load that fails the bridge (N)
+            failure_mode: governing failure mode at each station (optional)
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.V_env = np.asarray(V_env, dtype=float)
+        self.M_max = np.asarray(M_max, dtype=float)
+        self.M_min = np.asarray(M_min, dtype=float)
+        for name in self.fos_names:
+            setattr(self, name, np.asarray(fos[name], dtype=float))
+
+        self.fos_euler = fos_euler
+        self.P_euler = P_euler
+        self.overall_min_fos = overall_min_fos
+        self.failure_load = failure_load
+        self.failure_mode = failure_mode
+
+        # lazily derived arrays
+        self._derived = {}
+
+    @property
+    def M_env(self):
+        """moment envelope magnitude at each station (N·mm)"""
+        if 'M_env' not in self._derived:
+            self._derived['M_env'] = np.maximum(np.abs(self.M_max), np.abs(self.M_min))
+        return self._derived['M_env']
+
+    def capacity(self, name):
+        """
+        Vfail_* / Mfail_* array (fos for the mode times the envelope, inf * 0 = nan)
+        """
+        if name not in FAILURE_CAPACITIES:
+            raise KeyError(name)
+        if name not in self._derived:
+            fos_name, env_name = FAILURE_CAPACITIES[name]
+            with np.errstate(invalid='ignore'):
+                self._derived[name] = getattr(self, fos_name) * getattr(self, env_name)
+        return self._derived[name]
+
+    def __getattr__(self, name):
+        # only called for attributes that aren't set, i.e. the Vfail / Mfail arrays
+        if name in FAILURE_CAPACITIES:
+            return self.capacity(name)
+        raise AttributeError(name)
+
+    @property
+    def critical_index(self):
+        """index of the station with the lowest FOS"""
+        return int(np.argmin(self.min_fos))
+
+    # dict style access for code that used the old dict of lists
+    def __getitem__(self, name):
+        if name not in self.array_names and name not in self.scalar_names:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name):
+        return name in self.array_names or name in self.scalar_names
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def keys(self):
+        return list(self.array_names + self.scalar_names)
+
+    def as_dict(self):
+        return {name: self[name] for name in self.keys()}
+
+    def __len__(self):
+        return len(self.x)
@@ -3,14 +3,26 @@ calculate factor of safety for all failure modes at a location along the bridge
 """
 
 from src.core.stresses import tau_cent
-from src.cross_section_geometry.designs import get_geometry_at_x
+from src.cross_section_geometry.designs import get_geometry_at_x, get_diaphragm_spacing_at_x
 from src.core.stress_envelope import (
-    get_section_properties,
     get_stress_envelope,
     get_max_glue_stress,
     get_web_compression_stress
 )
-from src.core.buckling_analysis import get_buckling_capacities
+from src.core.section_cache import get_section_data
+import numpy as np
+
+# failure modes in the order find_FOS reports them (ties go to the first one)
+FAILURE_MODES = [
+    ('tension', 'fos_tens'),
+    ('compression', 'fos_comp'),
+    ('shear', 'fos_shear'),
+    ('glue', 'fos_glue'),
+    ('flexural_buckling_case1', 'fos_buck1'),
+    ('flexural_buckling_case2', 'fos_buck2'),
+    ('flexural_buckling_case3', 'fos_buck3'),
+    ('shear_buckling', 'fos_buckV')
+]
 
 def calculate_fos(applied, capacity):
     """
@@ -40,66 +52,108 @@ def find_FOS(x_position, geometry, V_env, M_max, M_min, material_props):
     # get geometry at this x position
     plates, glue_joints = get_geometry_at_x(geometry, x_position)
 
-    # calculate section properties
-    props = get_section_properties(plates, glue_joints)
+    # section properties and buckling capacities (cached, the same plates come up at most stations)
+    diaphragm_spacing = get_diaphragm_spacing_at_x(geometry, x_position)
+    section_data = get_section_data(plates, glue_joints, diaphragm_spacing, material_props)
 
-    # find stress envelope
-    stresses = get_stress_envelope(M_max, M_min, props['y_top'], props['y_bot'], props['I'])
+    # one station is just a length 1 sweep
+    fos = find_FOS_arrays(section_data, glue_joints, [V_env], [M_max], [M_min], material_props)
+    return {name: (float(value[0]) if name != 'failure_mode' else str(value[0])) for name, value in fos.items()}
 
-    # calculate applied stresses
-    tau_c = tau_cent(V_env, props['Q_cent'], props['I'], props['b_cent'])
-    tau_glue_max = get_max_glue_stress(plates, glue_joints, V_env, props['I'])
+def calculate_fos_array(applied, capacity):
+    """
+    calculate_fos for a whole array of applied stresses (inf where applied is ~0)
+    """
+    applied = np.abs(applied)
+    with np.errstate(divide='ignore'):
+        return np.where(applied < (10 ** -10), np.inf, capacity / applied)
 
-    # get buckling capacities
-    E = material_props['E']
-    nu = material_props['nu']
-    diaphragm_spacing = geometry.get('diaphragm_spacing')
-    buckling = get_buckling_capacities(plates, E, nu, props['ybar'], diaphragm_spacing=diaphragm_spacing)
+def get_applied_stresses(section_data, glue_joints, V_env, M_max, M_min):
+    """
+    every stress the failure modes are checked against, for stations that share one cross section
 
-    # calculate all FOS values
-    fos_tens = calculate_fos(stresses['tension_max'], material_props['sigma_tens'])
-    fos_comp = calculate_fos(stresses['compression_max'], material_props['sigma_comp'])
-    fos_sh = calculate_fos(tau_c, material_props['tau_max'])
-    fos_gl = calculate_fos(tau_glue_max, material_props['tau_glue_max'])
+    Input =
+        section_data: dict from get_section_data (section, props, buckling) for the cross section
+        glue_joints: list of y-coordinates where glue is
+        V_env: array of shear envelope values (N)
+        M_max, M_min: arrays of max and min bending moments (N·mm)
 
-    # buckling FOS
-    # case 1: top flange inside (k=4) vs top compression
-    fos_b1 = calculate_fos(stresses['top_compression'], buckling['top_flange_inside'])
+    Outputs =
+        dict of arrays: tension_max, compression_max, top_compression, shear (at the centroid),
+        glue (worst joint) and web_compression (top of the web, 0 if there are no webs)
+    """
+    V_env = np.asarray(V_env, dtype=float)
+    M_max = np.asarray(M_max, dtype=float)
+    M_min = np.asarray(M_min, dtype=float)
 
-    # case 2: top flange overhang (k=0.425) vs top compression (same stress as case 1)
-    fos_b2 = calculate_fos(stresses['top_compression'], buckling['top_flange_overhang'])
+    props = section_data['props']
+    stresses = get_stress_envelope(M_max, M_min, props['y_top'], props['y_bot'], props['I'])
+    # I ~ 0 is already caught by the stress functions (no stress), just keep numpy quiet about it
+    with np.errstate(divide='ignore', invalid='ignore'):
+        web_compression = get_web_compression_stress(section_data['buckling']['web_plates'], M_max, M_min,
+                                                     props['ybar'], props['I'])
 
-    # case 3: web (k=6) vs compression at top of web
-    sigma_web = get_web_compression_stress(buckling['web_plates'], M_max, M_min, props['ybar'], props['I'])
-    fos_b3 = calculate_fos(sigma_web, buckling['web']) if buckling['web_plates'] else float('inf')
+    return {
+        'tension_max': stresses['tension_max'],
+        'compression_max': stresses['compression_max'],
+        'top_compression': stresses['top_compression'],
+        'shear': tau_cent(V_env, props['Q_cent'], props['I'], props['b_cent']),
+        'glue': get_max_glue_stress(section_data['section'], glue_joints, V_env, props['I']),
+        'web_compression': web_compression
+    }
 
-    # shear buckling
-    fos_bV = calculate_fos(tau_c, buckling['shear'])
+def fos_from_stresses(stresses, section_data, material_props):
+    """
+    FOS for every failure mode from the applied stresses
 
-    # find minimum FOS and failure mode
-    fos_dict = {
-        'tension': fos_tens,
-        'compression': fos_comp,
-        'shear': fos_sh,
-        'glue': fos_gl,
-        'flexural_buckling_case1': fos_b1,
-        'flexural_buckling_case2': fos_b2,
-        'flexural_buckling_case3': fos_b3,
-        'shear_buckling': fos_bV
+    Input =
+        stresses: dict from get_applied_stresses
+        section_data: dict from get_section_data, for the buckling capacities
+        material_props: matboard and glue properties
+
+    Outputs =
+        dict with arrays of all the fos, min_fos and failure_mode
+    """
+    buckling = section_data['buckling']
+    fos = {
+        'fos_tens': calculate_fos_array(stresses['tension_max'], material_props['sigma_tens']),
+        'fos_comp': calculate_fos_array(stresses['compression_max'], material_props['sigma_comp']),
+        'fos_shear': calculate_fos_array(stresses['shear'], material_props['tau_max']),
+        'fos_glue': calculate_fos_array(stresses['glue'], material_props['tau_glue_max']),
+
+        # case 1: top flange inside (k=4) vs top compression
+        # case 2: top flange overhang (k=0.425) vs top compression (same stress as case 1)
+        'fos_buck1': calculate_fos_array(stresses['top_compression'], buckling['top_flange_inside']),
+        'fos_buck2': calculate_fos_array(stresses['top_compression'], buckling['top_flange_overhang']),
+
+        # case 3: web (k=6) vs compression at top of web
+        'fos_buck3': (calculate_fos_array(stresses['web_compression'], buckling['web']) if buckling['web_plates']
+                      else np.full(np.shape(stresses['shear']), np.inf)),
+
+        # shear buckling
+        'fos_buckV': calculate_fos_array(stresses['shear'], buckling['shear'])
     }
 
-    min_fos_value = min(fos_dict.values())
-    failure_mode = min(fos_dict, key=fos_dict.get)
+    # find minimum FOS and failure mode
+    stacked = np.stack([fos[key] for _, key in FAILURE_MODES])
+    fos['min_fos'] = stacked.min(axis=0)
+    fos['failure_mode'] = np.array([mode for mode, _ in FAILURE_MODES])[stacked.argmin(axis=0)]
 
-    return {
-        'fos_tens': fos_tens,
-        'fos_comp': fos_comp,
-        'fos_shear': fos_sh,
-        'fos_glue': fos_gl,
-        'fos_buck1': fos_b1,
-        'fos_buck2': fos_b2,
-        'fos_buck3': fos_b3,
-        'fos_buckV': fos_bV,
-        'min_fos': min_fos_value,
-        'failure_mode': failure_mode
-    }
+    return fos
+
+def find_FOS_arrays(section_data, glue_joints, V_env, M_max, M_min, material_props):
+    """
+    find_FOS for many stations that share one cross section, done with numpy over the envelopes
+
+    Input =
+        section_data: dict from get_section_data (section, props, buckling) for the cross section
+        glue_joints: list of y-coordinates where glue is
+        V_env: array of shear envelope values (N)
+        M_max, M_min: arrays of max and min bending moments (N·mm)
+        material_props: matboard and glue properties
+
+    Outputs =
+        dict with arrays of all the fos, min_fos and failure_mode
+    """
+    stresses = get_applied_stresses(section_data, glue_joints, V_env, M_max, M_min)
+    return fos_from_stresses(stresses, section_data, material_props)
@@ -0,0 +1,562 @@
+"""
+derivatives of the FOS and failure load with respect to every plate's b, h, x and y
+
+failure_load_sensitivities works them out analytically at the critical station,
+finite_difference_sensitivities does the same by brute force to check it.
+arrays are (plates x 4), columns in PARAMS order, plates in the order of the cross section
+at the critical station (the segment's plates for segmented designs)
+"""
+
+import copy
+import numpy as np
+from src.analysis.failure_loads import calculate_failure_loads, find_critical_location
+from src.analysis.fos import FAILURE_MODES, find_FOS_arrays
+from src.core.buckling_capacities import tau_buckling_shear
+from src.core.section_cache import get_section_data
+from src.cross_section_geometry.designs import (
+    get_geometry_at_x,
+    get_diaphragm_spacing_at_x,
+    get_segment_at_x,
+    get_segment_index
+)
+
+PARAMS = ('b', 'h', 'x', 'y')
+B, H, X, Y = range(4)
+
+
+def _unit(n, plate, col, value=1.0):
+    # (plates x 4) derivative that's just value at one plate / param
+    d = np.zeros((n, 4))
+    d[plate, col] = value
+    return d
+
+
+def _tied(values, pick):
+    # positions of the values tied (within rounding) for pick(values)
+    values = np.asarray(values, dtype=float)
+    return np.flatnonzero(np.isclose(values, pick(values), rtol=1e-9, atol=1e-12))
+
+
+def _pick_derivative(values, pick, derivative, kinks=None, what='', labels=None):
+    """
+    derivative of pick(values), averaged over ties
+
+    Input =
+        values: candidate values
+        pick: np.max or np.min
+        derivative: function, derivative(j) is the (plates x 4) derivative of values[j]
+        kinks: list to add a message to if there is a tie the derivative isn't defined at (optional)
+        what, labels: what is being picked and the candidates' names, for the message
+
+    Output =
+        (plates x 4) array
+    """
+    # a max / min with a tie has no derivative, just one-sided ones (the largest and smallest of
+    # the tied derivatives). each entry gets their average, which is what central differences see,
+    # and the tie is reported unless all the tied derivatives agree
+    tied = _tied(values, pick)
+    grads = np.stack([derivative(j) for j in tied])
+    low, high = grads.min(axis=0), grads.max(axis=0)
+    if kinks is not None and not np.allclose(low, high, rtol=1e-12, atol=1e-15):
+        names = [str(labels[j]) if labels is not None else str(j) for j in tied]
+        kinks.append(f"{what}: tie between {', '.join(names)}")
+    return (low + high) / 2
+
+
+def section_derivatives(section, kinks=None):
+    """
+    derivatives of the section properties with respect to each plate's b, h, x, y
+
+    Input =
+        section: Section
+        kinks: dict to add ties to, lists keyed like the output (optional)
+
+    Output =
+        dict of (plates x 4) arrays: A, ybar, I, y_top, y_bot (y_top / y_bot are from the neutral axis)
+    """
+    kinks = {} if kinks is None else kinks
+    n = len(section)
+    # A = sum b h
+    dA = np.zeros((n, 4))
+    dA[:, B] = section.h
+    dA[:, H] = section.b
+
+    # y_bar = S / A with S = sum b h y
+    dS = np.zeros((n, 4))
+    dS[:, B] = section.h * section.y
+    dS[:, H] = section.b * section.y
+    dS[:, Y] = section.area
+
+    ybar = section.y_bar
+    if section.total_area < 1e-9:
+        dybar = np.zeros((n, 4))
+    else:
+        dybar = (dS - ybar * dA) / section.total_area
+
+    # I = sum b h^3/12 + b h (y - y_bar)^2, the y_bar terms cancel since sum b h (y - y_bar) = 0
+    # so moving y_bar doesn't change I to first order
+    d = section.y - ybar
+    dI = np.zeros((n, 4))
+    dI[:, B] = section.h**3 / 12 + section.h * d**2
+    dI[:, H] = section.b * section.h**2 / 4 + section.b * d**2
+    dI[:, Y] = 2 * section.area * d
+
+    # top and bottom of the section belong to one plate each (unless tied)
+    dy_max = np.zeros((n, 4))
+    dy_min = np.zeros((n, 4))
+    if n:
+        dy_max = _pick_derivative(section.tops, np.max, lambda k: _unit(n, k, H, 0.5) + _unit(n, k, Y),
+                                  kinks.setdefault('y_top', []), 'top of section', [f'plate {k}' for k in range(n)])
+        dy_min = _pick_derivative(section.bottoms, np.min, lambda k: _unit(n, k, H, -0.5) + _unit(n, k, Y),
+                                  kinks.setdefault('y_bot', []), 'bottom of section', [f'plate {k}' for k in range(n)])
+
+    return {
+        'A': dA,
+        'ybar': dybar,
+        'I': dI,
+        'y_top': dy_max - dybar,
+        'y_bot': dybar - dy_min
+    }
+
+
+def Q_derivatives(section, y_cut, dybar):
+    """
+    derivative of Q above a fixed y_cut
+
+    Input =
+        section: Section
+        y_cut: y level of the cut (mm)
+        dybar: (plates x 4) derivatives of y_bar from section_derivatives
+
+    Output =
+        (plates x 4) array
+    """
+    # Q = sum of b h_above (centroid of the part above - y_bar), also right for the cut at y_bar
+    # since dQ/dy_cut = 0 there. a plate with its bottom on the cut counts as completely above,
+    # one with its top on the cut as below
+    ybar = section.y_bar
+    h_above = np.clip(section.tops - y_cut, 0.0, section.h)
+    full = section.bottoms >= y_cut
+    cut = ~full & (h_above > 0)
+
+    dQ = np.zeros((len(section), 4))
+    # plates completely above: b h (y - ybar)
+    dQ[full, B] = section.h[full] * (section.y[full] - ybar)
+    dQ[full, H] = section.b[full] * (section.y[full] - ybar)
+    dQ[full, Y] = section.area[full]
+
+    # plates cut: b ((top - ybar)^2 - (y_cut - ybar)^2) / 2, only the top moves
+    top_dist = section.tops[cut] - ybar
+    dQ[cut, B] = h_above[cut] * (section.tops[cut] - h_above[cut] / 2 - ybar)
+    dQ[cut, H] = section.b[cut] * top_dist / 2
+    dQ[cut, Y] = section.b[cut] * top_dist
+
+    # moving y_bar: - A_above * d y_bar
+    A_above = float(np.dot(section.b, h_above))
+    return dQ - A_above * dybar
+
+
+def width_derivatives(section, y_cut):
+    """
+    derivative of the width at y_cut (only the b of the plates crossing it matters)
+    """
+    db = np.zeros((len(section), 4))
+    db[(section.bottoms <= y_cut) & (y_cut <= section.tops), B] = 1.0
+    return db
+
+
+def glue_width_derivatives(section, y_glue):
+    """
+    derivative of the glue contact width at a joint (contact between the plates is held)
+    """
+    db = np.zeros((len(section), 4))
+    above = np.flatnonzero(np.abs(section.bottoms - y_glue) < 1e-6)
+    below = np.flatnonzero(np.abs(section.tops - y_glue) < 1e-6)
+
+    for i in below:
+        for j in above:
+            right = min(section.rights[i], section.rights[j])
+            left = max(section.lefts[i], section.lefts[j])
+            if right - left <= 0:
+                continue
+            # overlap = min(rights) - max(lefts), right = x + b/2 and left = x - b/2
+            k = i if section.rights[i] <= section.rights[j] else j
+            db[k, X] += 1.0
+            db[k, B] += 0.5
+            k = i if section.lefts[i] >= section.lefts[j] else j
+            db[k, X] -= 1.0
+            db[k, B] += 0.5
+    return db
+
+
+def _stacked_thickness_derivatives(section, idx, size, position, size_col, pick, kinks=None, what=''):
+    # same rules as get_stacked_thickness_vertical / _horizontal:
+    # sum of the sizes if they all touch, otherwise the min (vertical) or max (horizontal) one
+    # (whether they touch is held fixed, like the glue joints)
+    # returns (thickness, derivative)
+    n = len(section)
+    dt = np.zeros((n, 4))
+    if len(idx) == 0:
+        return 0.0, dt
+    if len(idx) == 1:
+        dt[idx[0], size_col] = 1.0
+        return float(size[idx[0]]), dt
+
+    order = idx[np.argsort(position[idx], kind='stable')]
+    ends = position[order] + size[order] / 2
+    starts = position[order] - size[order] / 2
+    if np.all(np.abs(starts[1:] - ends[:-1]) <= 0.01):
+        dt[idx, size_col] = 1.0
+        return float(size[idx].sum()), dt
+    dt = _pick_derivative(size[idx], pick, lambda j: _unit(n, idx[j], size_col), kinks, what,
+                          labels=[f'plate {k}' for k in idx])
+    return float(pick(size[idx])), dt
+
+
+def buckling_derivatives(section, buckling, dybar, E, nu, diaphragm_spacing=None, kinks=None):
+    """
+    derivatives of the buckling capacities (same cases as get_buckling_capacities)
+
+    Input =
+        section: Section
+        buckling: dict from get_buckling_capacities for the section
+        dybar: (plates x 4) derivatives of y_bar
+        E: Young's modulus (MPa)
+        nu: Poisson's ratio
+        diaphragm_spacing: spacing between diaphragms (mm), optional
+        kinks: dict to add ties to, lists keyed like the output (optional)
+
+    Output =
+        dict of (plates x 4) arrays: top_flange_inside, top_flange_overhang, web, shear
+        (zeros where the capacity is inf)
+    """
+    # sigma_crit = C (t / b)^2, so d sigma / sigma = 2 dt / t - 2 db / b with b the width for each case
+    kinks = {} if kinks is None else kinks
+    n = len(section)
+    webs = np.flatnonzero(section.of_type('web'))
+    tops = np.flatnonzero(section.of_type('top_flange'))
+    derivs = {name: np.zeros((n, 4)) for name in ('top_flange_inside', 'top_flange_overhang', 'web', 'shear')}
+    found = {name: kinks.setdefault(name, []) for name in derivs}
+    top_labels = [f'plate {k}' for k in tops]
+    web_labels = [f'plate {k}' for k in webs]
+
+    if len(tops):
+        thickness = []
+        t, dt = _stacked_thickness_derivatives(section, tops, section.h, section.y, H, np.min, thickness,
+                                               'top flange thickness')
+        found['top_flange_inside'] += thickness
+        found['top_flange_overhang'] += thickness
+
+        # case 1: inside width = rightmost web inner edge - leftmost web inner edge
+        sigma = buckling['top_flange_inside']
+        if np.isfinite(sigma) and len(webs):
+            dw = (_pick_derivative(section.lefts[webs], np.max,
+                                   lambda j: _unit(n, webs[j], X) + _unit(n, webs[j], B, -0.5),
+                                   found['top_flange_inside'], 'inner edge of the right web', web_labels)
+                  - _pick_derivative(section.rights[webs], np.min,
+                                     lambda j: _unit(n, webs[j], X) + _unit(n, webs[j], B, 0.5),
+                                     found['top_flange_inside'], 'inner edge of the left web', web_labels))
+            w = section.lefts[webs].max() - section.rights[webs].min()
+            derivs['top_flange_inside'] = sigma * (2 * dt / t - 2 * dw / w)
+
+        # case 2: biggest overhang past the outside of the webs
+        sigma = buckling['top_flange_overhang']
+        if np.isfinite(sigma):
+            dfw = _pick_derivative(section.b[tops], np.max, lambda j: _unit(n, tops[j], B),
+                                   found['top_flange_overhang'], 'widest top flange plate', top_labels)
+            dfx = _unit(n, tops[0], X)
+
+            flange_width = section.b[tops].max()
+            flange_x = section.x[tops[0]]
+            if len(webs):
+                left_overhang = max(0, section.lefts[webs].min() - (flange_x - flange_width / 2))
+                right_overhang = max(0, (flange_x + flange_width / 2) - section.rights[webs].max())
+                d_left_edge = _pick_derivative(section.lefts[webs], np.min,
+                                               lambda j: _unit(n, webs[j], X) + _unit(n, webs[j], B, -0.5),
+                                               found['top_flange_overhang'], 'outer edge of the left web', web_labels)
+                d_right_edge = _pick_derivative(section.rights[webs], np.max,
+                                                lambda j: _unit(n, webs[j], X) + _unit(n, webs[j], B, 0.5),
+                                                found['top_flange_overhang'], 'outer edge of the right web',
+                                                web_labels)
+                sides = [d_left_edge - dfx + dfw / 2, dfx + dfw / 2 - d_right_edge]
+                overhang = max(left_overhang, right_overhang)
+                d_overhang = _pick_derivative([left_overhang, right_overhang], np.max, lambda j: sides[j],
+                                              found['top_flange_overhang'], 'biggest flange overhang', ['left', 'right'])
+            else:
+                overhang = flange_width
+                d_overhang = dfw
+            derivs['top_flange_overhang'] = sigma * (2 * dt / t - 2 * d_overhang / overhang)
+
+    if len(webs):
+        thickness = []
+        t, dt = _stacked_thickness_derivatives(section, webs, section.b, section.x, B, np.max, thickness,
+                                               'web thickness')
+        found['web'] += thickness
+        found['shear'] += thickness
+
+        # case 3: compression zone from the neutral axis to the top of the webs
+        d_height = _pick_derivative(section.tops[webs], np.max,
+                                    lambda j: _unit(n, webs[j], H, 0.5) + _unit(n, webs[j], Y),
+                                    found['web'], 'top of the webs', web_labels) - dybar
+        height = section.tops[webs].max() - section.y_bar
+        derivs['web'] = buckling['web'] * (2 * dt / t - 2 * d_height / height)
+
+        # shear: tau = C t^2 (1/h^2 + 1/s^2), only the height term depends on h
+        h_web = section.h[webs].max()
+        tau_height = tau_buckling_shear(h_web, t, E, nu)
+        dh = _pick_derivative(section.h[webs], np.max, lambda j: _unit(n, webs[j], H), found['shear'],
+                              'tallest web', web_labels)
+        derivs['shear'] = 2 * buckling['shear'] * dt / t - 2 * tau_height * dh / h_web
+
+    return derivs
+
+
+def fos_derivatives(section_data, glue_joints, V_env, M_max, M_min, material_props, diaphragm_spacing=None):
+    """
+    FOS for every failure mode at one station and its derivatives with respect to the plates
+
+    Input =
+        section_data: dict from get_section_data (section, props, buckling) for the cross section
+        glue_joints: list of y-coordinates where glue is
+        V_env: shear envelope value at the station (N)
+        M_max, M_min: max and min bending moment at the station (N·mm)
+        material_props: matboard and glue properties
+        diaphragm_spacing: spacing between diaphragms (mm), optional
+
+    Output =
+        dict with
+            fos: dict of fos values, same as find_FOS
+            d_fos: dict of (plates x 4) arrays keyed like fos, zeros where the fos is inf
+            mode_kinks: ties each fos goes through, keyed like fos
+            kinks: ties behind the governing fos (min_fos), empty if it's differentiable here
+    """
+    # the envelopes don't depend on the cross section (the bridge is statically determinate), so
+    # every fos is capacity / (load * g) with g a geometric factor (y/I for flexure, Q/(I b) for
+    # shear, ...) and d fos = fos * (d cap / cap - d g / g)
+    section = section_data['section']
+    props = section_data['props']
+    buckling = section_data['buckling']
+    fos_arrays = find_FOS_arrays(section_data, glue_joints, [V_env], [M_max], [M_min], material_props)
+    fos = {name: (float(value[0]) if name != 'failure_mode' else str(value[0])) for name, value in fos_arrays.items()}
+
+    n = len(section)
+    geo_kinks = {}
+    geo = section_derivatives(section, geo_kinks)
+    I_val = props['I']
+    dlog_I = geo['I'] / I_val
+
+    def dlog_flexure(fibre):
+        return geo[fibre] / props[fibre] - dlog_I
+
+    mode_kinks = {name: [] for _, name in FAILURE_MODES}
+
+    # which fibre has the worst tension / compression (same candidates as get_stress_envelope)
+    stresses = [-M_max * props['y_top'], M_max * props['y_bot'], -M_min * props['y_top'], M_min * props['y_bot']]
+    fibres = ['y_top', 'y_bot', 'y_top', 'y_bot']
+    dlog_tension = _pick_derivative(stresses, np.max, lambda j: dlog_flexure(fibres[j]), mode_kinks['fos_tens'],
+                                    'worst tension fibre', fibres)
+    dlog_compression = _pick_derivative(stresses, np.min, lambda j: dlog_flexure(fibres[j]), mode_kinks['fos_comp'],
+                                        'worst compression fibre', fibres)
+    for name, pick in (('fos_tens', np.max), ('fos_comp', np.min)):
+        for fibre in sorted({fibres[j] for j in _tied(stresses, pick)}):
+            mode_kinks[name] += geo_kinks[fibre]
+
+    # shear at the centroid: g = Q_cent / (I b_cent)
+    dlog_shear = (Q_derivatives(section, props['ybar'], geo['ybar']) / props['Q_cent']
+                  - dlog_I - width_derivatives(section, props['ybar']) / props['b_cent'])
+
+    # worst glue joint (which plates touch at each joint is held fixed, moving a plate off one
+    # is a jump in the fos rather than a kink, so these derivatives don't see it)
+    dlog_glue = np.zeros((n, 4))
+    joints = []
+    for glue_y, Q_glue in zip(glue_joints, section.Q_profile(glue_joints).tolist() if len(glue_joints) else []):
+        b_glue = section.glue_width(glue_y)
+        if b_glue > 0:
+            joints.append((glue_y, Q_glue, b_glue))
+    if joints:
+        def dlog_joint(j):
+            glue_y, Q_glue, b_glue = joints[j]
+            return (Q_derivatives(section, glue_y, geo['ybar']) / Q_glue
+                    - dlog_I - glue_width_derivatives(section, glue_y) / b_glue)
+        dlog_glue = _pick_derivative([Q_glue / b_glue for _, Q_glue, b_glue in joints], np.max, dlog_joint,
+                                     mode_kinks['fos_glue'], 'worst glue joint',
+                                     [f'y = {glue_y}' for glue_y, _, _ in joints])
+
+    # web compression: g = (web top - ybar) / I (a tie at the web top is noted by buckling_derivatives)
+    dlog_web = np.zeros((n, 4))
+    web_plates = np.flatnonzero(section.of_type('web'))
+    if len(web_plates):
+        d_top = _pick_derivative(section.tops[web_plates], np.max,
+                                 lambda j: _unit(n, web_plates[j], H, 0.5) + _unit(n, web_plates[j], Y))
+        d_height = d_top - geo['ybar']
+        dlog_web = d_height / (section.tops[web_plates].max() - props['ybar']) - dlog_I
+
+    cap_kinks = {}
+    d_cap = buckling_derivatives(section, buckling, geo['ybar'], material_props['E'], material_props['nu'],
+                                 diaphragm_spacing=diaphragm_spacing, kinks=cap_kinks)
+    mode_kinks['fos_buck1'] += cap_kinks['top_flange_inside'] + geo_kinks['y_top']
+    mode_kinks['fos_buck2'] += cap_kinks['top_flange_overhang'] + geo_kinks['y_top']
+    mode_kinks['fos_buck3'] += cap_kinks['web']
+    mode_kinks['fos_buckV'] += cap_kinks['shear']
+
+    def dlog_cap(name):
+        return d_cap[name] / buckling[name]
+
+    no_cap = np.zeros((n, 4))
+    # d log fos = d log capacity - d log g
+    dlogs = {
+        'fos_tens': no_cap - dlog_tension,
+        'fos_comp': no_cap - dlog_compression,
+        'fos_shear': no_cap - dlog_shear,
+        'fos_glue': no_cap - dlog_glue,
+        'fos_buck1': dlog_cap('top_flange_inside') - dlog_flexure('y_top'),
+        'fos_buck2': dlog_cap('top_flange_overhang') - dlog_flexure('y_top'),
+        'fos_buck3': dlog_cap('web') - dlog_web,
+        'fos_buckV': dlog_cap('shear') - dlog_shear
+    }
+
+    d_fos = {}
+    for _, name in FAILURE_MODES:
+        d_fos[name] = fos[name] * dlogs[name] if np.isfinite(fos[name]) else np.zeros((n, 4))
+
+    # governing mode (ties between modes averaged like everything else)
+    names = [name for _, name in FAILURE_MODES]
+    values = [fos[name] for name in names]
+    kinks = []
+    d_fos['min_fos'] = _pick_derivative(values, np.min, lambda j: d_fos[names[j]], kinks,
+                                        'governing failure mode', [mode for mode, _ in FAILURE_MODES])
+    if np.isfinite(min(values)):
+        for j in _tied(values, np.min):
+            kinks += mode_kinks[names[j]]
+    if fos['failure_mode'] == 'glue':
+        kinks.append('glue governs: contact at the glue joints is held fixed, moving a plate off one is a jump')
+
+    return {'fos': fos, 'd_fos': d_fos, 'mode_kinks': mode_kinks, 'kinks': list(dict.fromkeys(kinks))}
+
+
+def failure_load_sensitivities(geometry, loadcase, mass, material_props, num_points=10000, bridge_length=1250, grid=None):
+    """
+    derivative of the governing FOS and the failure load with respect to each plate's b, h, x, y
+
+    Input =
+        geometry: bridge geometry dict
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: train mass (N)
+        material_props: matboard and glue properties
+        num_points: number of points along bridge (default 10000)
+        bridge_length: length of bridge for euler buckling (mm), default 1250
+        grid: StationGrid (or array of stations) to check, overrides num_points
+
+    Output =
+        dict with
+            failure_load, min_fos, failure_mode ('euler' if global buckling governs)
+            x: station the derivatives are for (midspan for euler), index (station index, None for euler)
+            segment: index of the segment the plates are from (0 if prismatic)
+            plates: the plates the derivatives are for, params: PARAMS
+            d_fos, d_failure_load: (plates x 4) arrays
+            kinks: list of ties the derivatives are averaged over, differentiable: True if there are none
+    """
+    # the min over stations and modes has the derivative of whichever governs,
+    # ties between them are averaged like any other max / min (see _pick_derivative)
+    results = calculate_failure_loads(geometry, loadcase, mass, material_props, num_points=num_points,
+                                      bridge_length=bridge_length, grid=grid)
+    critical = find_critical_location(results)
+    kinks = []
+    if np.isclose(results.fos_euler, critical['min_fos'], rtol=1e-9, atol=1e-12):
+        kinks.append('euler buckling is tied with the governing station')
+
+    if results.fos_euler < critical['min_fos']:
+        # P_euler = pi^2 E I / L^2 with I at midspan, so d fos = fos * dI / I
+        x_crit = bridge_length / 2
+        plates, glue_joints = get_geometry_at_x(geometry, x_crit)
+        section_data = get_section_data(plates, glue_joints, get_diaphragm_spacing_at_x(geometry, x_crit), material_props)
+        dI = section_derivatives(section_data['section'])['I']
+        d_fos = results.fos_euler * dI / section_data['props']['I']
+        failure_mode = 'euler'
+        index = None
+    else:
+        x_crit = critical['x']
+        index = critical['index']
+        plates = get_segment_at_x(geometry, x_crit)['plates']
+
+        def station_derivatives(i):
+            # (same plates as the critical station, but a tied station's segment can have other joints / spacing)
+            glue_joints = get_segment_at_x(geometry, results.x[i])['glue_joints']
+            diaphragm_spacing = get_diaphragm_spacing_at_x(geometry, results.x[i])
+            section_data = get_section_data(plates, glue_joints, diaphragm_spacing, material_props)
+            station = fos_derivatives(section_data, glue_joints, results.V_env[i], results.M_max[i],
+                                      results.M_min[i], material_props, diaphragm_spacing=diaphragm_spacing)
+            kinks.extend(station['kinks'])
+            return station
+
+        station = station_derivatives(index)
+        d_fos = station['d_fos']['min_fos']
+        failure_mode = station['fos']['failure_mode']
+
+        # other stations tied for the min: same segment and loads only need doing once, and stations whose
+        # segment has other plates don't depend on these ones so they're a zero derivative
+        # (segments can share one plates list, like deep_midspan's ends, then they do depend on them)
+        min_fos = np.asarray(results['min_fos'])
+        tied = {}
+        for i in np.flatnonzero(np.isclose(min_fos, min_fos[index], rtol=1e-9, atol=1e-12)).tolist():
+            shared = get_segment_at_x(geometry, results.x[i])['plates'] is plates
+            key = (get_segment_index(geometry, results.x[i]), results.V_env[i], results.M_max[i], results.M_min[i])
+            tied.setdefault(key if shared else None, i)
+        if len(tied) > 1:
+            stations = list(tied.items())
+            d_fos = _pick_derivative(
+                [min_fos[i] for _, i in stations], np.min,
+                lambda j: station_derivatives(stations[j][1])['d_fos']['min_fos'] if stations[j][0] is not None
+                else np.zeros_like(d_fos),
+                kinks, 'governing station', [f'x = {results.x[i]:.3f}' for _, i in stations])
+
+    return {
+        'failure_load': results.failure_load,
+        'min_fos': results.overall_min_fos,
+        'failure_mode': failure_mode,
+        'x': x_crit,
+        'index': index,
+        'segment': get_segment_index(geometry, x_crit),
+        'plates': plates,
+        'params': PARAMS,
+        'd_fos': d_fos,
+        'd_failure_load': d_fos * mass,
+        'kinks': list(dict.fromkeys(kinks)),
+        'differentiable': not kinks
+    }
+
+
+def finite_difference_sensitivities(geometry, loadcase, mass, material_props, step=1e-4, x=None,
+                                    num_points=10000, bridge_length=1250, grid=None):
+    """
+    failure_load_sensitivities by central differences, for checking it (2 full analyses per plate parameter)
+
+    Input =
+        geometry, loadcase, mass, material_props, num_points, bridge_length, grid: as calculate_failure_loads
+        step: perturbation of each plate parameter (mm)
+        x: station whose cross section gets perturbed (default: critical station of the unperturbed design)
+
+    Output =
+        dict with d_fos and d_failure_load (plates x 4) arrays, params
+    """
+    def failure(geom):
+        results = calculate_failure_loads(geom, loadcase, mass, material_props, num_points=num_points,
+                                          bridge_length=bridge_length, grid=grid)
+        return results.overall_min_fos
+
+    if x is None:
+        x = failure_load_sensitivities(geometry, loadcase, mass, material_props, num_points=num_points,
+                                       bridge_length=bridge_length, grid=grid)['x']
+
+    num_plates = len(get_segment_at_x(geometry, x)['plates'])
+    d_fos = np.zeros((num_plates, 4))
+    for i in range(num_plates):
+        for col, param in enumerate(PARAMS):
+            values = []
+            for sign in (1, -1):
+                geom = copy.deepcopy(geometry)
+                get_segment_at_x(geom, x)['plates'][i][param] += sign * step
+                values.append(failure(geom))
+            d_fos[i, col] = (values[0] - values[1]) / (2 * step)
+
+    return {'params': PARAMS, 'd_fos': d_fos, 'd_failure_load': d_fos * mass}
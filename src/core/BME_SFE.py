@@ -5,70 +5,271 @@ These are the SFE vals and the BME vals
 
 These are: max value of V and M at every locaiton of the bridge out of every posssible train location
 that the train rolls all the way over the bridge
---> x should range from -856 to 1250:
+--> x should range from -856 to 1250 (for the 856 mm load case trains, see train.py):
     - x_start = -856: rightmost wheel just on bridge (at position 0)
     - x_end = 1250: leftmost wheel leaves bridge (at position 1250)
+
+method = 'sampled' (default) uses evenly spaced train positions
+method = 'exact' only looks at the train positions where something can change:
+    - a wheel on the station
+    - a wheel on a support or a bridge end
+    - the first and last train position
+    between those, V and M at a station are linear in x so the max and min have to be at one of them
+    (both one sided limits are checked since V and M jump when a wheel crosses the station or an end)
+
+parallel_envelopes splits the train positions into chunks and does each chunk in a separate process
+
+SFE_BMEvals does shear and moment together in one pass and returns a single Envelope
 '''
 
-from src.core.reactions_BMD_SFD import SFDvals, BMDvals
+from src.core.reactions_BMD_SFD import SFDminmax, BMDminmax, SFD_BMDminmax, point_values, SFD_BMD_diagrams
+from src.core.envelope import Envelope
+from src.core.station_grid import as_grid
+from src.core.train import as_train
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+import numpy as np
 
-def SFEvals(loadcase, mass, num_train_positions=1000):
+def _train_range(loadcase, bridge_length=1250):
+    # first and last leftmost wheel position with any wheel on the bridge
+    # (rightmost wheel entering at 0 to leftmost wheel leaving at bridge_length)
+    train = as_train(loadcase)
+    return -float(train.offsets.max()), bridge_length - float(train.offsets.min())
+
+def train_positions(num_train_positions=1000, loadcase=1):
     """
-    Find shear force envelopes (max and min shear at each point on bridge)
+    evenly spaced leftmost wheel positions for the train rolling over the bridge
 
-    Input = 
-        loadcase: 1, 2, or 3
-        mass: total mass of train
+    Input =
         num_train_positions: number of train positions to test (default 1000)
+        loadcase: 1, 2, 3 or a TrainDefinition (only its wheel offsets matter)
 
-    Outputs = 
-        sfe_max: list of max shear force at 10,000 points along the bridge
-         sfe_min: list of min shear force at 10,000 points along the bridge
+    Outputs =
+        numpy array of x positions from -856 to 1250 (mm) for the load case trains
     """
     # calculate the range of x values
-    # rightmost wheel is at x + (176 + 164 + 176 + 164 + 176) = x + 856
+    # rightmost wheel is at x + train length (x + 856 for the load cases)
     # x should start when rightmost wheel is before the bridge (x is negative)
     # x should end when rightmost wheel is past the bridge
-    train_length = 856  # mm (from leftmost wheel to rightmost wheel)
-    bridge_length = 1250  # mm
+    x_start, x_end = _train_range(loadcase)
 
-    x_start = -train_length  # leftmost wheel at -856 (rightmost wheel entering at 0)
-    x_end = bridge_length  # leftmost wheel at bridge end (1250mm)
+    return x_start + np.arange(num_train_positions) * (x_end - x_start) / (num_train_positions - 1)
 
-    # generate x positions for the train
-    x_positions = [x_start + i * (x_end - x_start) / (num_train_positions - 1)
-                   for i in range(num_train_positions)]
+def exact_envelopes(loadcase, mass, num_points=10000, grid=None):
+    """
+    exact shear and moment envelopes from the critical train positions
 
-    num_points = 10000
-    sfe_max = [float('-inf')] * num_points
-    sfe_min = [float('inf')] * num_points
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
 
-    # for each train position, calculate SFD and update envelope
-    for x in x_positions:
-        sfd = SFDvals(x, loadcase, mass)
-        for i in range(num_points):
-            sfe_max[i] = max(sfe_max[i], sfd[i])
-            sfe_min[i] = min(sfe_min[i], sfd[i])
+    Outputs =
+        Envelope with sfe_min, sfe_max, bme_min, bme_max arrays
+    """
+    bridge_length = 1250
+    x_start, x_end = _train_range(loadcase, bridge_length)
 
-    return sfe_min, sfe_max
+    stations = as_grid(grid, num_points).x
+    num_points = len(stations)
+    wheel_offsets = as_train(loadcase).offsets
 
-def BMEvals(loadcase, mass, num_train_positions=1000):
-    train_length = 856
-    bridge_length = 1250
+    # train positions that put a wheel on a support or an end (same for every station)
+    global_events = np.concatenate([[x_start, x_end]] + [p - wheel_offsets for p in (0, 25, 1225, bridge_length)])
+    global_events = np.unique(global_events[(global_events >= x_start) & (global_events <= x_end)])
+
+    # train positions that put a wheel on each station, shape (stations x wheels)
+    station_events = stations[:, None] - wheel_offsets[None, :]
+    station_events = np.clip(station_events, x_start, x_end)
+
+    env = {
+        'sfe_min': np.full(num_points, np.inf),
+        'sfe_max': np.full(num_points, -np.inf),
+        'bme_min': np.full(num_points, np.inf),
+        'bme_max': np.full(num_points, -np.inf)
+    }
+
+    # wheel positions are rebuilt from x so allow a little rounding when checking if a wheel is on a station
+    tol = 1e-9
+
+    for events in (global_events[None, :], station_events):
+        for side in (0, -1, 1):
+            V, M = point_values(stations[:, None], events, loadcase, mass, side=side, tol=tol)
 
-    x_start = -train_length
-    x_end = bridge_length
+            # don't look past the first or last train position
+            if side != 0:
+                edge = x_start if side < 0 else x_end
+                V_exact, M_exact = point_values(stations[:, None], events, loadcase, mass, tol=tol)
+                V = np.where(events == edge, V_exact, V)
+                M = np.where(events == edge, M_exact, M)
 
-    x_positions = [x_start + i * (x_end - x_start) / (num_train_positions - 1)
-                   for i in range(num_train_positions)]
+            np.minimum(env['sfe_min'], V.min(axis=1), out=env['sfe_min'])
+            np.maximum(env['sfe_max'], V.max(axis=1), out=env['sfe_max'])
+            np.minimum(env['bme_min'], M.min(axis=1), out=env['bme_min'])
+            np.maximum(env['bme_max'], M.max(axis=1), out=env['bme_max'])
+
+    return Envelope(stations, **env)
+
+def envelope_diagrams(loadcase, mass, num_train_positions=1000):
+    """
+    shear and moment envelopes as piecewise diagrams (knots only, exact between stations)
+
+    each train position is a few dozen knots, and the envelopes are merged pairwise
+    with exact max/min so nothing is sampled until you call .sample(stations)
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions to test (default 1000)
+
+    Outputs =
+        dict with sfe_min, sfe_max, bme_min, bme_max PiecewiseDiagram objects
+    """
+    sfds = []
+    bmds = []
+    for x in train_positions(num_train_positions, loadcase):
+        sfd, bmd = SFD_BMD_diagrams(x, loadcase, mass)
+        sfds.append(sfd)
+        bmds.append(bmd)
+
+    return {
+        'sfe_min': _merge_all(sfds, 'minimum'),
+        'sfe_max': _merge_all(sfds, 'maximum'),
+        'bme_min': _merge_all(bmds, 'minimum'),
+        'bme_max': _merge_all(bmds, 'maximum')
+    }
+
+def _merge_all(diagrams, how):
+    # merge in pairs so the intermediate diagrams stay small
+    while len(diagrams) > 1:
+        merged = [getattr(a, how)(b) for a, b in zip(diagrams[::2], diagrams[1::2])]
+        if len(diagrams) % 2:
+            merged.append(diagrams[-1])
+        diagrams = merged
+    return diagrams[0]
+
+def _partial_envelopes(x_chunk, loadcase, mass, stations):
+    # runs in a worker process: min/max for one chunk of train positions
+    env = SFD_BMDminmax(x_chunk, loadcase, mass, grid=stations)
+    return env['sfe_min'], env['sfe_max'], env['bme_min'], env['bme_max']
+
+def parallel_envelopes(loadcase, mass, num_train_positions=1000, max_workers=None, executor=None,
+                       num_chunks=None, num_points=10000, grid=None):
+    """
+    shear and moment envelopes with the train positions split over worker processes
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions to test (default 1000)
+        max_workers: number of worker processes (default os.cpu_count(), 1 = run serially here)
+        executor: an existing concurrent.futures executor to use instead of making a pool
+        num_chunks: number of chunks to split the positions into (default 4 per worker)
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        Envelope with sfe_min, sfe_max, bme_min, bme_max arrays
+    """
+    stations = as_grid(grid, num_points).x
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if num_chunks is None:
+        num_chunks = 4 * max_workers
+
+    x_positions = train_positions(num_train_positions, loadcase)
+    chunks = [c for c in np.array_split(x_positions, max(1, min(num_chunks, len(x_positions)))) if len(c)]
+
+    partials = None
+    if executor is not None:
+        futures = [executor.submit(_partial_envelopes, c, loadcase, mass, stations) for c in chunks]
+        partials = [f.result() for f in futures]
+    elif max_workers > 1 and len(chunks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                partials = list(pool.map(_partial_envelopes, chunks, [loadcase] * len(chunks),
+                                         [mass] * len(chunks), [stations] * len(chunks)))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # no process pool here (e.g. restricted sandbox), do it serially instead
+            partials = None
+
+    if partials is None:
+        partials = [_partial_envelopes(c, loadcase, mass, stations) for c in chunks]
+
+    # merge the partial envelopes
+    sfe_mins, sfe_maxs, bme_mins, bme_maxs = zip(*partials)
+    return Envelope(stations,
+                    np.min(sfe_mins, axis=0), np.max(sfe_maxs, axis=0),
+                    np.min(bme_mins, axis=0), np.max(bme_maxs, axis=0))
+
+def SFE_BMEvals(loadcase, mass, num_train_positions=1000, method='sampled', num_points=10000, grid=None):
+    """
+    shear force and bending moment envelopes together in one pass
+    (reactions and wheel loads are found once per train position and used for both)
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions to test (default 1000)
+        method: 'sampled' (evenly spaced train positions) or 'exact' (critical train positions only)
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        Envelope with sfe_min, sfe_max, bme_min, bme_max arrays (also V_env and M_env)
+    """
+    stations = as_grid(grid, num_points).x
+    if method == 'exact':
+        return exact_envelopes(loadcase, mass, grid=stations)
+
+    env = SFD_BMDminmax(train_positions(num_train_positions, loadcase), loadcase, mass, grid=stations)
+    return Envelope(stations, **env)
+
+def SFEvals(loadcase, mass, num_train_positions=1000, method='sampled', grid=None):
+    """
+    Find shear force envelopes (max and min shear at each point on bridge)
+
+    Input = 
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions to test (default 1000)
+        method: 'sampled' (evenly spaced train positions) or 'exact' (critical train positions only)
+        grid: StationGrid (or array of stations), default 10,000 evenly spaced points
+
+    Outputs = 
+        sfe_max: list of max shear force at each station (10,000 points along the bridge by default)
+         sfe_min: list of min shear force at each station (10,000 points along the bridge by default)
+    """
+    if method == 'exact':
+        env = exact_envelopes(loadcase, mass, grid=grid)
+        return env['sfe_min'].tolist(), env['sfe_max'].tolist()
+
+    # all train positions are done at once by the batched engine
+    sfe_min, sfe_max = SFDminmax(train_positions(num_train_positions, loadcase), loadcase, mass, grid=grid)
+
+    return sfe_min.tolist(), sfe_max.tolist()
+
+def BMEvals(loadcase, mass, num_train_positions=1000, method='sampled', grid=None):
+    """
+    Find bending moment envelopes (max and min moment at each point on bridge)
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions to test (default 1000)
+        method: 'sampled' (evenly spaced train positions) or 'exact' (critical train positions only)
+        grid: StationGrid (or array of stations), default 10,000 evenly spaced points
+
+    Outputs =
+        bme_min: list of min bending moment at each station (10,000 points along the bridge by default)
+        bme_max: list of max bending moment at each station (10,000 points along the bridge by default)
+    """
+    if method == 'exact':
+        env = exact_envelopes(loadcase, mass, grid=grid)
+        return env['bme_min'].tolist(), env['bme_max'].tolist()
 
-    num_points = 10000
-    bme_max = [float('-inf')] * num_points
-    bme_min = [float('inf')] * num_points
-    for x in x_positions:
-        bmd = BMDvals(x, loadcase, mass)
-        for i in range(num_points):
-            bme_max[i] = max(bme_max[i], bmd[i])
-            bme_min[i] = min(bme_min[i], bmd[i])
+    bme_min, bme_max = BMDminmax(train_positions(num_train_positions, loadcase), loadcase, mass, grid=grid)
 
-    return bme_min, bme_max
\ No newline at end of file
+    return bme_min.tolist(), bme_max.tolist()
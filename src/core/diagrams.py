@@ -0,0 +1,180 @@
+"""
+piecewise linear SFD / BMD stored as knots instead of 10,000 samples
+
+between wheels and supports shear is constant and moment is linear, so a diagram is just
+its knots (x, y). a jump (e.g. shear under a wheel) is two knots at the same x:
+first the value just to the left, then the value at x. diagrams are right continuous,
+which matches SFDvals (a wheel at exactly x counts as passed).
+"""
+
+import numpy as np
+
+
+class PiecewiseDiagram:
+    def __init__(self, x, y):
+        """
+        Input =
+            x: knot positions (mm), non decreasing, repeated x = jump
+            y: value at each knot
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __call__(self, positions):
+        return self.evaluate(positions)
+
+    def evaluate(self, positions):
+        """
+        exact value at any position(s) (clamped to the first / last knot outside the diagram)
+        """
+        positions = np.asarray(positions, dtype=float)
+        i = np.searchsorted(self.x, positions, side='right') - 1
+        return self._interp(positions, i)
+
+    def left_limit(self, positions):
+        """
+        limit approaching position(s) from the left (differs from evaluate only at jumps)
+        """
+        positions = np.asarray(positions, dtype=float)
+        i = np.searchsorted(self.x, positions, side='left') - 1
+        return self._interp(positions, i)
+
+    def _interp(self, positions, i):
+        # interpolate on the interval starting at knot i
+        last = len(self.x) - 1
+        i = np.clip(i, 0, max(last - 1, 0))
+        j = np.minimum(i + 1, last)
+        x0, x1 = self.x[i], self.x[j]
+        y0, y1 = self.y[i], self.y[j]
+        dx = np.where(x1 > x0, x1 - x0, 1.0)
+        t = np.clip((positions - x0) / dx, 0.0, 1.0)
+        t = np.where(x1 > x0, t, 1.0)
+        return y0 + t * (y1 - y0)
+
+    def sample(self, positions):
+        """
+        sample the diagram on any grid (e.g. the 10,000 stations)
+        """
+        return self.evaluate(positions)
+
+    def maximum(self, other):
+        """
+        elementwise max of two diagrams, exact (adds knots where they cross)
+        """
+        return self._merge(other, np.maximum)
+
+    def minimum(self, other):
+        """
+        elementwise min of two diagrams, exact (adds knots where they cross)
+        """
+        return self._merge(other, np.minimum)
+
+    def _merge(self, other, pick):
+        u = np.unique(np.concatenate([self.x, other.x]))
+
+        f_left, f_right = self.left_limit(u), self.evaluate(u)
+        g_left, g_right = other.left_limit(u), other.evaluate(u)
+        left = pick(f_left, g_left)
+        right = pick(f_right, g_right)
+
+        # between knots both are linear, so they cross at most once per interval
+        d0 = f_right[:-1] - g_right[:-1]
+        d1 = f_left[1:] - g_left[1:]
+        crosses = d0 * d1 < 0
+        t = d0[crosses] / (d0[crosses] - d1[crosses])
+        x_cross = u[:-1][crosses] + t * (u[1:][crosses] - u[:-1][crosses])
+        y_cross = f_right[:-1][crosses] + t * (f_left[1:][crosses] - f_right[:-1][crosses])
+
+        # left limit knot only needed where there is a jump
+        jump = left != right
+        jump[0] = False
+
+        x = np.concatenate([u[jump], u, x_cross])
+        y = np.concatenate([left[jump], right, y_cross])
+        order_key = np.concatenate([np.zeros(jump.sum()), np.ones(len(u)), np.full(len(x_cross), 2.0)])
+        order = np.lexsort((order_key, x))
+
+        return PiecewiseDiagram(x[order], y[order]).compact()
+
+    def compact(self, rel_tol=1e-12):
+        """
+        drop knots that don't change the diagram (repeated knots, points on a straight line)
+        """
+        x, y = self.x, self.y
+        if len(x) < 3:
+            return PiecewiseDiagram(x, y)
+
+        # repeated knots with the same value
+        keep = np.ones(len(x), dtype=bool)
+        keep[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+        x, y = x[keep], y[keep]
+        if len(x) < 3:
+            return PiecewiseDiagram(x, y)
+
+        # interior knots on the line between their neighbours
+        # (never drop two neighbours in the same pass, the line through them could be off)
+        scale = rel_tol * max(np.abs(y).max(), 1.0) * max(x[-1] - x[0], 1.0)
+        while len(x) >= 3:
+            x0, x1, x2 = x[:-2], x[1:-1], x[2:]
+            y0, y1, y2 = y[:-2], y[1:-1], y[2:]
+            cross = (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0)
+            straight = (x0 < x1) & (x1 < x2) & (np.abs(cross) <= scale)
+            straight[1:] &= ~straight[:-1]
+            if not straight.any():
+                break
+
+            keep = np.ones(len(x), dtype=bool)
+            keep[1:-1] = ~straight
+            x, y = x[keep], y[keep]
+
+        return PiecewiseDiagram(x, y)
+
+
+def point_load_diagrams(positions, forces, start=0.0, end=1250.0):
+    """
+    SFD and BMD for a beam with point forces (upwards positive)
+
+    Input =
+        positions: positions of the forces (mm), only ones in [start, end] are used
+        forces: force at each position (N), reactions positive, wheel loads negative
+        start, end: ends of the bridge (mm)
+
+    Outputs =
+        sfd, bmd: PiecewiseDiagram for shear and moment
+    """
+    positions = np.asarray(positions, dtype=float)
+    forces = np.asarray(forces, dtype=float)
+    on = (positions >= start) & (positions <= end)
+    positions, forces = positions[on], forces[on]
+
+    # combine forces at the same spot
+    u, inverse = np.unique(positions, return_inverse=True)
+    net = np.zeros(len(u))
+    np.add.at(net, inverse, forces)
+
+    at_start = net[u == start].sum()
+    at_end = net[u == end].sum()
+    interior = (u > start) & (u < end)
+    inner_x, inner_f = u[interior], net[interior]
+
+    # shear just after the start and just after each interior force
+    shear_right = at_start + np.cumsum(np.concatenate([[0.0], inner_f]))
+
+    # moment is continuous, linear between the forces
+    knots = np.concatenate([[start], inner_x, [end]])
+    moment = np.concatenate([[0.0], np.cumsum(shear_right * np.diff(knots))])
+
+    # sfd knots: value to the left then value at every interior force
+    sfd_x = np.concatenate([[start], np.repeat(inner_x, 2), [end]])
+    sfd_y = np.concatenate([[shear_right[0]],
+                            np.column_stack([shear_right[:-1], shear_right[1:]]).ravel(),
+                            [shear_right[-1]]])
+    if np.any(u == end):
+        # a force right at the end only shows up at the end itself
+        sfd_x = np.append(sfd_x, end)
+        sfd_y = np.append(sfd_y, shear_right[-1] + at_end)
+
+    return PiecewiseDiagram(sfd_x, sfd_y).compact(), PiecewiseDiagram(knots, moment).compact()
@@ -0,0 +1,119 @@
+"""
+shear force and bending moment envelopes kept together in one object
+
+Envelope works like the old dict of envelopes too (env['sfe_min'] etc)
+EnvelopeBatch stacks the envelopes for many (loadcase, mass) pairs into one array
+"""
+
+import numpy as np
+
+
+class Envelope:
+    names = ('sfe_min', 'sfe_max', 'bme_min', 'bme_max')
+
+    def __init__(self, x, sfe_min, sfe_max, bme_min, bme_max):
+        """
+        Input =
+            x: station positions (mm)
+            sfe_min, sfe_max: min and max shear at each station (N)
+            bme_min, bme_max: min and max moment at each station (N·mm)
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.sfe_min = np.asarray(sfe_min, dtype=float)
+        self.sfe_max = np.asarray(sfe_max, dtype=float)
+        self.bme_min = np.asarray(bme_min, dtype=float)
+        self.bme_max = np.asarray(bme_max, dtype=float)
+
+    @property
+    def V_env(self):
+        """max shear magnitude at each station"""
+        return np.maximum(np.abs(self.sfe_min), np.abs(self.sfe_max))
+
+    @property
+    def M_env(self):
+        """max moment magnitude at each station"""
+        return np.maximum(np.abs(self.bme_min), np.abs(self.bme_max))
+
+    def scaled(self, factor):
+        """
+        envelope for loads multiplied by factor (e.g. unit mass -> actual mass)
+        a negative factor swaps the min and the max
+        """
+        if factor >= 0:
+            return Envelope(self.x, self.sfe_min * factor, self.sfe_max * factor,
+                            self.bme_min * factor, self.bme_max * factor)
+        return Envelope(self.x, self.sfe_max * factor, self.sfe_min * factor,
+                        self.bme_max * factor, self.bme_min * factor)
+
+    def merge(self, other):
+        """
+        envelope covering both self and other (same stations)
+        """
+        return Envelope(self.x,
+                        np.minimum(self.sfe_min, other.sfe_min), np.maximum(self.sfe_max, other.sfe_max),
+                        np.minimum(self.bme_min, other.bme_min), np.maximum(self.bme_max, other.bme_max))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.names}
+
+    # dict style access for code that used the old dict of envelopes
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def keys(self):
+        return list(self.names)
+
+    def __len__(self):
+        return len(self.x)
+
+
+class EnvelopeBatch:
+    def __init__(self, x, loadcases, masses, values):
+        """
+        envelopes for many (loadcase, mass) pairs on the same stations
+
+        Input =
+            x: station positions (mm)
+            loadcases: loadcase (or TrainDefinition) for each pair
+            masses: mass for each pair
+            values: (pairs x 4 x stations) array, second axis in Envelope.names order
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.loadcases = list(loadcases)
+        self.masses = np.asarray(masses, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    def __len__(self):
+        return len(self.loadcases)
+
+    def __getitem__(self, i):
+        """Envelope for pair i"""
+        return Envelope(self.x, *self.values[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def sfe_min(self):
+        return self.values[:, 0]
+
+    @property
+    def sfe_max(self):
+        return self.values[:, 1]
+
+    @property
+    def bme_min(self):
+        return self.values[:, 2]
+
+    @property
+    def bme_max(self):
+        return self.values[:, 3]
+
+    def worst(self):
+        """
+        one envelope covering every pair (min of the mins, max of the maxes at each station)
+        """
+        return Envelope(self.x, self.sfe_min.min(axis=0), self.sfe_max.max(axis=0),
+                        self.bme_min.min(axis=0), self.bme_max.max(axis=0))
@@ -0,0 +1,118 @@
+"""
+envelope that can be refined with more train positions without redoing the ones already done
+
+    acc = EnvelopeAccumulator(2, 400)        # starts with 1000 evenly spaced train positions
+    acc.refine()                             # adds the midpoints between them (bisection), returns the change
+    env = acc.refine_until(tol=1e-4)         # keep bisecting until the envelope stops changing
+
+the change is the biggest difference in any of sfe_min, sfe_max, bme_min, bme_max at any station,
+relative to the biggest shear / moment magnitude in the envelope (so 1e-3 = 0.1% of the peak)
+"""
+
+import numpy as np
+from src.core.envelope import Envelope
+from src.core.influence_lines import get_influence_lines
+from src.core.BME_SFE import train_positions
+from src.core.station_grid import as_grid
+from src.core.train import as_train
+
+
+class EnvelopeAccumulator:
+    def __init__(self, loadcase, mass, num_train_positions=1000, num_points=10000, grid=None):
+        """
+        Input =
+            loadcase: 1, 2, 3 or a TrainDefinition
+            mass: total mass of train
+            num_train_positions: evenly spaced train positions to start with (default 1000)
+            num_points: number of stations along the bridge (default 10000)
+            grid: StationGrid (or array of stations), overrides num_points
+        """
+        self.loadcase = loadcase
+        self.mass = mass
+        self.train = as_train(loadcase)
+        self.grid = as_grid(grid, num_points)
+        self.influence_lines = get_influence_lines(grid=self.grid)
+
+        num_stations = len(self.grid)
+        self.sfe_min = np.full(num_stations, np.inf)
+        self.sfe_max = np.full(num_stations, -np.inf)
+        self.bme_min = np.full(num_stations, np.inf)
+        self.bme_max = np.full(num_stations, -np.inf)
+
+        self.positions = np.empty(0)
+        self.last_change = None
+        self.add_positions(train_positions(num_train_positions, loadcase))
+
+    @property
+    def num_positions(self):
+        return len(self.positions)
+
+    @property
+    def envelope(self):
+        """current envelope (copies, so later refinement doesn't change it)"""
+        return Envelope(self.grid.x, self.sfe_min.copy(), self.sfe_max.copy(),
+                        self.bme_min.copy(), self.bme_max.copy())
+
+    def add_positions(self, x_positions):
+        """
+        merge more train positions into the envelope (ones already done are skipped)
+
+        Input =
+            x_positions: leftmost wheel positions (mm)
+
+        Output =
+            relative change in the envelope (0 if nothing moved)
+        """
+        x_positions = np.unique(np.asarray(x_positions, dtype=float))
+        x_positions = x_positions[~np.isin(x_positions, self.positions)]
+        if len(x_positions) == 0:
+            self.last_change = 0.0
+            return self.last_change
+
+        new = self.influence_lines.envelope(self.train.wheel_positions(x_positions), self.train.wheel_loads(self.mass))
+        old = (self.sfe_min.copy(), self.sfe_max.copy(), self.bme_min.copy(), self.bme_max.copy())
+
+        np.minimum(self.sfe_min, new.sfe_min, out=self.sfe_min)
+        np.maximum(self.sfe_max, new.sfe_max, out=self.sfe_max)
+        np.minimum(self.bme_min, new.bme_min, out=self.bme_min)
+        np.maximum(self.bme_max, new.bme_max, out=self.bme_max)
+        self.positions = np.union1d(self.positions, x_positions)
+
+        self.last_change = self._change(old)
+        return self.last_change
+
+    def refine(self):
+        """
+        add the midpoint between every pair of neighbouring train positions (halves the spacing)
+
+        Output =
+            relative change in the envelope
+        """
+        return self.add_positions((self.positions[:-1] + self.positions[1:]) / 2)
+
+    def refine_until(self, tol=1e-4, max_positions=100000):
+        """
+        keep refining until the envelope changes by less than tol (or max_positions is hit)
+
+        Input =
+            tol: relative change to stop at (default 1e-4)
+            max_positions: stop before the number of train positions goes past this
+
+        Output =
+            the converged Envelope
+        """
+        while 2 * self.num_positions - 1 <= max_positions:
+            if self.refine() < tol:
+                break
+        return self.envelope
+
+    def _change(self, old):
+        # biggest move of any envelope value, relative to the peak shear / moment
+        if not np.all(np.isfinite(old[0])):
+            return float('inf')
+
+        V_scale = max(np.abs(self.sfe_min).max(), np.abs(self.sfe_max).max(), 1e-12)
+        M_scale = max(np.abs(self.bme_min).max(), np.abs(self.bme_max).max(), 1e-12)
+        V_change = max(np.abs(self.sfe_min - old[0]).max(), np.abs(self.sfe_max - old[1]).max()) / V_scale
+        M_change = max(np.abs(self.bme_min - old[2]).max(), np.abs(self.bme_max - old[3]).max()) / M_scale
+        return float(max(V_change, M_change))
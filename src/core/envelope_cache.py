@@ -0,0 +1,308 @@
+"""
+process-wide cache of shear and moment envelopes
+
+every wheel load in get_wheel_loads is proportional to mass, so the envelopes are too.
+the cache stores the envelopes for a 1N train and scales them by mass on lookup,
+so a mass sweep (or changing mass in the designer) only pays for the first lookup.
+
+cache key = wheel offsets + load fractions (TrainDefinition.key for the loadcase),
+station grid (grid.key), number of train positions and method
+
+the unit envelopes are also saved to disk as .npy files (one per key) so the next
+python process just memory maps them instead of recomputing.
+file names are a hash of the key + support positions + bridge length + a fingerprint of the
+code that makes the envelopes (the source of the modules in ENVELOPE_SOURCES), so changing the
+train, the supports or that code points at a different file and old entries are never used.
+entries left behind by other code versions are pruned the first time this process saves one.
+cache directory is BRIDGE_ENVELOPE_CACHE_DIR if set (set it to an empty string to turn the
+disk cache off), otherwise bridge_envelopes in the user cache dir ($XDG_CACHE_HOME or ~/.cache)
+
+get_envelope_batch does many (loadcase, mass) pairs in one call: each loadcase's unit envelopes
+are worked out once (with the shared influence lines) and every pair is just a scale of them
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import numpy as np
+from src.core.train import TrainDefinition, as_train
+from src.core.envelope import Envelope, EnvelopeBatch
+from src.core.station_grid import as_grid
+from src.core.influence_lines import influence_envelopes
+from src.core.BME_SFE import train_positions, exact_envelopes
+
+_unit_envelopes = {}
+
+# station grids seen so far by key, so a key read back from disk can be turned into stations again
+_grids = {}
+
+# modules whose code decides what the envelopes come out as, any change to them means new files
+ENVELOPE_SOURCES = [
+    'src.core.envelope',
+    'src.core.station_grid',
+    'src.core.train',
+    'src.core.reactions_BMD_SFD',
+    'src.core.influence_lines',
+    'src.core.BME_SFE',
+]
+
+ENVELOPE_NAMES = list(Envelope.names)
+
+_code_fingerprint = None
+
+# cache directories this process has already pruned
+_pruned = set()
+
+def get_cache_dir():
+    """
+    directory for the on-disk envelope store (None if turned off)
+    """
+    user_cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    default = os.path.join(user_cache, 'bridge_envelopes')
+    cache_dir = os.environ.get('BRIDGE_ENVELOPE_CACHE_DIR', default)
+    return cache_dir or None
+
+
+def code_fingerprint():
+    """
+    hash of the source of every module in ENVELOPE_SOURCES (worked out once per process)
+    """
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha1()
+        for name in ENVELOPE_SOURCES:
+            with open(importlib.import_module(name).__file__, 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read() + b'\0')
+        _code_fingerprint = digest.hexdigest()
+    return _code_fingerprint
+
+
+def _disk_key(key):
+    """
+    everything the unit envelopes depend on, as a json string and its hash
+    """
+    train, grid_key, num_train_positions, method = key
+    description = json.dumps({
+        'code': code_fingerprint(),
+        'wheel_offsets': train[0],
+        'load_fractions': train[1],
+        'supports': [25, 1225],
+        'bridge_length': 1250,
+        'grid': grid_key,
+        'num_train_positions': num_train_positions,
+        'method': method
+    }, sort_keys=True)
+    return description, hashlib.sha1(description.encode()).hexdigest()
+
+
+def _load_from_disk(key):
+    """
+    memory map the unit envelopes for key, or None if they aren't there (or don't match)
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+
+    description, digest = _disk_key(key)
+    path = os.path.join(cache_dir, digest + '.npy')
+    meta_path = os.path.join(cache_dir, digest + '.json')
+    try:
+        with open(meta_path) as f:
+            if f.read() != description:
+                return None
+        stacked = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+    stations = _grids[key[1]].x
+    if stacked.shape != (len(ENVELOPE_NAMES), len(stations)):
+        return None
+    return Envelope(stations, *stacked)
+
+
+def _save_to_disk(key, envelopes):
+    """
+    save unit envelopes for key (quietly does nothing if the directory isn't writable)
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return
+
+    description, digest = _disk_key(key)
+    path = os.path.join(cache_dir, digest + '.npy')
+    meta_path = os.path.join(cache_dir, digest + '.json')
+    stacked = np.stack([envelopes[name] for name in ENVELOPE_NAMES])
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if cache_dir not in _pruned:
+            prune_disk_cache(cache_dir)
+            _pruned.add(cache_dir)
+        # write to temp files first so another process never sees half a file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, stacked)
+        os.replace(tmp_path, path)
+        tmp_meta = f'{meta_path}.{os.getpid()}.tmp'
+        with open(tmp_meta, 'w') as f:
+            f.write(description)
+        os.replace(tmp_meta, meta_path)
+    except OSError:
+        pass
+
+
+def prune_disk_cache(cache_dir=None):
+    """
+    remove files on disk that this code would never load again: entries made by a different
+    version of the envelope code and ones whose description can't be read
+    (an envelope with no description yet could be mid-save in another process, so it's left alone)
+
+    Input =
+        cache_dir: directory to prune (default get_cache_dir())
+
+    Output =
+        number of entries removed
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return 0
+
+    names = set(os.listdir(cache_dir))
+    digests = {name[:-4] for name in names if name.endswith('.npy')} | {name[:-5] for name in names if name.endswith('.json')}
+    removed = 0
+    for digest in digests:
+        meta_path = os.path.join(cache_dir, digest + '.json')
+        try:
+            with open(meta_path) as f:
+                stale = json.load(f).get('code') != code_fingerprint()
+        except FileNotFoundError:
+            # the envelope is written before its description, so this could be mid-save
+            continue
+        except (OSError, ValueError, AttributeError):
+            stale = True
+        if not stale:
+            continue
+        for path in (os.path.join(cache_dir, digest + '.npy'), meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        removed += 1
+    return removed
+
+
+def envelope_key(loadcase, num_train_positions=1000, num_points=10000, method='sampled', grid=None):
+    """
+    cache key for a loadcase's unit mass envelopes
+    """
+    grid = as_grid(grid, num_points)
+    _grids.setdefault(grid.key, grid)
+    return (as_train(loadcase).key, grid.key, num_train_positions if method == 'sampled' else None, method)
+
+
+def get_unit_envelopes(loadcase, num_train_positions=1000, num_points=10000, method='sampled', grid=None):
+    """
+    get (or calculate once) the envelopes for a 1N train
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        num_train_positions: number of train positions for the sampled method (default 1000)
+        num_points: number of stations along the bridge (default 10000)
+        method: 'sampled' or 'exact'
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Output =
+        Envelope for a 1N train (don't modify its arrays)
+    """
+    key = envelope_key(loadcase, num_train_positions, num_points, method, grid)
+    grid = _grids[key[1]]
+    if key not in _unit_envelopes:
+        envelopes = _load_from_disk(key)
+        if envelopes is None:
+            if method == 'exact':
+                envelopes = exact_envelopes(loadcase, 1.0, grid=grid)
+            else:
+                envelopes = influence_envelopes(loadcase, 1.0, train_positions(num_train_positions, loadcase), grid=grid)
+            _save_to_disk(key, envelopes)
+        _unit_envelopes[key] = envelopes
+    return _unit_envelopes[key]
+
+
+def get_envelopes(loadcase, mass, num_train_positions=1000, num_points=10000, method='sampled', grid=None):
+    """
+    shear and moment envelopes for a train of the given mass (scaled from the cached unit envelopes)
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_train_positions: number of train positions for the sampled method (default 1000)
+        num_points: number of stations along the bridge (default 10000)
+        method: 'sampled' or 'exact'
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Output =
+        Envelope with sfe_min, sfe_max, bme_min, bme_max arrays (also V_env and M_env)
+    """
+    return get_unit_envelopes(loadcase, num_train_positions, num_points, method, grid).scaled(mass)
+
+
+def get_envelope_batch(loadcases, masses=None, num_train_positions=1000, num_points=10000, method='sampled', grid=None):
+    """
+    shear and moment envelopes for many (loadcase, mass) pairs at once
+
+    Input =
+        loadcases: list of (loadcase, mass) pairs, or a list of loadcases (or one loadcase) if masses is given
+        masses: list of masses (or one mass) to go with loadcases, None if loadcases is a list of pairs
+        num_train_positions: number of train positions for the sampled method (default 1000)
+        num_points: number of stations along the bridge (default 10000)
+        method: 'sampled' or 'exact'
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Output =
+        EnvelopeBatch, batch[i] is the Envelope for pair i and batch.worst() covers all of them
+    """
+    if masses is None:
+        loadcases, masses = zip(*loadcases)
+    else:
+        if np.ndim(masses) == 0:
+            masses = [masses] * (1 if _is_single_loadcase(loadcases) else len(loadcases))
+        if _is_single_loadcase(loadcases):
+            loadcases = [loadcases] * len(masses)
+    loadcases = list(loadcases)
+    masses = np.asarray(masses, dtype=float)
+    if len(loadcases) != len(masses):
+        raise ValueError("need one mass per loadcase")
+
+    # unit envelopes once per distinct train, stacked as (trains x 4 x stations)
+    keys = [as_train(lc).key for lc in loadcases]
+    unique = {}
+    for key, lc in zip(keys, loadcases):
+        unique.setdefault(key, lc)
+    unit = {key: get_unit_envelopes(lc, num_train_positions, num_points, method, grid) for key, lc in unique.items()}
+    stacked = np.stack([np.stack([unit[key][name] for name in ENVELOPE_NAMES]) for key in unique])
+    index = np.array([list(unique).index(key) for key in keys], dtype=int)
+
+    # scale every pair at once, a negative mass swaps the mins and maxes
+    values = stacked[index] * masses[:, None, None]
+    swapped = values[:, [1, 0, 3, 2]]
+    values = np.where((masses < 0)[:, None, None], swapped, values)
+
+    x = next(iter(unit.values())).x
+    return EnvelopeBatch(x, loadcases, masses, values)
+
+
+def _is_single_loadcase(loadcases):
+    return isinstance(loadcases, (int, np.integer, TrainDefinition))
+
+
+def clear_envelope_cache(disk=False):
+    """
+    empty the in-memory cache, and the files on disk too if disk=True
+    """
+    _unit_envelopes.clear()
+
+    cache_dir = get_cache_dir()
+    if disk and cache_dir is not None and os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith('.npy') or name.endswith('.json'):
+                os.remove(os.path.join(cache_dir, name))
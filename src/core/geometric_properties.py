@@ -6,8 +6,217 @@ I = second moment of area
 Q = first moment of area above a cut
 width = total width at a y level
 glue_width = area between plates at a given spot (area for glue to be on)
+
+Section keeps the plates as numpy arrays (b, h, x, y, plate_type) and caches y_bar, I etc,
+so building it once and asking for lots of properties is much cheaper than the plate dict functions.
+Q_profile / width_profile / shear_profile do a whole array of y levels at once (sorted edges + prefix sums)
+and max_shear_stress finds the true max shear stress and where it is (not just at the centroid).
+the functions below take a list of plate dicts (or a Section) and just use a Section underneath.
 """
 
+import numpy as np
+
+
+class Section:
+    def __init__(self, b, h, x, y, plate_type=None):
+        """
+        Input =
+            b, h: width and height of each plate (mm)
+            x, y: center of each plate (mm)
+            plate_type: plate type of each plate ('web', 'top_flange', ...), None if unknown
+        """
+        self.b = np.asarray(b, dtype=float)
+        self.h = np.asarray(h, dtype=float)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.plate_type = np.asarray(plate_type if plate_type is not None else [None] * len(self.b), dtype=object)
+
+        # per plate edges and areas are cheap so they're done up front
+        self.area = self.b * self.h
+        self.tops = self.y + self.h / 2
+        self.bottoms = self.y - self.h / 2
+        self.lefts = self.x - self.b / 2
+        self.rights = self.x + self.b / 2
+        self.total_area = float(self.area.sum())
+
+        # derived properties are worked out the first time they're asked for
+        self._y_bar = None
+        self._I = None
+        self._Q = {}
+        self._width = {}
+        self._glue_width = {}
+        self._edge_sums = None
+
+    @classmethod
+    def from_plates(cls, plates):
+        """
+        Section from a list of plate dicts ('b', 'h', 'x', 'y' and optionally 'plate_type')
+        """
+        values = np.array([(p['b'], p['h'], p['x'], p['y']) for p in plates], dtype=float).reshape(-1, 4)
+        return cls(*values.T, plate_type=[p.get('plate_type') for p in plates])
+
+    def __len__(self):
+        return len(self.b)
+
+    @property
+    def y_max(self):
+        """top of the section (mm)"""
+        return float(self.tops.max())
+
+    @property
+    def y_min(self):
+        """bottom of the section (mm)"""
+        return float(self.bottoms.min())
+
+    @property
+    def y_bar(self):
+        """distance from bottom y=0 to neutral axis (mm)"""
+        if self._y_bar is None:
+            # division by zero protection
+            if self.total_area < 1e-9:
+                self._y_bar = 0.0
+            else:
+                self._y_bar = float(np.dot(self.area, self.y) / self.total_area)
+        return self._y_bar
+
+    @property
+    def I(self):
+        """second moment of area about the neutral axis (mm^4)"""
+        if self._I is None:
+            # Parallel Axis Theorem: I = I_local + A * d^2
+            d = self.y - self.y_bar
+            self._I = float((self.b * self.h**3 / 12 + self.area * d**2).sum())
+        return self._I
+
+    def Q(self, y_cut):
+        """
+        first moment of area above y_cut about the neutral axis (mm^3)
+        """
+        if y_cut not in self._Q:
+            # height of each plate above the cut (0 if below, h if completely above)
+            h_above = np.clip(self.tops - y_cut, 0.0, self.h)
+            y_center = self.tops - h_above / 2
+            self._Q[y_cut] = float(np.dot(self.b * h_above, y_center - self.y_bar))
+        return self._Q[y_cut]
+
+    def width(self, y_cut):
+        """
+        total width of the section at y_cut (mm), plates touching y_cut count
+        """
+        if y_cut not in self._width:
+            inside = (self.bottoms <= y_cut) & (y_cut <= self.tops)
+            self._width[y_cut] = float(self.b[inside].sum())
+        return self._width[y_cut]
+
+    def glue_width(self, y_glue):
+        """
+        glue contact width at a joint (mm): overlap of plates ending at y_glue with plates starting at y_glue
+        """
+        if y_glue not in self._glue_width:
+            above = np.abs(self.bottoms - y_glue) < 1e-6
+            below = np.abs(self.tops - y_glue) < 1e-6
+            total = 0.0
+            if above.any() and below.any():
+                overlap = (np.minimum(self.rights[below][:, None], self.rights[above][None, :])
+                           - np.maximum(self.lefts[below][:, None], self.lefts[above][None, :]))
+                total = float(overlap[overlap > 0].sum())
+            self._glue_width[y_glue] = total
+        return self._glue_width[y_glue]
+
+    def _sorted_edges(self):
+        # plate tops and bottoms sorted once, with prefix sums of b and b*(edge - ybar)^2/2
+        if self._edge_sums is None:
+            sums = []
+            for edges in (self.tops, self.bottoms):
+                order = np.argsort(edges, kind='stable')
+                b = self.b[order]
+                F = b * (edges[order] - self.y_bar)**2 / 2
+                sums.append((edges[order], np.concatenate([[0.0], np.cumsum(b)]), np.concatenate([[0.0], np.cumsum(F)])))
+            self._edge_sums = sums
+        return self._edge_sums
+
+    def Q_profile(self, y_levels):
+        """
+        Q above each of y_levels in one go (same values as Q, but O(log plates) per level)
+
+        Q(y) = sum over plates of b * integral from max(y, bottom) to top of (eta - ybar) d eta
+        so with F = b*(edge - ybar)^2/2 it is sum F(tops above y) - sum F(bottoms above y)
+        minus (y - ybar)^2/2 * (width of the plates cut by y)
+        """
+        y_levels = np.asarray(y_levels, dtype=float)
+        (tops, top_b, top_F), (bottoms, bot_b, bot_F) = self._sorted_edges()
+
+        k = np.searchsorted(tops, y_levels, side='right')      # tops above y are k..end
+        j = np.searchsorted(bottoms, y_levels, side='left')    # bottoms at or above y are j..end
+        F_tops = top_F[-1] - top_F[k]
+        F_bottoms = bot_F[-1] - bot_F[j]
+        b_cut = (top_b[-1] - top_b[k]) - (bot_b[-1] - bot_b[j])
+
+        return F_tops - F_bottoms - (y_levels - self.y_bar)**2 / 2 * b_cut
+
+    def width_profile(self, y_levels):
+        """
+        width at each of y_levels (plates touching the level count, same as width)
+        """
+        y_levels = np.asarray(y_levels, dtype=float)
+        (tops, top_b, _), (bottoms, bot_b, _) = self._sorted_edges()
+
+        # plates with bottom <= y minus plates with top < y
+        return bot_b[np.searchsorted(bottoms, y_levels, side='right')] - top_b[np.searchsorted(tops, y_levels, side='left')]
+
+    def shear_profile(self, V, y_levels):
+        """
+        shear stress tau = VQ/Ib at each of y_levels (MPa), 0 where there is no material
+        """
+        Q_vals = self.Q_profile(y_levels)
+        b_vals = self.width_profile(y_levels)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = np.where(b_vals > 0, V * Q_vals / (self.I * b_vals), 0.0)
+        return tau
+
+    def max_shear_stress(self, V):
+        """
+        largest shear stress anywhere in the section and where it is
+
+        between plate edges the width is constant and Q is a parabola peaking at ybar,
+        so the max is at an edge (just inside the narrower side) or at ybar
+
+        Output =
+            tau_max (MPa), y of tau_max (mm)
+        """
+        edges = np.unique(np.concatenate([self.tops, self.bottoms]))
+        if len(edges) < 2 or self.I <= 0:
+            return 0.0, self.y_bar
+
+        lo, hi = edges[:-1], edges[1:]
+        b_inside = self.width_profile((lo + hi) / 2)
+        at_ybar = np.clip(self.y_bar, lo, hi)
+
+        candidates = np.concatenate([lo, hi, at_ybar])
+        b_vals = np.tile(b_inside, 3)
+        Q_vals = self.Q_profile(candidates)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = np.where(b_vals > 0, abs(V) * Q_vals / (self.I * b_vals), 0.0)
+
+        i = int(np.argmax(tau))
+        return float(tau[i]), float(candidates[i])
+
+    def of_type(self, plate_type):
+        """
+        bool mask of the plates with the given plate_type
+        """
+        return self.plate_type == plate_type
+
+
+def as_section(plates):
+    """
+    Section for a list of plate dicts (or the Section itself)
+    """
+    if isinstance(plates, Section):
+        return plates
+    return Section.from_plates(plates)
+
+
 def y_bar(plates):
     """
     calculate the neutral axis (ybar) of the crosssection
@@ -18,19 +227,7 @@ def y_bar(plates):
     Outputs =
         y_bar is the distance from bottom y=0 to neutral axis (mm)
     """
-    total_area = 0
-    sum_ay = 0
-
-    for plate in plates:
-        area = plate['b'] * plate['h']
-        total_area += area
-        sum_ay += area * plate['y']
-
-    # division by zero protection
-    if total_area < 1e-9:
-        return 0.0
-
-    return sum_ay / total_area
+    return as_section(plates).y_bar
 
 def I(plates):
     """
@@ -42,23 +239,7 @@ def I(plates):
     Outputs = 
         I (mm^4)
     """
-    ybar = y_bar(plates)
-    
-    I_total = 0
-    
-    for plate in plates:
-        b = plate['b']
-        h = plate['h']
-        y = plate['y']
-        area = b * h
-        
-        # Parallel Axis Theorem: I = I_local + A * d^2
-        I_local = (b * h**3) / 12
-        d = y - ybar
-        
-        I_total += I_local + area * d**2
-        
-    return I_total
+    return as_section(plates).I
 
 def Q(plates, y_cut):
     """
@@ -71,39 +252,7 @@ def Q(plates, y_cut):
     Outputs = 
         Q above y_cut (mm^3)
     """
-    ybar = y_bar(plates)
-    
-    Q_total = 0
-    
-    for plate in plates:
-        b = plate['b']
-        h = plate['h']
-        y_center = plate['y']
-        
-        y_top = y_center + h / 2
-        y_bottom = y_center - h / 2
-        
-        # check if plate is completely below y_cut
-        if y_top <= y_cut:
-            continue
-            
-        # check if plate is completely above y_cut
-        elif y_bottom >= y_cut:
-            area = b * h
-            d = y_center - ybar
-            Q_total += area * d
-            
-        # plate is cut by y_cut
-        else:
-            # calculate stuff for portion above y_cut
-            h_above = y_top - y_cut
-            y_center_above = y_cut + h_above / 2
-            
-            area_above = b * h_above
-            d = y_center_above - ybar
-            Q_total += area_above * d
-            
-    return Q_total
+    return as_section(plates).Q(y_cut)
 
 def width(plates, y_cut):
     """
@@ -116,18 +265,7 @@ def width(plates, y_cut):
     Outputs =
         total_width (mm)
     """
-    total_width = 0
-    for plate in plates:
-        h = plate['h']
-        y_center = plate['y']
-        y_top = y_center + h / 2
-        y_bottom = y_center - h / 2
-
-        # check if y_cut is within the vertical range of the plate
-        if y_bottom <= y_cut <= y_top:
-             total_width += plate['b']
-
-    return total_width
+    return as_section(plates).width(y_cut)
 
 def glue_width(plates, y_glue):
     """
@@ -141,41 +279,4 @@ def glue_width(plates, y_glue):
     Outputs =
         glue_width is the total width of the contact are (mm)
     """
-    # find plates with bottom edge at y_glue (plates above the joint)
-    plates_above = []
-    for plate in plates:
-        y_bottom = plate['y'] - plate['h'] / 2
-        if abs(y_bottom - y_glue) < 1e-6:
-            plates_above.append(plate)
-
-    # find plates with top edge at y_glue (plates below the joint)
-    plates_below = []
-    for plate in plates:
-        y_top = plate['y'] + plate['h'] / 2
-        if abs(y_top - y_glue) < 1e-6:
-            plates_below.append(plate)
-
-    # if no plates meet at this joint area is 0
-    if not plates_above or not plates_below:
-        return 0.0
-
-    # for each plate below, find the overlap with plates above
-    total_overlap = 0.0
-
-    for plate_below in plates_below:
-        # get horizontal are of plate below
-        x_below_left = plate_below['x'] - plate_below['b'] / 2
-        x_below_right = plate_below['x'] + plate_below['b'] / 2
-
-        for plate_above in plates_above:
-            x_above_left = plate_above['x'] - plate_above['b'] / 2
-            x_above_right = plate_above['x'] + plate_above['b'] / 2
-
-            # calc overlap
-            overlap_left = max(x_below_left, x_above_left)
-            overlap_right = min(x_below_right, x_above_right)
-
-            if overlap_right > overlap_left:
-                total_overlap += (overlap_right - overlap_left)
-
-    return total_overlap
+    return as_section(plates).glue_width(y_glue)
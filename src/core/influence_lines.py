@@ -0,0 +1,184 @@
+"""
+influence lines for shear and moment on the bridge (supports at 25mm and 1225mm)
+
+for a unit load at p (0 <= p <= 1250) the reactions are linear in p:
+    RA(p) = (1225 - p) / 1200
+    RB(p) = (p - 25) / 1200
+
+so at a station s:
+    V(s, p) = RA(p)*[s >= 25] + RB(p)*[s >= 1225] - [s >= p]
+    M(s, p) = RA(p)*(s - 25)+ + RB(p)*(s - 1225)+ - (s - p)+
+
+the reaction part is c0(s) + c1(s)*p, so for a whole train it only needs
+the total load on the bridge and the total load*position (a (positions x 2) @ (2 x stations) product).
+the local part (the step / ramp under each wheel) is a running sum along the stations.
+
+only the reaction coefficients are precomputed, not full unit load V / M influence matrices
+(stations x load positions would be 10,000 x 10,000 per grid), the rest is cheap to do per train.
+
+this is built once per station grid and then reused for any train, loadcase or mass. the grids kept
+are an LRU (adaptive and preview grids would otherwise pile up for the life of the process).
+"""
+
+import numpy as np
+from src.core.train import as_train
+from src.core.envelope import Envelope
+from src.core.station_grid import as_grid
+from src.core.section_cache import LRUCache
+
+
+class InfluenceLines:
+    def __init__(self, stations, support_A=25, support_B=1225, bridge_length=1250):
+        """
+        precompute the influence coefficients for a set of stations
+
+        Input =
+            stations: sorted array of station positions (mm)
+            support_A, support_B: support positions (mm)
+            bridge_length: length of bridge (mm)
+        """
+        self.stations = np.asarray(stations, dtype=float)
+        self.support_A = support_A
+        self.support_B = support_B
+        self.bridge_length = bridge_length
+
+        span = support_B - support_A
+        s = self.stations
+
+        # RA(p) = a0 + a1*p, RB(p) = b0 + b1*p
+        a0, a1 = support_B / span, -1 / span
+        b0, b1 = -support_A / span, 1 / span
+
+        past_A = (s >= support_A).astype(float)
+        past_B = (s >= support_B).astype(float)
+        arm_A = np.where(s >= support_A, s - support_A, 0.0)
+        arm_B = np.where(s >= support_B, s - support_B, 0.0)
+
+        # rows are the constant and the p coefficient of the reaction part
+        self.V_coeffs = np.array([a0 * past_A + b0 * past_B,
+                                  a1 * past_A + b1 * past_B])
+        self.M_coeffs = np.array([a0 * arm_A + b0 * arm_B,
+                                  a1 * arm_A + b1 * arm_B])
+
+    def unit_load(self, p):
+        """
+        influence lines for a single unit load at p
+
+        Input =
+            p: position of the unit load (mm)
+
+        Outputs =
+            V, M: arrays of shear and moment at each station for a 1N load at p
+        """
+        V, M = self.response(np.array([[p]], dtype=float), np.array([1.0]))
+        return V[0], M[0]
+
+    def response(self, wheel_positions, wheel_loads):
+        """
+        shear and moment at every station for every train position
+
+        Input =
+            wheel_positions: (positions x wheels) array of wheel positions (mm)
+            wheel_loads: (wheels,) array of wheel loads (N)
+
+        Outputs =
+            V, M: (positions x stations) arrays
+        """
+        wheel_positions = np.asarray(wheel_positions, dtype=float)
+        wheel_loads = np.asarray(wheel_loads, dtype=float)
+        num_positions = wheel_positions.shape[0]
+        num_stations = len(self.stations)
+
+        on_bridge = (wheel_positions >= 0) & (wheel_positions <= self.bridge_length)
+        active_loads = np.where(on_bridge, wheel_loads, 0.0)
+
+        # reaction part: total load and total load*position on the bridge
+        totals = np.stack([active_loads.sum(axis=1),
+                           (active_loads * wheel_positions).sum(axis=1)], axis=1)
+        V = totals @ self.V_coeffs
+        M = totals @ self.M_coeffs
+
+        # local part: each wheel kicks in at the first station at or past it
+        first_station = np.searchsorted(self.stations, wheel_positions, side='left')
+        load_steps = np.zeros((num_positions, num_stations + 1))
+        moment_steps = np.zeros((num_positions, num_stations + 1))
+        rows = np.arange(num_positions)
+        for i in range(wheel_positions.shape[1]):
+            load_steps[rows, first_station[:, i]] += active_loads[:, i]
+            moment_steps[rows, first_station[:, i]] += active_loads[:, i] * wheel_positions[:, i]
+
+        passed_load = np.cumsum(load_steps[:, :-1], axis=1)
+        passed_moment = np.cumsum(moment_steps[:, :-1], axis=1)
+
+        V -= passed_load
+        M -= self.stations * passed_load - passed_moment
+
+        return V, M
+
+    def envelope(self, wheel_positions, wheel_loads, chunk_size=None):
+        """
+        min and max shear and moment at each station over all the train positions
+
+        Input =
+            wheel_positions: (positions x wheels) array of wheel positions (mm)
+            wheel_loads: (wheels,) array of wheel loads (N)
+            chunk_size: train positions per chunk (default keeps chunks around 2 million floats)
+
+        Outputs =
+            Envelope with sfe_min, sfe_max, bme_min, bme_max arrays
+        """
+        wheel_positions = np.asarray(wheel_positions, dtype=float)
+        num_stations = len(self.stations)
+        if chunk_size is None:
+            chunk_size = max(1, 2000000 // num_stations)
+
+        sfe_min = np.full(num_stations, np.inf)
+        sfe_max = np.full(num_stations, -np.inf)
+        bme_min = np.full(num_stations, np.inf)
+        bme_max = np.full(num_stations, -np.inf)
+
+        for start in range(0, wheel_positions.shape[0], chunk_size):
+            V, M = self.response(wheel_positions[start:start + chunk_size], wheel_loads)
+            np.minimum(sfe_min, V.min(axis=0), out=sfe_min)
+            np.maximum(sfe_max, V.max(axis=0), out=sfe_max)
+            np.minimum(bme_min, M.min(axis=0), out=bme_min)
+            np.maximum(bme_max, M.max(axis=0), out=bme_max)
+
+        return Envelope(self.stations, sfe_min, sfe_max, bme_min, bme_max)
+
+
+# influence lines are built once per station grid and reused (most recently used grids kept)
+_influence_lines = LRUCache(maxsize=8)
+
+def get_influence_lines(num_points=10000, grid=None):
+    """
+    get (or build once) the influence lines for a station grid
+    (num_points evenly spaced stations if no grid is given)
+    """
+    grid = as_grid(grid, num_points)
+    return _influence_lines.get(grid.key, lambda: InfluenceLines(grid.x))
+
+
+def clear_influence_lines():
+    """
+    forget the influence lines built so far
+    """
+    _influence_lines.clear()
+
+
+def influence_envelopes(loadcase, mass, x_positions, num_points=10000, grid=None):
+    """
+    shear and moment envelopes for a train from the precomputed influence lines
+
+    Input =
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        x_positions: array of leftmost wheel positions (mm)
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        Envelope with sfe_min, sfe_max, bme_min, bme_max arrays
+    """
+    train = as_train(loadcase)
+    return get_influence_lines(num_points, grid).envelope(train.wheel_positions(x_positions), train.wheel_loads(mass))
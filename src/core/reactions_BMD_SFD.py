@@ -7,8 +7,8 @@ Input =
     mass: mass of all trains
 
  reactions(x, loadcase, mass): returns RA and RB
-SFDvals: returns shear force at 10,000 evenly spaced points
-BMDvals: returns moment at 10,000 evenly spaced points
+SFDvals: returns shear force at 10,000 evenly spaced points (or at the stations of a StationGrid)
+BMDvals: returns moment at 10,000 evenly spaced points (or at the stations of a StationGrid)
 
 Assumptions
     - bridge is 1250 mm long
@@ -33,67 +33,41 @@ Assumptions
     - same as load case 2, but:
     - rightmost car is a heavy freight car, 1.1 x the weight of the light freight car (which is in the middle)
     - leftmost car is the locomotive, 1.38x the wieght of the heavy freight car or 1.38x1.1 the wight of the light middle freight car
+
+    the load cases are TrainDefinitions (train.py), anything that takes loadcase also takes a TrainDefinition
+
+batched versions (many train positions at once, numpy):
+    SFDmatrix / BMDmatrix: (positions x stations) shear / moment matrix
+    SFDminmax / BMDminmax: same thing reduced straight to min and max at each station
+    SFD_BMDminmax: both at once, sharing the reactions and wheel loads for each position
+    point_values: shear and moment at given stations for given train positions (pairwise)
+
+knot based versions (see diagrams.py):
+    SFDdiagram / BMDdiagram: PiecewiseDiagram for one train position
 """
 
+import numpy as np
+from src.core.diagrams import point_load_diagrams
+from src.core.station_grid import as_grid
+from src.core.train import as_train
+
 def get_wheel_loads(x, loadcase, mass):
     """
     calculate wheel positions and loads for a the load case
 
     Input =
         x: position of leftmost wheel (mm from left edge of bridge)
-        loadcase: 1, 2, or 3
+        loadcase: 1, 2, 3 or a TrainDefinition
         mass: total mass of train
 
     Outputs =
-        wheel_positions is a list of 6 wheel positions (mm)
-        wheel_loads is a list of 6 wheel loads (N)
-    """
-    # wheel positions (same for all load cases)
-    wheel_positions = [
-        x,
-        x + 176,
-        x + 176 + 164,
-        x + 176 + 164 + 176,
-        x + 176 + 164 + 176 + 164,
-        x + 176 + 164 + 176 + 164 + 176
-    ]
-
-    # calculate wheel loads based on load case
-    if loadcase == 1:
-        # load case 1: all cars equal mass
-        wheel_loads = [mass / 6] * 6
-
-    elif loadcase == 2:
-        # load case 2: locomotive + 2 regular cars
-        locomotive_ratio = 1.35
-        regular_ratio = 1.0
-
-        total_ratio = locomotive_ratio + 2 * regular_ratio
-        mass_regular_car = mass / total_ratio
-        mass_locomotive = locomotive_ratio * mass_regular_car
-
-        wheel_loads = [
-            mass_locomotive / 2, mass_locomotive / 2,      # leftmost car (locomotive)
-            mass_regular_car / 2, mass_regular_car / 2,    # middle car (regular)
-            mass_regular_car / 2, mass_regular_car / 2     # rightmost car (regular)
-        ]
-
-    elif loadcase == 3:
-        # load case 3: locomotive + light freight + heavy freight
-        light_freight_ratio = 1.0
-        heavy_freight_ratio = 1.1 * light_freight_ratio
-        locomotive_ratio = 1.38 * heavy_freight_ratio
-
-        total_ratio = locomotive_ratio + light_freight_ratio + heavy_freight_ratio
-        mass_light_freight = mass / total_ratio
-        mass_heavy_freight = heavy_freight_ratio * mass_light_freight
-        mass_locomotive = locomotive_ratio * mass_light_freight
-
-        wheel_loads = [
-            mass_locomotive / 2, mass_locomotive / 2,           # leftmost car (locomotive)
-            mass_light_freight / 2, mass_light_freight / 2,     # middle car (light freight)
-            mass_heavy_freight / 2, mass_heavy_freight / 2      # rightmost car (heavy freight)
-        ]
+        wheel_positions is a list of wheel positions (mm), 6 for the standard load cases
+        wheel_loads is a list of wheel loads (N)
+    """
+    # offsets and load fractions come from the train definition (see train.py)
+    train = as_train(loadcase)
+    wheel_positions = [x + offset for offset in train.offsets.tolist()]
+    wheel_loads = train.wheel_loads(mass).tolist()
 
     return wheel_positions, wheel_loads
 
@@ -104,7 +78,7 @@ def reactions(x, loadcase, mass):
 
     Input =
         x: position of leftmost wheel (mm from left edge of bridge)
-        loadcase: 1, 2, or 3
+        loadcase: 1, 2, 3 or a TrainDefinition
         mass: total mass of train
 
     Outputs =
@@ -138,17 +112,18 @@ def reactions(x, loadcase, mass):
 
     return RA, RB
 
-def SFDvals(x, loadcase, mass):
+def SFDvals(x, loadcase, mass, grid=None):
     """
     calculate shear force at 10,000 evenly spaced points
 
     Input =
         x: position of leftmost wheel (mm from left edge of bridge)
-        loadcase: 1, 2, or 3
+        loadcase: 1, 2, 3 or a TrainDefinition
         mass: total mass of train
+        grid: StationGrid (or array of stations) to evaluate at, default 10,000 evenly spaced points
 
     Outputs =
-        sfd is a list of shear force values at 10,000 points from 0 to 1250 mm
+        sfd is a list of shear force values at each station (10,000 points from 0 to 1250 mm by default)
     """
     # get reaction forces and wheel loads
     RA, RB = reactions(x, loadcase, mass)
@@ -158,10 +133,9 @@ def SFDvals(x, loadcase, mass):
     support_A = 25    # mm from left
     support_B = 1225  # mm from left
 
-    # create 10,000 evenly spaced points from 0 to 1250
-    num_points = 10000
+    # stations along the bridge (10,000 evenly spaced points from 0 to 1250 unless a grid is given)
     bridge_length = 1250
-    positions = [i * bridge_length / (num_points - 1) for i in range(num_points)]
+    positions = as_grid(grid).x.tolist()
 
     # calculate shear force at each position
     sfd = []
@@ -185,17 +159,18 @@ def SFDvals(x, loadcase, mass):
 
     return sfd
 
-def BMDvals(x, loadcase, mass):
+def BMDvals(x, loadcase, mass, grid=None):
     """
     calculate bending moment values at 10,000 evenly spaced points
 
     Input =
         x: position of leftmost wheel (mm from left edge of bridge)
-        loadcase: 1, 2, or 3
+        loadcase: 1, 2, 3 or a TrainDefinition
         mass: total mass of train
+        grid: StationGrid (or array of stations) to evaluate at, default 10,000 evenly spaced points
 
     Outputs =
-        bmd is a list of bending moment values at 10,000 points from 0 to 1250 mm
+        bmd is a list of bending moment values at each station (10,000 points from 0 to 1250 mm by default)
     """
     # Get reaction forces and wheel loads
     RA, RB = reactions(x, loadcase, mass)
@@ -205,10 +180,9 @@ def BMDvals(x, loadcase, mass):
     support_A = 25    # mm from left
     support_B = 1225  # mm from left
 
-    # Create 10,000 evenly spaced points from 0 to 1250
-    num_points = 10000
+    # Stations along the bridge (10,000 evenly spaced points from 0 to 1250 unless a grid is given)
     bridge_length = 1250
-    positions = [i * bridge_length / (num_points - 1) for i in range(num_points)]
+    positions = as_grid(grid).x.tolist()
 
     # calculate bending moment at each position
     # moment = sum of (force * distance to that force)
@@ -231,4 +205,300 @@ def BMDvals(x, loadcase, mass):
 
         bmd.append(moment)
 
-    return bmd
\ No newline at end of file
+    return bmd
+
+def batch_reactions(x_positions, loadcase, mass):
+    """
+    reactions for many train positions at once
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+
+    Outputs =
+        wheel_positions: (positions x wheels) array (mm)
+        wheel_loads: (wheels,) array (N)
+        on_bridge: (positions x wheels) bool array, True where the wheel is on the bridge
+        RA, RB: (positions,) arrays of reaction forces (N)
+    """
+    train = as_train(loadcase)
+    wheel_positions = train.wheel_positions(x_positions)
+    wheel_loads = train.wheel_loads(mass)
+
+    support_B = 1225
+    span = 1200
+    bridge_length = 1250
+
+    on_bridge = (wheel_positions >= 0) & (wheel_positions <= bridge_length)
+    active_loads = np.where(on_bridge, wheel_loads, 0.0)
+
+    RA = (active_loads * (support_B - wheel_positions)).sum(axis=-1) / span
+    RB = active_loads.sum(axis=-1) - RA
+
+    return wheel_positions, wheel_loads, on_bridge, RA, RB
+
+
+def _diagram_chunk(wheel_positions, wheel_loads, on_bridge, RA, RB, stations, shear=True, moment=True):
+    """
+    shear and/or moment at every station for a chunk of train positions
+    returns (V, M) (positions x stations) arrays, None for the one not asked for
+    the wheel 'passed' masks are shared so doing both costs much less than twice one
+    """
+    support_A = 25
+    support_B = 1225
+
+    s = stations[None, :]
+    past_A = stations >= support_A
+    past_B = stations >= support_B
+
+    V = RA[:, None] * past_A if shear else None
+    M = RA[:, None] * np.where(past_A, stations - support_A, 0.0) if moment else None
+
+    for i in range(wheel_positions.shape[1]):
+        # wheel only counts if it is on the bridge and we're past it
+        passed = (s >= wheel_positions[:, i, None]) & on_bridge[:, i, None]
+        if shear:
+            V -= wheel_loads[i] * passed
+        if moment:
+            M -= np.where(passed, wheel_loads[i] * (s - wheel_positions[:, i, None]), 0.0)
+
+    if shear:
+        V += RB[:, None] * past_B
+    if moment:
+        M += RB[:, None] * np.where(past_B, stations - support_B, 0.0)
+
+    return V, M
+
+
+def _chunk_size(num_points, chunk_size):
+    # keep each chunk around 2 million floats so memory stays small
+    if chunk_size is None:
+        chunk_size = max(1, 2000000 // num_points)
+    return chunk_size
+
+
+def _diagram_minmax(x_positions, loadcase, mass, stations, chunk_size, shear=True, moment=True):
+    num_points = len(stations)
+    x_positions = np.atleast_1d(np.asarray(x_positions, dtype=float))
+    chunk_size = _chunk_size(num_points, chunk_size)
+
+    env = {
+        'sfe_min': np.full(num_points, np.inf),
+        'sfe_max': np.full(num_points, -np.inf),
+        'bme_min': np.full(num_points, np.inf),
+        'bme_max': np.full(num_points, -np.inf)
+    }
+
+    for start in range(0, len(x_positions), chunk_size):
+        chunk = x_positions[start:start + chunk_size]
+        wheel_positions, wheel_loads, on_bridge, RA, RB = batch_reactions(chunk, loadcase, mass)
+        V, M = _diagram_chunk(wheel_positions, wheel_loads, on_bridge, RA, RB, stations, shear, moment)
+        if shear:
+            np.minimum(env['sfe_min'], V.min(axis=0), out=env['sfe_min'])
+            np.maximum(env['sfe_max'], V.max(axis=0), out=env['sfe_max'])
+        if moment:
+            np.minimum(env['bme_min'], M.min(axis=0), out=env['bme_min'])
+            np.maximum(env['bme_max'], M.max(axis=0), out=env['bme_max'])
+
+    return env
+
+
+def SFDmatrix(x_positions, loadcase, mass, num_points=10000, grid=None):
+    """
+    shear force at every station for every train position
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        (positions x stations) numpy array of shear forces (N)
+        row i matches SFDvals(x_positions[i], loadcase, mass)
+    """
+    stations = as_grid(grid, num_points).x
+    wheel_positions, wheel_loads, on_bridge, RA, RB = batch_reactions(np.atleast_1d(x_positions), loadcase, mass)
+    return _diagram_chunk(wheel_positions, wheel_loads, on_bridge, RA, RB, stations, moment=False)[0]
+
+
+def BMDmatrix(x_positions, loadcase, mass, num_points=10000, grid=None):
+    """
+    bending moment at every station for every train position
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        (positions x stations) numpy array of moments (N·mm)
+        row i matches BMDvals(x_positions[i], loadcase, mass)
+    """
+    stations = as_grid(grid, num_points).x
+    wheel_positions, wheel_loads, on_bridge, RA, RB = batch_reactions(np.atleast_1d(x_positions), loadcase, mass)
+    return _diagram_chunk(wheel_positions, wheel_loads, on_bridge, RA, RB, stations, shear=False)[1]
+
+
+def SFDminmax(x_positions, loadcase, mass, num_points=10000, chunk_size=None, grid=None):
+    """
+    min and max shear at each station over all the train positions
+    positions are processed in chunks so the full matrix is never built
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        chunk_size: train positions per chunk (default picks one from num_points)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        sfd_min, sfd_max: numpy arrays, one value per station (N)
+    """
+    env = _diagram_minmax(x_positions, loadcase, mass, as_grid(grid, num_points).x, chunk_size, moment=False)
+    return env['sfe_min'], env['sfe_max']
+
+
+def BMDminmax(x_positions, loadcase, mass, num_points=10000, chunk_size=None, grid=None):
+    """
+    min and max moment at each station over all the train positions
+    positions are processed in chunks so the full matrix is never built
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        chunk_size: train positions per chunk (default picks one from num_points)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        bmd_min, bmd_max: numpy arrays, one value per station (N·mm)
+    """
+    env = _diagram_minmax(x_positions, loadcase, mass, as_grid(grid, num_points).x, chunk_size, shear=False)
+    return env['bme_min'], env['bme_max']
+
+
+def SFD_BMDminmax(x_positions, loadcase, mass, num_points=10000, chunk_size=None, grid=None):
+    """
+    min and max shear and moment at each station over all the train positions, in one pass
+    (reactions and wheel loads are worked out once per position and used for both)
+
+    Input =
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        num_points: number of stations along the bridge (default 10000)
+        chunk_size: train positions per chunk (default picks one from num_points)
+        grid: StationGrid (or array of stations), overrides num_points
+
+    Outputs =
+        dict with sfe_min, sfe_max, bme_min, bme_max arrays
+    """
+    return _diagram_minmax(x_positions, loadcase, mass, as_grid(grid, num_points).x, chunk_size)
+
+
+def point_values(stations, x_positions, loadcase, mass, side=0, tol=0.0):
+    """
+    shear and moment at a station for a train position, done elementwise on arrays
+    (stations and x_positions broadcast against each other)
+
+    side picks what happens when a wheel is exactly on the station or a bridge end:
+        side = 0: value at x (same as SFDvals / BMDvals)
+        side = -1: limit as the train approaches x from the left
+        side = 1: limit as the train approaches x from the right
+    tol is how close (mm) a wheel has to be to count as exactly on the station or an end,
+    so train positions built as station - wheel offset still land on the station after rounding
+
+    Input =
+        stations: array of stations (mm)
+        x_positions: array of leftmost wheel positions (mm)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+        side: 0, -1 or 1
+        tol: tolerance for a wheel being on the station or an end (mm), default 0
+
+    Outputs =
+        V, M: arrays of shear (N) and moment (N·mm)
+    """
+    stations = np.asarray(stations, dtype=float)
+    x_positions = np.asarray(x_positions, dtype=float)
+    wheel_positions, wheel_loads = get_wheel_loads(x_positions, loadcase, mass)
+
+    support_A = 25
+    support_B = 1225
+    span = 1200
+    bridge_length = 1250
+
+    shape = np.broadcast(stations, x_positions).shape
+    RA = np.zeros(shape)
+    active_load = np.zeros(shape)
+    passed_load = np.zeros(shape)
+    passed_moment = np.zeros(shape)
+
+    for pos, load in zip(wheel_positions, wheel_loads):
+        # a wheel coming on at 0 or leaving at 1250 is only on for one of the limits
+        on_left = pos > tol if side < 0 else pos >= -tol
+        on_right = pos < bridge_length - tol if side > 0 else pos <= bridge_length + tol
+        on = on_left & on_right
+
+        # a wheel sitting on the station has only passed it if we come from the left
+        passed = (stations > pos + tol) if side > 0 else (stations >= pos - tol)
+        passed = passed & on
+
+        RA = RA + np.where(on, load * (support_B - pos), 0.0) / span
+        active_load = active_load + np.where(on, load, 0.0)
+        passed_load = passed_load + np.where(passed, load, 0.0)
+        passed_moment = passed_moment + np.where(passed, load * (stations - pos), 0.0)
+
+    RB = active_load - RA
+
+    past_A = stations >= support_A
+    past_B = stations >= support_B
+
+    V = RA * past_A - passed_load + RB * past_B
+    M = (RA * np.where(past_A, stations - support_A, 0.0) - passed_moment
+         + RB * np.where(past_B, stations - support_B, 0.0))
+
+    return V, M
+
+
+def SFD_BMD_diagrams(x, loadcase, mass):
+    """
+    SFD and BMD for one train position as piecewise diagrams (only the knots are stored)
+
+    Input =
+        x: position of leftmost wheel (mm from left edge of bridge)
+        loadcase: 1, 2, 3 or a TrainDefinition
+        mass: total mass of train
+
+    Outputs =
+        sfd, bmd: PiecewiseDiagram objects, exact at any x along the bridge
+    """
+    RA, RB = reactions(x, loadcase, mass)
+    wheel_positions, wheel_loads = get_wheel_loads(x, loadcase, mass)
+
+    # supports push up, wheels push down (point_load_diagrams drops the wheels off the bridge)
+    positions = [25, 1225] + list(wheel_positions)
+    forces = [RA, RB] + [-w for w in wheel_loads]
+
+    return point_load_diagrams(positions, forces, start=0.0, end=1250.0)
+
+
+def SFDdiagram(x, loadcase, mass):
+    """
+    SFD for one train position as a PiecewiseDiagram (same values as SFDvals at any station)
+    """
+    return SFD_BMD_diagrams(x, loadcase, mass)[0]
+
+
+def BMDdiagram(x, loadcase, mass):
+    """
+    BMD for one train position as a PiecewiseDiagram (same values as BMDvals at any station)
+    """
+    return SFD_BMD_diagrams(x, loadcase, mass)[1]
@@ -0,0 +1,130 @@
+"""
+section properties kept up to date as single plates are added, removed or moved
+
+    acc = SectionAccumulator(geometry['plates'])
+    plate['y'] += 5
+    acc.update(plate)        # O(1): takes the plate's old terms out and puts the new ones in
+    acc.ybar, acc.I
+
+only the sums sum A, sum A y, sum A y^2 and sum of local I (b h^3 / 12) are kept, so
+    ybar = sum A y / sum A
+    I = sum I_local + sum A y^2 - sum A * ybar^2      (parallel axis theorem about ybar)
+
+each plate's last terms are remembered (by the plate dict itself), so update / remove work after the
+dict has already been changed in place (like the designer does while dragging).
+the sums are rebuilt from scratch every rebuild_every updates so rounding doesn't build up.
+
+this is only for showing ybar / I / area straight away while the designer works out the rest.
+capacities and FOS still come from get_section_data, whose cache is keyed by the plate values, so
+only the cross section that was actually edited gets rebuilt (Q, widths and buckling need the
+whole section anyway)
+"""
+
+
+class SectionAccumulator:
+    def __init__(self, plates=(), rebuild_every=1000):
+        """
+        Input =
+            plates: list of plate dicts to start with
+            rebuild_every: updates between rebuilding the sums from scratch
+        """
+        self.rebuild_every = rebuild_every
+        self._plates = {}  # id(plate) -> (plate, terms)
+        self._reset_sums()
+        self.updates = 0
+        for plate in plates:
+            self.add(plate)
+
+    def _reset_sums(self):
+        self.A = 0.0
+        self.Ay = 0.0
+        self.Ay2 = 0.0
+        self.I_local = 0.0
+
+    @staticmethod
+    def _terms(plate):
+        # this plate's part of each sum
+        A = plate['b'] * plate['h']
+        return (A, A * plate['y'], A * plate['y']**2, plate['b'] * plate['h']**3 / 12)
+
+    def _apply(self, terms, sign):
+        A, Ay, Ay2, I_local = terms
+        self.A += sign * A
+        self.Ay += sign * Ay
+        self.Ay2 += sign * Ay2
+        self.I_local += sign * I_local
+
+    def _count_update(self):
+        self.updates += 1
+        if self.updates % self.rebuild_every == 0:
+            self.rebuild()
+
+    def add(self, plate):
+        """add a plate (O(1))"""
+        if id(plate) in self._plates:
+            return self.update(plate)
+        terms = self._terms(plate)
+        self._plates[id(plate)] = (plate, terms)
+        self._apply(terms, 1)
+        self._count_update()
+
+    def remove(self, plate):
+        """remove a plate (O(1)), its last added / updated values are taken out"""
+        _, terms = self._plates.pop(id(plate))
+        self._apply(terms, -1)
+        self._count_update()
+
+    def update(self, plate):
+        """the plate dict has changed (moved or resized), O(1)"""
+        _, old = self._plates[id(plate)]
+        new = self._terms(plate)
+        self._apply(old, -1)
+        self._apply(new, 1)
+        self._plates[id(plate)] = (plate, new)
+        self._count_update()
+
+    def move(self, plate, x=None, y=None):
+        """move a plate to a new center (either coordinate can be left as is)"""
+        if x is not None:
+            plate['x'] = x
+        if y is not None:
+            plate['y'] = y
+        self.update(plate)
+
+    def rebuild(self):
+        """redo the sums from the current plate values"""
+        self._reset_sums()
+        for key, (plate, _) in list(self._plates.items()):
+            terms = self._terms(plate)
+            self._plates[key] = (plate, terms)
+            self._apply(terms, 1)
+
+    def __len__(self):
+        return len(self._plates)
+
+    @property
+    def area(self):
+        """total area (mm^2)"""
+        return self.A
+
+    @property
+    def ybar(self):
+        """distance from bottom y=0 to neutral axis (mm)"""
+        # division by zero protection
+        if self.A < 1e-9:
+            return 0.0
+        return self.Ay / self.A
+
+    @property
+    def I(self):
+        """second moment of area about the neutral axis (mm^4)"""
+        if self.A < 1e-9:
+            return 0.0
+        return self.I_local + self.Ay2 - self.Ay**2 / self.A
+
+    def properties(self):
+        """
+        Output =
+            dict with ybar, I, area
+        """
+        return {'ybar': self.ybar, 'I': self.I, 'area': self.area}
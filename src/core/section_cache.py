@@ -0,0 +1,145 @@
+"""
+cache of section properties and buckling capacities for a cross section
+
+get_geometry_at_x gives the same plates at almost every station, and a sweep over designs keeps
+coming back to the same ones, so find_FOS asks here instead of redoing the geometry math.
+
+cache key = plates (b, h, x, y, plate_type in order), glue joints, diaphragm spacing and material props
+(two geometries with the same numbers share an entry even if they're different dicts).
+the cache is an LRU with a bounded size, section_cache_info() gives the hit / miss counts.
+
+cached values are shared, don't modify them (web_plates is a copy of the plates when it was cached,
+so editing the design afterwards doesn't change what's in the cache)
+
+the designer's metrics worker thread and the GUI thread both use the cache, so the OrderedDict is
+only touched while holding a lock. compute() runs outside the lock (a miss doesn't hold up hits on
+the other thread); if both threads miss on the same key the first value stored is the one kept.
+"""
+
+import threading
+from collections import OrderedDict
+from src.core.geometric_properties import Section
+from src.core.stress_envelope import get_section_properties
+from src.core.buckling_analysis import get_buckling_capacities
+
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        """
+        Input =
+            maxsize: most entries to keep (least recently used ones are dropped first)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        value for key, calling compute() to make it if it isn't cached
+        """
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # another thread may have stored this key while we were computing, keep theirs
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._data[key] = value
+            self._evict()
+        return value
+
+    def _evict(self):
+        # caller holds the lock
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def resize(self, maxsize):
+        """
+        change maxsize, dropping least recently used entries if there are too many now
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+_section_cache = LRUCache()
+
+
+def geometry_key(plates, glue_joints, diaphragm_spacing=None, material_props=None):
+    """
+    hashable key describing everything the section properties and buckling capacities depend on
+    """
+    plate_key = tuple((float(p['b']), float(p['h']), float(p['x']), float(p['y']), p.get('plate_type')) for p in plates)
+    material_key = tuple(sorted(material_props.items())) if material_props else ()
+    return (plate_key, tuple(float(y) for y in glue_joints), diaphragm_spacing, material_key)
+
+
+def get_section_data(plates, glue_joints, diaphragm_spacing, material_props):
+    """
+    section, section properties and buckling capacities (cached)
+
+    Input =
+        plates: list of plate dicts
+        glue_joints: list of y-coordinates where glue is
+        diaphragm_spacing: spacing between diaphragms (mm), or None
+        material_props: matboard and glue properties (needs E and nu)
+
+    Output =
+        dict with section (Section), props (get_section_properties dict), buckling (get_buckling_capacities dict)
+    """
+    key = geometry_key(plates, glue_joints, diaphragm_spacing, material_props)
+
+    def compute():
+        section = Section.from_plates(plates)
+        props = get_section_properties(section, glue_joints)
+        buckling = get_buckling_capacities(plates, material_props['E'], material_props['nu'], props['ybar'],
+                                           diaphragm_spacing=diaphragm_spacing)
+        # snapshot the web plates so later edits to the design don't leak into the cache
+        buckling['web_plates'] = [dict(p) for p in buckling['web_plates']]
+        return {'section': section, 'props': props, 'buckling': buckling}
+
+    return _section_cache.get(key, compute)
+
+
+def section_cache_info():
+    """
+    hits, misses, size and maxsize of the section cache
+    """
+    return _section_cache.info()
+
+
+def set_section_cache_size(maxsize):
+    """
+    change the most entries the section cache keeps
+    """
+    _section_cache.resize(maxsize)
+
+
+def clear_section_cache():
+    """
+    empty the section cache and reset the counters
+    """
+    _section_cache.clear()
@@ -0,0 +1,116 @@
+"""
+station grid along the bridge (where SFD, BMD, envelopes and FOS are evaluated)
+
+StationGrid.uniform(n): n evenly spaced stations from 0 to 1250 (the old hardcoded 10,000 points)
+StationGrid.adaptive(...): coarse everywhere, dense near the supports and any other points you
+    care about (section changes, envelope peaks)
+
+everything that used to assume 10,000 points takes grid=... now, so a 1,000 station screening pass
+and a 100,000 station check are just different grids
+"""
+
+import hashlib
+import numpy as np
+
+
+class StationGrid:
+    def __init__(self, x, bridge_length=1250, kind='custom'):
+        """
+        Input =
+            x: station positions (mm), 1D and strictly increasing
+            bridge_length: length of bridge (mm)
+            kind: 'uniform', 'adaptive' or 'custom' (just a label)
+        """
+        x = np.asarray(x, dtype=float)
+        # envelopes and FOS arrays line up with x by index, so quietly reordering would mismatch them
+        if x.ndim != 1 or len(x) == 0:
+            raise ValueError(f"stations must be a non-empty 1D array, got shape {x.shape}")
+        if np.any(np.diff(x) <= 0):
+            raise ValueError("stations must be strictly increasing (no duplicates)")
+        self.x = x
+        self.bridge_length = bridge_length
+        self.kind = kind
+
+    @classmethod
+    def uniform(cls, num_points=10000, bridge_length=1250):
+        """
+        evenly spaced stations from 0 to bridge_length (same points as the original 10,000)
+        needs at least 2 stations (one for each end)
+        """
+        if num_points < 2:
+            raise ValueError(f"uniform grid needs at least 2 stations, got {num_points}")
+        grid = cls(np.arange(num_points) * bridge_length / (num_points - 1), bridge_length, kind='uniform')
+        grid.num_points = num_points
+        return grid
+
+    @classmethod
+    def adaptive(cls, num_points=1000, refine_at=None, refine_width=10.0, refine_spacing=0.1,
+                 supports=(25, 1225), bridge_length=1250):
+        """
+        coarse uniform grid plus dense patches around the supports and refine_at points
+
+        Input =
+            num_points: number of stations in the coarse uniform part
+            refine_at: extra x positions to refine around (section changes, envelope peaks...)
+            refine_width: half width of each dense patch (mm)
+            refine_spacing: station spacing inside the dense patches (mm)
+            supports: support positions, always refined
+            bridge_length: length of bridge (mm)
+        """
+        if num_points < 2:
+            raise ValueError(f"adaptive grid needs at least 2 coarse stations, got {num_points}")
+        coarse = cls.uniform(num_points, bridge_length).x
+        centres = list(supports) + list(refine_at if refine_at is not None else [])
+
+        patch = np.arange(-refine_width, refine_width + refine_spacing / 2, refine_spacing)
+        dense = [c + patch for c in centres] + [np.asarray(centres, dtype=float)]
+
+        x = np.concatenate([coarse] + dense)
+        x = np.unique(x[(x >= 0) & (x <= bridge_length)])
+        return cls(x, bridge_length, kind='adaptive')
+
+    @staticmethod
+    def peaks(envelope, count=3):
+        """
+        x positions of the biggest shear and moment magnitudes in an envelope (to refine around)
+
+        Input =
+            envelope: Envelope (anything with x, V_env and M_env)
+            count: how many peaks of each to return
+
+        Output = list of x positions (mm)
+        """
+        x = np.asarray(envelope.x)
+        V_order = np.argsort(envelope.V_env)[::-1][:count]
+        M_order = np.argsort(envelope.M_env)[::-1][:count]
+        return sorted(set(x[V_order].tolist() + x[M_order].tolist()))
+
+    @property
+    def key(self):
+        """
+        short hashable id for caching (same stations -> same key)
+        """
+        if self.kind == 'uniform':
+            return f'uniform-{len(self.x)}-{self.bridge_length}'
+        return f'{self.kind}-{len(self.x)}-' + hashlib.sha1(self.x.tobytes()).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return iter(self.x)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.x if dtype is None else self.x.astype(dtype)
+
+
+def as_grid(grid=None, num_points=10000):
+    """
+    turn grid (StationGrid, array of stations or None) into a StationGrid
+    None means the uniform grid with num_points stations
+    """
+    if grid is None:
+        return StationGrid.uniform(num_points)
+    if isinstance(grid, StationGrid):
+        return grid
+    return StationGrid(grid)
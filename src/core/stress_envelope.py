@@ -1,27 +1,31 @@
 """
 stress envelope and section property calculations
+
+the stress functions take single envelope values or numpy arrays of them (one per station)
 """
 
-from src.core.geometric_properties import y_bar, I, Q, width, glue_width
-from src.core.stresses import sigma_top, sigma_bot, tau_glue
+import numpy as np
+from src.core.geometric_properties import as_section
+from src.core.stresses import sigma_top, sigma_bot, tau_glue, _zeros
 
 def get_section_properties(plates, glue_joints):
     """
     calculate all geometric properties at of a cross sections
 
     Input =
-        plates: list of plate dicts
+        plates: list of plate dicts (or a Section)
         glue_joints: list of y-coordinates where glue is
 
     Output =
         dict with ybar, I, y_top, y_bot, Q_cent, b_cent
     """
-    ybar = y_bar(plates)
-    I_val = I(plates)
-    y_top = max(plate['y'] + plate['h']/2 for plate in plates) - ybar
-    y_bot = ybar - min(plate['y'] - plate['h']/2 for plate in plates)
-    Q_cent = Q(plates, ybar)
-    b_cent = width(plates, ybar)
+    section = as_section(plates)
+    ybar = section.y_bar
+    I_val = section.I
+    y_top = section.y_max - ybar
+    y_bot = ybar - section.y_min
+    Q_cent = section.Q(ybar)
+    b_cent = section.width(ybar)
 
     return {
         'ybar': ybar,
@@ -37,12 +41,12 @@ def get_stress_envelope(M_max, M_min, y_top, y_bot, I_val):
     find worst-case tension and compression stresses at top and bottom fibers
 
     Input =
-        M_max, M_min: max and min bending moments (N·mm)
+        M_max, M_min: max and min bending moments (N·mm), numbers or arrays
         y_top, y_bot: distances from neutral axis to top/bottom (mm)
         I_val: moment of inertia (mm^4)
 
     Output =
-        dict with tension_max, compression_max, top_compression, bottom_compression
+        dict with tension_max, compression_max, top_compression, bottom_compression (arrays if M is)
     """
     # positive moment (sagging): top in compression, bottom in tension
     sigma_t_pos = sigma_top(M_max, y_top, I_val)  # negative (compression)
@@ -53,14 +57,14 @@ def get_stress_envelope(M_max, M_min, y_top, y_bot, I_val):
     sigma_b_neg = sigma_bot(M_min, y_bot, I_val)  # negative (compression)
 
     # worst case stresses for each fiber
-    sigma_t_comp = min(sigma_t_pos, sigma_t_neg)
-    sigma_t_tens = max(sigma_t_pos, sigma_t_neg)
-    sigma_b_tens = max(sigma_b_pos, sigma_b_neg)
-    sigma_b_comp = min(sigma_b_pos, sigma_b_neg)
+    sigma_t_comp = np.minimum(sigma_t_pos, sigma_t_neg)
+    sigma_t_tens = np.maximum(sigma_t_pos, sigma_t_neg)
+    sigma_b_tens = np.maximum(sigma_b_pos, sigma_b_neg)
+    sigma_b_comp = np.minimum(sigma_b_pos, sigma_b_neg)
 
     return {
-        'tension_max': max(sigma_t_tens, sigma_b_tens),
-        'compression_max': min(sigma_t_comp, sigma_b_comp),
+        'tension_max': np.maximum(sigma_t_tens, sigma_b_tens),
+        'compression_max': np.minimum(sigma_t_comp, sigma_b_comp),
         'top_compression': sigma_t_comp,
         'bottom_compression': sigma_b_comp
     }
@@ -70,23 +74,53 @@ def get_max_glue_stress(plates, glue_joints, V_env, I_val):
     find maximum shear stress in any glue joint
 
     Input =
-        plates: list of plate dicts
+        plates: list of plate dicts (or a Section)
         glue_joints: list of y-coordinates where glue is
-        V_env: shear force (N)
+        V_env: shear force (N), number or array
         I_val: moment of inertia (mm^4)
 
     Output =
-        max glue shear stress (MPa)
+        max glue shear stress (MPa), array if V_env is
     """
+    section = as_section(plates)
+    Q_glues = section.Q_profile(glue_joints).tolist() if len(glue_joints) else []
     tau_glue_list = []
-    for glue_y in glue_joints:
-        Q_glue = Q(plates, glue_y)
-        b_glue = glue_width(plates, glue_y)
+    for glue_y, Q_glue in zip(glue_joints, Q_glues):
+        b_glue = section.glue_width(glue_y)
         if b_glue > 0:
             tau_g = tau_glue(V_env, Q_glue, I_val, b_glue)
             tau_glue_list.append(tau_g)
 
-    return max(tau_glue_list) if tau_glue_list else 0
+    return np.max(tau_glue_list, axis=0) if tau_glue_list else _zeros(V_env)
+
+def get_shear_stress_profile(plates, V_env, y_levels=None, num_levels=201):
+    """
+    shear stress through the full depth of the section, and the true max
+
+    Input =
+        plates: list of plate dicts (or a Section)
+        V_env: shear force (N)
+        y_levels: y levels to evaluate at (mm), default num_levels levels from bottom to top plus every plate edge
+        num_levels: number of evenly spaced levels when y_levels isn't given
+
+    Output =
+        dict with y, Q, b, tau arrays and tau_max, y_tau_max (the exact max, which can be between the levels)
+    """
+    section = as_section(plates)
+    if y_levels is None:
+        y_levels = np.unique(np.concatenate([np.linspace(section.y_min, section.y_max, num_levels),
+                                             section.tops, section.bottoms]))
+    y_levels = np.asarray(y_levels, dtype=float)
+    tau_max, y_tau_max = section.max_shear_stress(V_env)
+
+    return {
+        'y': y_levels,
+        'Q': section.Q_profile(y_levels),
+        'b': section.width_profile(y_levels),
+        'tau': section.shear_profile(V_env, y_levels),
+        'tau_max': tau_max,
+        'y_tau_max': y_tau_max
+    }
 
 def get_web_compression_stress(web_plates, M_max, M_min, ybar, I_val):
     """
@@ -94,21 +128,19 @@ def get_web_compression_stress(web_plates, M_max, M_min, ybar, I_val):
 
     Input =
         web_plates: list of web plate dicts
-        M_max, M_min: max and min bending moments (N·mm)
+        M_max, M_min: max and min bending moments (N·mm), numbers or arrays
         ybar: neutral axis location (mm)
         I_val: moment of inertia (mm^4)
 
     Output =
-        compression stress at top of web (MPa)
+        compression stress at top of web (MPa), array if M is
     """
     if not web_plates:
-        return 0
+        return _zeros(M_max)
 
     web_top_y = max(p['y'] + p['h']/2 for p in web_plates)
     web_top_dist = web_top_y - ybar
 
     # use moment that puts web top in compression
-    if M_max > 0:
-        return -M_max * web_top_dist / I_val
-    else:
-        return -M_min * web_top_dist / I_val
+    M_web = np.where(np.asarray(M_max) > 0, M_max, M_min)
+    return -M_web * web_top_dist / I_val
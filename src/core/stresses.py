@@ -1,20 +1,32 @@
+"""
+applied stresses from the envelopes, V_env / M_env can be single values or numpy arrays
+(one value per station, the result is then an array too)
+"""
+
+import numpy as np
+
+
+def _zeros(like):
+    # 0.0 for a single value, an array of zeros for an array
+    return np.zeros(np.shape(like)) if np.ndim(like) else 0.0
+
 
 def sigma_top(M_env, y_top, I):
     if abs(I) < 1e-9:
-        return 0.0
+        return _zeros(M_env)
     return -M_env * y_top / I
 
 
 def sigma_bot(M_env, y_bot, I):
     if abs(I) < 1e-9:
-        return 0.0
+        return _zeros(M_env)
     return M_env * y_bot / I
 
 
 def tau_cent(V_env, Q_cent, I, b_cent):
     if abs(I) < 1e-9 or abs(b_cent) < 1e-9:
-        return 0.0
-    return abs(V_env) * Q_cent / (I * b_cent)
+        return _zeros(V_env)
+    return np.abs(V_env) * Q_cent / (I * b_cent)
 
 
 def tau_glue(V_env, Q_glue, I, b_glue):
@@ -24,5 +36,5 @@ def tau_glue(V_env, Q_glue, I, b_glue):
     tau = VQ/Ib where Q is first moment above the joint, b is glue width
     """
     if abs(I) < 1e-9 or abs(b_glue) < 1e-9:
-        return 0.0
-    return abs(V_env) * Q_glue / (I * b_glue)
+        return _zeros(V_env)
+    return np.abs(V_env) * Q_glue / (I * b_glue)
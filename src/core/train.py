@@ -0,0 +1,109 @@
+"""
+train definitions: where the wheels are and how much of the mass each one carries
+
+TrainDefinition keeps the wheel offsets (from the leftmost wheel) and the fraction of the total
+mass on each wheel as numpy arrays, so the envelope engines just do x + offsets and mass * fractions.
+load cases 1, 2 and 3 are TrainDefinitions too (for_loadcase), and anything that takes a loadcase
+also takes a TrainDefinition, so new rolling stock doesn't need code changes.
+
+    load case 1: 3 equal cars
+    load case 2: locomotive 1.35x the other two cars
+    load case 3: locomotive 1.38x the heavy freight car, heavy freight 1.1x the light freight car (middle)
+
+every car has 2 wheels, wheel spacing is 176, 164, 176, 164, 176 mm (train is 856 mm long)
+"""
+
+import numpy as np
+
+# leftmost wheel to each wheel (mm), same for all load cases
+WHEEL_OFFSETS = (0, 176, 176 + 164, 176 + 164 + 176, 176 + 164 + 176 + 164, 176 + 164 + 176 + 164 + 176)
+
+# mass of each car relative to the others, left to right
+LOADCASE_CAR_RATIOS = {
+    1: (1.0, 1.0, 1.0),
+    2: (1.35, 1.0, 1.0),
+    3: (1.38 * 1.1, 1.0, 1.1)
+}
+
+
+class TrainDefinition:
+    def __init__(self, offsets, load_fractions, name=None):
+        """
+        Input =
+            offsets: position of each wheel from the leftmost wheel (mm)
+            load_fractions: fraction of the total mass on each wheel (wheel load = mass * fraction)
+            name: label for plots / printing
+        """
+        self.offsets = np.asarray(offsets, dtype=float)
+        self.load_fractions = np.asarray(load_fractions, dtype=float)
+        self.name = name
+
+        if self.offsets.shape != self.load_fractions.shape or self.offsets.ndim != 1:
+            raise ValueError("offsets and load_fractions must be 1D and the same length")
+
+    @classmethod
+    def from_cars(cls, car_ratios, offsets=WHEEL_OFFSETS, wheels_per_car=2, name=None):
+        """
+        train where each car's mass is split evenly over its wheels
+
+        Input =
+            car_ratios: mass of each car relative to the others, left to right
+            offsets: wheel offsets (mm), wheels_per_car per car in order
+            wheels_per_car: wheels on each car (default 2)
+            name: label
+        """
+        car_ratios = np.asarray(car_ratios, dtype=float)
+        car_fractions = car_ratios / car_ratios.sum()
+        return cls(offsets, np.repeat(car_fractions / wheels_per_car, wheels_per_car), name=name)
+
+    @classmethod
+    def for_loadcase(cls, loadcase):
+        """
+        train for load case 1, 2 or 3 (built once and reused)
+        """
+        if loadcase not in _loadcase_trains:
+            if loadcase not in LOADCASE_CAR_RATIOS:
+                raise ValueError(f"unknown load case {loadcase}")
+            _loadcase_trains[loadcase] = cls.from_cars(LOADCASE_CAR_RATIOS[loadcase], name=f'load case {loadcase}')
+        return _loadcase_trains[loadcase]
+
+    @property
+    def num_wheels(self):
+        return len(self.offsets)
+
+    @property
+    def length(self):
+        """leftmost to rightmost wheel (mm)"""
+        return float(self.offsets.max() - self.offsets.min())
+
+    @property
+    def key(self):
+        """hashable description of the train (for caching)"""
+        return (tuple(self.offsets.tolist()), tuple(self.load_fractions.tolist()))
+
+    def wheel_positions(self, x):
+        """
+        wheel positions for leftmost wheel position(s) x, shape x.shape + (wheels,)
+        """
+        return np.asarray(x, dtype=float)[..., None] + self.offsets
+
+    def wheel_loads(self, mass):
+        """
+        wheel loads (N) for a train of total mass (N)
+        """
+        return mass * self.load_fractions
+
+    def __repr__(self):
+        return f'TrainDefinition({self.name or self.num_wheels})'
+
+
+_loadcase_trains = {}
+
+
+def as_train(loadcase):
+    """
+    TrainDefinition for a load case number (or the TrainDefinition itself)
+    """
+    if isinstance(loadcase, TrainDefinition):
+        return loadcase
+    return TrainDefinition.for_loadcase(loadcase)
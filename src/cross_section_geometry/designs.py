@@ -6,9 +6,13 @@ each design returns a dict with:
     'glue_joints': list of y-coordinates where glue joints are
 
 plate_type can be 'top_flange', 'web', or 'bottom_flange'
+
+a tapered / deeper-in-the-middle bridge is a segmented geometry instead (see segmented_geometry):
+    'segments': list of dicts with 'x_start', 'plates', 'glue_joints', 'diaphragm_spacing'
 """
 
 import numpy as np
+from bisect import bisect_right
 
 def design0():
     """
@@ -76,11 +80,110 @@ def cigar():
     }
 
 
+def deep_midspan():
+    """
+    design0 section at the ends, 100mm deep box section over the middle where the moment is biggest
+    """
+    end_plates = design0()['plates']
+
+    mid_plates = [
+        {'b': 100, 'h': 1.27, 'x': 50, 'y': 99.365, 'plate_type': 'top_flange'},    # top flange
+        {'b': 1.27, 'h': 97.46, 'x': 10.635, 'y': 50, 'plate_type': 'web'},   # left web
+        {'b': 1.27, 'h': 97.46, 'x': 89.365, 'y': 50, 'plate_type': 'web'},  # right web
+        {'b': 80, 'h': 1.27, 'x': 50, 'y': 0.635, 'plate_type': 'bottom_flange'},     # bottom flange
+        {'b': 5, 'h': 1.27, 'x': 13.77, 'y': 98.095, 'plate_type': 'top_flange'},  # left glue tab
+        {'b': 5, 'h': 1.27, 'x': 86.23, 'y': 98.095, 'plate_type': 'top_flange'},  # right glue tab
+    ]
+
+    return segmented_geometry([
+        {'x_start': 0, 'plates': end_plates, 'glue_joints': [73.73, 1.27], 'diaphragm_spacing': 150},
+        {'x_start': 400, 'plates': mid_plates, 'glue_joints': [98.73, 1.27], 'diaphragm_spacing': 100},
+        {'x_start': 850, 'plates': end_plates, 'glue_joints': [73.73, 1.27], 'diaphragm_spacing': 150},
+    ])
+
+
+def segmented_geometry(segments, diaphragm_spacing=None):
+    """
+    geometry made of x segments, each with its own cross section
+
+    Input =
+        segments: list of dicts with 'x_start' (mm), 'plates', 'glue_joints' and optionally 'diaphragm_spacing'
+            a segment goes from its x_start up to the next segment's x_start (the last one to the end of the bridge)
+        diaphragm_spacing: default for segments that don't give their own
+
+    Output =
+        geometry dict with 'segments' (sorted by x_start) and 'segment_starts' for the lookup
+    """
+    segments = sorted(segments, key=lambda seg: seg['x_start'])
+    return {
+        'segments': segments,
+        'segment_starts': [seg['x_start'] for seg in segments],
+        'diaphragm_spacing': diaphragm_spacing
+    }
+
+
+def get_segment_index(geometry, x):
+    """
+    index of the segment containing x (bisect on the segment starts, 0 for prismatic geometry)
+    x before the first segment uses the first one
+    """
+    if 'segments' not in geometry:
+        return 0
+    starts = geometry.get('segment_starts')
+    if starts is None:
+        starts = geometry['segment_starts'] = [seg['x_start'] for seg in geometry['segments']]
+    return max(bisect_right(starts, x) - 1, 0)
+
+
+def get_segment_at_x(geometry, x):
+    """
+    dict with plates, glue_joints and diaphragm_spacing of the cross section at x
+    """
+    if 'segments' not in geometry:
+        return geometry
+    return geometry['segments'][get_segment_index(geometry, x)]
+
+
+def get_diaphragm_spacing_at_x(geometry, x):
+    """
+    diaphragm spacing at x (the segment's own spacing, or the geometry's if it doesn't have one)
+    """
+    segment = get_segment_at_x(geometry, x)
+    spacing = segment.get('diaphragm_spacing')
+    return spacing if spacing is not None else geometry.get('diaphragm_spacing')
+
+
+def get_segment_ranges(geometry, bridge_length=1250):
+    """
+    list of (x_start, x_end, segment) covering the bridge, one entry for prismatic geometry
+    """
+    if 'segments' not in geometry:
+        return [(0.0, float(bridge_length), geometry)]
+    segments = geometry['segments']
+    ends = [seg['x_start'] for seg in segments[1:]] + [bridge_length]
+    return [(seg['x_start'], end, seg) for seg, end in zip(segments, ends)]
+
+
+def section_changes(geometry):
+    """
+    x positions where the cross section changes (e.g. to refine a StationGrid around)
+    """
+    return [seg['x_start'] for seg in geometry.get('segments', [])[1:]]
+
+
 def get_geometry_at_x(geometry, x):
     """
     get cross section geometry at position x along the bridge
 
-    for now returns constant geometry everywhere (later can be tapered)
+    prismatic geometry has the same plates everywhere,
+    segmented geometry (segmented_geometry) looks up the segment containing x in O(log segments)
+    """
+    segment = get_segment_at_x(geometry, x)
+    return segment['plates'], segment['glue_joints']
+
+
+def is_prismatic(geometry):
+    """
+    True if the cross section is the same all along the bridge (get_geometry_at_x never changes)
     """
-    # for constant cross-section we just return the same geometry
-    return geometry['plates'], geometry['glue_joints']
+    return 'segments' not in geometry
@@ -0,0 +1,143 @@
+"""
+sorted index of rectangle edges for snapping and overlap checks in the designers
+
+    index = EdgeIndex()
+    index.add(key, left, right, bottom, top)
+    index.snap_candidates('x', (left, right), threshold, exclude=key)   # bisect, nearest first
+    index.overlaps(left, right, bottom, top, exclude=key)              # sweep over sorted lefts
+
+x edges (lefts and rights) and y edges (tops and bottoms) are kept in sorted lists and updated one
+rectangle at a time, so snapping only looks at edges within the threshold instead of every shape.
+for overlaps the rectangles are bucketed by width (powers of two) and each bucket keeps its lefts sorted
+and its widest width: anything in a bucket that can overlap has its left between
+(new left - bucket's widest) and new right, so one very wide plate only widens the search in its own
+bucket instead of making every check scan nearly everything. a bucket's widest is recomputed as
+rectangles are removed or resized.
+"""
+
+import math
+from bisect import bisect_left, bisect_right, insort
+
+INF = float('inf')
+
+
+class EdgeIndex:
+    def __init__(self, boxes=()):
+        """
+        Input =
+            boxes: (key, left, right, bottom, top) for each rectangle to start with
+        """
+        self._boxes = {}  # key -> (sequence number, left, right, bottom, top)
+        self._keys = {}  # sequence number -> key
+        self._x = []  # (edge, sequence number, 0 = left / 1 = right)
+        self._y = []  # (edge, sequence number, 0 = top / 1 = bottom)
+        self._buckets = {}  # width class -> ([(left, sequence number)] sorted, [widths] sorted)
+        self._next = 0
+        for box in boxes:
+            self.add(*box)
+
+    def add(self, key, left, right, bottom, top):
+        """add a rectangle (replaces it if key is already there)"""
+        if key in self._boxes:
+            self.remove(key)
+        seq = self._next
+        self._next += 1
+        self._insert(key, seq, left, right, bottom, top)
+
+    @staticmethod
+    def _width_class(width):
+        # widths in [2^(k-1), 2^k) share a bucket, zero / negative widths get their own
+        return math.frexp(width)[1] if width > 0 else None
+
+    def _insert(self, key, seq, left, right, bottom, top):
+        self._boxes[key] = (seq, left, right, bottom, top)
+        self._keys[seq] = key
+        insort(self._x, (left, seq, 0))
+        insort(self._x, (right, seq, 1))
+        insort(self._y, (top, seq, 0))
+        insort(self._y, (bottom, seq, 1))
+        lefts, widths = self._buckets.setdefault(self._width_class(right - left), ([], []))
+        insort(lefts, (left, seq))
+        insort(widths, right - left)
+
+    def remove(self, key):
+        """remove a rectangle"""
+        seq, left, right, bottom, top = self._boxes.pop(key)
+        del self._keys[seq]
+        width_class = self._width_class(right - left)
+        lefts, widths = self._buckets[width_class]
+        for entries, entry in ((self._x, (left, seq, 0)), (self._x, (right, seq, 1)),
+                               (self._y, (top, seq, 0)), (self._y, (bottom, seq, 1)),
+                               (lefts, (left, seq)), (widths, right - left)):
+            del entries[bisect_left(entries, entry)]
+        # the bucket's widest is widths[-1], so it shrinks with the removal; empty buckets go
+        if not lefts:
+            del self._buckets[width_class]
+
+    def update(self, key, left, right, bottom, top):
+        """rectangle moved or resized (keeps its place for ties)"""
+        seq = self._boxes[key][0]
+        self.remove(key)
+        self._insert(key, seq, left, right, bottom, top)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+    def snap_candidates(self, axis, edges, threshold, exclude=None):
+        """
+        edges of other rectangles closer than threshold to any of the given edges
+
+        Input =
+            axis: 'x' or 'y'
+            edges: the moving shape's edges on that axis ((left, right) or (top, bottom))
+            threshold: only edges closer than this count
+            exclude: key of the moving shape (its own edges are skipped)
+
+        Output =
+            list of (dist, offset) nearest first (offset = how far to move the shape to line up),
+            ties in the order the rectangles were added, then the order of edges
+        """
+        entries = self._x if axis == 'x' else self._y
+        skip = self._boxes[exclude][0] if exclude in self._boxes else None
+
+        candidates = []
+        for i, edge in enumerate(edges):
+            lo = bisect_right(entries, (edge - threshold, INF, INF))
+            hi = bisect_left(entries, (edge + threshold, -INF, -INF))
+            for other_edge, seq, kind in entries[lo:hi]:
+                if seq == skip:
+                    continue
+                dist = abs(edge - other_edge)
+                if dist < threshold:
+                    candidates.append((dist, seq, i, kind, other_edge - edge))
+
+        candidates.sort()
+        return [(dist, offset) for dist, _, _, _, offset in candidates]
+
+    def overlaps(self, left, right, bottom, top, exclude=None, tol=0.01):
+        """
+        would a rectangle here overlap any other rectangle (touching, within tol, is fine)
+
+        Input =
+            left, right, bottom, top: edges of the rectangle
+            exclude: key of the rectangle being moved
+            tol: how far edges can go past each other before it counts as overlapping
+        """
+        skip = self._boxes[exclude][0] if exclude in self._boxes else None
+
+        for lefts, widths in self._buckets.values():
+            # other right > left + tol needs other left > left + tol - bucket's widest (small margin for rounding)
+            lo = bisect_left(lefts, (left + tol - widths[-1] - 1e-9, -INF))
+            hi = bisect_left(lefts, (right - tol, -INF))
+            for _, seq in lefts[lo:hi]:
+                if seq == skip:
+                    continue
+                _, other_left, other_right, other_bottom, other_top = self._boxes[self._keys[seq]]
+                x_overlap = (left < other_right - tol) and (right > other_left + tol)
+                y_overlap = (bottom < other_top - tol) and (top > other_bottom + tol)
+                if x_overlap and y_overlap:
+                    return True
+        return False
@@ -3,7 +3,7 @@ generate plots for design calculations deliverable
 """
 
 import matplotlib.pyplot as plt
-from src.core.BME_SFE import SFEvals, BMEvals
+from src.core.envelope_cache import get_envelopes
 from src.analysis.failure_loads import calculate_failure_loads
 from src.materials.material_properties import get_matboard_properties, get_glue_properties
 import os
@@ -17,13 +17,11 @@ def plot_sfe_bme(loadcase, mass, save_path=None):
         mass: train mass (N)
         save_path: path to save figure (optional, if None will show instead)
     """
-    # calculate envelopes
-    sfe_min, sfe_max = SFEvals(loadcase, mass)
-    bme_min, bme_max = BMEvals(loadcase, mass)
-    
-    # create x positions
-    num_points = len(sfe_min)
-    x = [i * 1250 / (num_points - 1) for i in range(num_points)]
+    # calculate envelopes (cached, so this is free after calculate_failure_loads)
+    envelope = get_envelopes(loadcase, mass)
+    sfe_min, sfe_max = envelope.sfe_min, envelope.sfe_max
+    bme_min, bme_max = envelope.bme_min, envelope.bme_max
+    x = envelope.x
     
     # create figure with two subplots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
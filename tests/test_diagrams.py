@@ -0,0 +1,104 @@
+"""
+piecewise diagram checks against the sampled SFD / BMD and a dense grid
+"""
+
+import numpy as np
+import pytest
+
+from src.core.diagrams import PiecewiseDiagram, point_load_diagrams
+from src.core.reactions_BMD_SFD import SFDvals, BMDvals, SFD_BMD_diagrams
+from src.core.station_grid import StationGrid
+from src.core.train import as_train
+
+MASS = 400
+
+# stations 25 mm apart (the supports and both ends are stations) plus some off grid ones
+STATIONS = np.unique(np.concatenate([StationGrid.uniform(51).x, np.random.default_rng(0).uniform(0, 1250, 200)]))
+
+
+def _train_positions(loadcase):
+    # wheels exactly on each support and each end, on a station, and some in between
+    offsets = as_train(loadcase).offsets
+    special = np.concatenate([spot - offsets for spot in (0.0, 25.0, 1225.0, 1250.0, 600.0)])
+    return np.concatenate([special, [-900.0, -300.0, 12.3, 400.7, 1300.0]])
+
+
+@pytest.mark.parametrize('loadcase', [1, 2, 3])
+def test_diagrams_match_sampled(loadcase):
+    for x in _train_positions(loadcase):
+        sfd, bmd = SFD_BMD_diagrams(x, loadcase, MASS)
+        assert np.allclose(sfd.sample(STATIONS), SFDvals(x, loadcase, MASS, grid=STATIONS), rtol=0, atol=1e-9)
+        assert np.allclose(bmd.sample(STATIONS), BMDvals(x, loadcase, MASS, grid=STATIONS), rtol=0, atol=1e-6)
+
+
+def _brute_force(positions, forces, stations, start=0.0, end=1250.0):
+    # shear and moment from every force at or left of the station
+    positions, forces = np.asarray(positions), np.asarray(forces)
+    on = (positions >= start) & (positions <= end)
+    passed = (positions[on][None, :] <= stations[:, None])
+    shear = (passed * forces[on]).sum(axis=1)
+    moment = (passed * forces[on] * (stations[:, None] - positions[on][None, :])).sum(axis=1)
+    return shear, moment
+
+
+def test_forces_on_supports_and_ends():
+    # one on each end, one on a support, two at the same spot, one off the bridge
+    positions = [0.0, 25.0, 25.0, 410.0, 1225.0, 1250.0, 1300.0]
+    forces = [-3.0, 40.0, -5.0, -20.0, 30.0, -42.0, -7.0]
+    sfd, bmd = point_load_diagrams(positions, forces)
+
+    shear, moment = _brute_force(positions, forces, STATIONS)
+    assert np.allclose(sfd.sample(STATIONS), shear, rtol=0, atol=1e-12)
+    assert np.allclose(bmd.sample(STATIONS), moment, rtol=0, atol=1e-9)
+
+    # the force right at the end only shows up at the end itself
+    assert sfd.left_limit(1250.0) == pytest.approx(shear[-1] + 42.0)
+    assert sfd(1250.0) == pytest.approx(shear[-1])
+
+
+def _random_diagram(rng, jumps=True):
+    x = np.sort(rng.uniform(0, 1250, 12))
+    if jumps:
+        x = np.sort(np.concatenate([x, x[rng.choice(len(x), 3, replace=False)]]))
+    x = np.concatenate([[0.0], x, [1250.0]])
+    return PiecewiseDiagram(x, rng.normal(0, 50, len(x)))
+
+
+def test_maximum_minimum_match_dense_grid():
+    rng = np.random.default_rng(1)
+    dense = np.linspace(0, 1250, 20001)
+    for _ in range(50):
+        f, g = _random_diagram(rng), _random_diagram(rng, jumps=rng.random() < 0.5)
+        # also check exactly on every knot, right and left limits
+        points = np.unique(np.concatenate([dense, f.x, g.x]))
+        for merged, pick in ((f.maximum(g), np.maximum), (f.minimum(g), np.minimum)):
+            assert np.allclose(merged(points), pick(f(points), g(points)), rtol=0, atol=1e-9)
+            assert np.allclose(merged.left_limit(points[1:]), pick(f.left_limit(points[1:]), g.left_limit(points[1:])), rtol=0, atol=1e-9)
+
+
+def test_maximum_of_sampled_diagrams():
+    # envelope of a few train positions built from diagrams vs np.maximum of SFDvals / BMDvals
+    positions = _train_positions(1)[::4]
+    sfd_max, bmd_min = SFD_BMD_diagrams(positions[0], 1, MASS)
+    V_max = np.array(SFDvals(positions[0], 1, MASS, grid=STATIONS))
+    M_min = np.array(BMDvals(positions[0], 1, MASS, grid=STATIONS))
+    for x in positions[1:]:
+        sfd, bmd = SFD_BMD_diagrams(x, 1, MASS)
+        sfd_max, bmd_min = sfd_max.maximum(sfd), bmd_min.minimum(bmd)
+        V_max = np.maximum(V_max, SFDvals(x, 1, MASS, grid=STATIONS))
+        M_min = np.minimum(M_min, BMDvals(x, 1, MASS, grid=STATIONS))
+    assert np.allclose(sfd_max.sample(STATIONS), V_max, rtol=0, atol=1e-9)
+    assert np.allclose(bmd_min.sample(STATIONS), M_min, rtol=0, atol=1e-6)
+
+
+def test_compact_keeps_values():
+    # extra knots on straight lines and repeated knots
+    x = np.array([0.0, 100.0, 200.0, 200.0, 200.0, 300.0, 400.0, 400.0, 500.0])
+    y = np.array([0.0, 1.0, 2.0, 2.0, 5.0, 5.0, 5.0, 1.0, 1.0])
+    diagram = PiecewiseDiagram(x, y)
+    compact = diagram.compact()
+    assert len(compact) == 6
+
+    points = np.linspace(0, 500, 5001)
+    assert np.allclose(compact(points), diagram(points), rtol=0, atol=1e-12)
+    assert np.allclose(compact.left_limit(points), diagram.left_limit(points), rtol=0, atol=1e-12)
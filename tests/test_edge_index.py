@@ -0,0 +1,108 @@
+"""
+edge index checks against the brute force loops over every other rectangle it replaced
+"""
+
+import itertools
+import random
+
+import pytest
+
+from src.visualization.edge_index import EdgeIndex
+
+
+def brute_snap_candidates(boxes, axis, edges, threshold, exclude=None):
+    # every edge of every other rectangle (in the order they were added), nearest first,
+    # ties kept in that order like the old loop's first strictly closer one wins
+    candidates = []
+    for key, (left, right, bottom, top) in boxes.items():
+        if key == exclude:
+            continue
+        others = (left, right) if axis == 'x' else (top, bottom)
+        for edge in edges:
+            for other_edge in others:
+                dist = abs(edge - other_edge)
+                if dist < threshold:
+                    candidates.append((dist, other_edge - edge))
+    return sorted(candidates, key=lambda candidate: candidate[0])
+
+
+def brute_overlaps(boxes, left, right, bottom, top, exclude=None, tol=0.01):
+    for key, (other_left, other_right, other_bottom, other_top) in boxes.items():
+        if key == exclude:
+            continue
+        x_overlap = (left < other_right - tol) and (right > other_left + tol)
+        y_overlap = (bottom < other_top - tol) and (top > other_bottom + tol)
+        if x_overlap and y_overlap:
+            return True
+    return False
+
+
+def random_box(rng):
+    # coarse positions so edges tie and touch exactly, widths from 0 to very wide
+    left = rng.choice([rng.randint(-40, 40) * 0.5, rng.uniform(-20, 20)])
+    width = rng.choice([0.0, 0.01, rng.randint(1, 8) * 0.5, rng.uniform(0.1, 5), rng.uniform(50, 300)])
+    bottom = rng.choice([rng.randint(-40, 40) * 0.5, rng.uniform(-20, 20)])
+    height = rng.choice([0.0, rng.randint(1, 8) * 0.5, rng.uniform(0.1, 5)])
+    return left, left + width, bottom, bottom + height
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_edits_match_brute_force(seed):
+    rng = random.Random(seed)
+    index = EdgeIndex()
+    boxes = {}  # key -> box, in the order the index saw them added
+    keys = itertools.count()
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.4 or not boxes:
+            key = next(keys) if rng.random() < 0.9 or not boxes else rng.choice(list(boxes))
+            box = random_box(rng)
+            index.add(key, *box)
+            # adding an existing key replaces it, so it counts as added last
+            boxes.pop(key, None)
+            boxes[key] = box
+        elif action < 0.8:
+            key = rng.choice(list(boxes))
+            box = random_box(rng)
+            index.update(key, *box)
+            boxes[key] = box
+        else:
+            key = rng.choice(list(boxes))
+            index.remove(key)
+            del boxes[key]
+        assert len(index) == len(boxes)
+
+        # query as an existing rectangle being dragged and as a new one
+        exclude = rng.choice(list(boxes)) if boxes and rng.random() < 0.7 else None
+        left, right, bottom, top = random_box(rng)
+        threshold = rng.choice([0.5, 2.0, 5.0])
+        assert (index.snap_candidates('x', (left, right), threshold, exclude=exclude)
+                == brute_snap_candidates(boxes, 'x', (left, right), threshold, exclude))
+        assert (index.snap_candidates('y', (top, bottom), threshold, exclude=exclude)
+                == brute_snap_candidates(boxes, 'y', (top, bottom), threshold, exclude))
+        for tol in (0.01, 0.0, 1.0):
+            assert (index.overlaps(left, right, bottom, top, exclude=exclude, tol=tol)
+                    == brute_overlaps(boxes, left, right, bottom, top, exclude, tol))
+
+
+def test_touching_is_not_overlapping():
+    index = EdgeIndex([('a', 0.0, 10.0, 0.0, 1.0), ('wide', -500.0, 500.0, 5.0, 6.0)])
+    assert not index.overlaps(10.0, 20.0, 0.0, 1.0)
+    assert not index.overlaps(10.0 - 0.005, 20.0, 0.0, 1.0)
+    assert index.overlaps(10.0 - 0.02, 20.0, 0.0, 1.0)
+    # the very wide one is found from far along its length
+    assert index.overlaps(490.0, 495.0, 5.5, 7.0)
+    index.remove('wide')
+    assert not index.overlaps(490.0, 495.0, 5.5, 7.0)
+
+
+def test_snap_ties_in_the_order_added():
+    # both other rectangles have an edge 1 mm from the moving one, the first one added comes first
+    index = EdgeIndex([('first', 12.0, 20.0, 0.0, 1.0), ('second', -10.0, -1.0, 0.0, 1.0)])
+    assert index.snap_candidates('x', (0.0, 11.0), 2.0) == [(1.0, 1.0), (1.0, -1.0)]
+    # updating keeps the place, adding again moves it to the end
+    index.update('first', 12.0, 21.0, 0.0, 1.0)
+    assert index.snap_candidates('x', (0.0, 11.0), 2.0) == [(1.0, 1.0), (1.0, -1.0)]
+    index.add('first', 12.0, 21.0, 0.0, 1.0)
+    assert index.snap_candidates('x', (0.0, 11.0), 2.0) == [(1.0, -1.0), (1.0, 1.0)]
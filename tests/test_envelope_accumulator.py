@@ -0,0 +1,71 @@
+"""
+envelope accumulator checks: refining matches a from-scratch envelope and refine_until stops where it should
+"""
+
+import numpy as np
+import pytest
+
+from src.core.envelope_accumulator import EnvelopeAccumulator
+from src.core.influence_lines import influence_envelopes
+from src.core.reactions_BMD_SFD import SFD_BMDminmax
+from src.core.station_grid import StationGrid
+
+MASS = 400
+GRID = StationGrid.uniform(101)
+NAMES = ['sfe_min', 'sfe_max', 'bme_min', 'bme_max']
+
+
+@pytest.mark.parametrize('loadcase', [1, 2, 3])
+def test_refine_matches_from_scratch(loadcase):
+    acc = EnvelopeAccumulator(loadcase, MASS, num_train_positions=50, grid=GRID)
+    acc.refine()
+    acc.refine()
+    # positions that are already in are skipped
+    acc.add_positions(acc.positions[::3])
+    assert acc.num_positions == 4 * 49 + 1
+
+    refined = acc.envelope
+    scratch = influence_envelopes(loadcase, MASS, acc.positions, grid=GRID)
+    sampled = SFD_BMDminmax(acc.positions, loadcase, MASS, grid=GRID)
+    for name in NAMES:
+        assert np.array_equal(refined[name], scratch[name])
+        assert np.allclose(refined[name], sampled[name], rtol=1e-12, atol=1e-9)
+
+
+def test_envelope_is_a_copy():
+    acc = EnvelopeAccumulator(1, MASS, num_train_positions=20, grid=GRID)
+    before = acc.envelope
+    snapshot = before.bme_max.copy()
+    acc.refine()
+    assert np.array_equal(before.bme_max, snapshot)
+
+
+def test_refine_until_stops_at_tol():
+    acc = EnvelopeAccumulator(2, MASS, num_train_positions=20, grid=GRID)
+    acc.refine_until(tol=1e-3, max_positions=10 ** 6)
+    assert acc.last_change < 1e-3
+
+    # every refine before the last one moved the envelope by at least tol
+    check = EnvelopeAccumulator(2, MASS, num_train_positions=20, grid=GRID)
+    while check.num_positions < acc.num_positions:
+        change = check.refine()
+        if check.num_positions < acc.num_positions:
+            assert change >= 1e-3
+    assert check.num_positions == acc.num_positions
+
+    # a tol everything passes stops after one refine
+    acc = EnvelopeAccumulator(2, MASS, num_train_positions=20, grid=GRID)
+    acc.refine_until(tol=np.inf)
+    assert acc.num_positions == 39
+
+
+def test_refine_until_stops_at_max_positions():
+    # tol 0 never converges, so only max_positions stops it (20 -> 39 -> 77 -> 153)
+    acc = EnvelopeAccumulator(2, MASS, num_train_positions=20, grid=GRID)
+    acc.refine_until(tol=0, max_positions=200)
+    assert acc.num_positions == 153
+
+    # too small for even one refine
+    acc = EnvelopeAccumulator(2, MASS, num_train_positions=20, grid=GRID)
+    acc.refine_until(tol=0, max_positions=38)
+    assert acc.num_positions == 20
@@ -0,0 +1,55 @@
+"""
+on-disk envelope cache checks (keys, location and pruning)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from src.core import envelope_cache
+from src.core.envelope_cache import get_cache_dir, get_unit_envelopes, clear_envelope_cache, prune_disk_cache
+
+
+def test_default_cache_dir_is_user_cache(monkeypatch, tmp_path):
+    monkeypatch.delenv('BRIDGE_ENVELOPE_CACHE_DIR', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert get_cache_dir() == os.path.join(str(tmp_path), 'bridge_envelopes')
+
+    monkeypatch.setenv('BRIDGE_ENVELOPE_CACHE_DIR', '')
+    assert get_cache_dir() is None
+
+
+def test_key_changes_with_envelope_code(monkeypatch):
+    key = envelope_cache.envelope_key(1, num_points=11)
+    description, digest = envelope_cache._disk_key(key)
+    assert json.loads(description)['code'] == envelope_cache.code_fingerprint()
+
+    # any edit to the envelope code gives a different file
+    monkeypatch.setattr(envelope_cache, '_code_fingerprint', 'edited')
+    assert envelope_cache._disk_key(key)[1] != digest
+
+
+def test_round_trip_and_prune(monkeypatch, tmp_path):
+    monkeypatch.setenv('BRIDGE_ENVELOPE_CACHE_DIR', str(tmp_path))
+    clear_envelope_cache()
+    computed = get_unit_envelopes(1, num_points=11)
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2
+
+    # a fresh process would memory map the same values back
+    clear_envelope_cache()
+    loaded = get_unit_envelopes(1, num_points=11)
+    for name in envelope_cache.ENVELOPE_NAMES:
+        assert np.array_equal(loaded[name], computed[name])
+
+    # an entry from other code, an unreadable one and one still being written
+    stale = dict(json.loads((tmp_path / next(f for f in files if f.endswith('.json'))).read_text()), code='old')
+    (tmp_path / 'stale.json').write_text(json.dumps(stale))
+    np.save(tmp_path / 'stale.npy', np.zeros((4, 11)))
+    (tmp_path / 'broken.json').write_text('{')
+    np.save(tmp_path / 'saving.npy', np.zeros((4, 11)))
+
+    assert prune_disk_cache(str(tmp_path)) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(files + ['saving.npy'])
+    clear_envelope_cache()
@@ -0,0 +1,63 @@
+"""
+exact envelope checks against the sampled envelope and a dense sweep of train positions
+"""
+
+import numpy as np
+import pytest
+
+from src.core.BME_SFE import SFE_BMEvals, exact_envelopes, _train_range
+from src.core.reactions_BMD_SFD import point_values
+from src.core.station_grid import StationGrid
+from src.core.train import as_train
+
+MASS = 400
+
+# stations 25 mm apart, so the supports (25, 1225) and both ends are stations
+GRID = StationGrid.uniform(51)
+
+
+@pytest.mark.parametrize('loadcase', [1, 2, 3])
+def test_exact_never_below_sampled(loadcase):
+    exact = exact_envelopes(loadcase, MASS, grid=GRID)
+    sampled = SFE_BMEvals(loadcase, MASS, num_train_positions=1000, grid=GRID)
+
+    # the sampled positions are a subset of what the exact envelope covers
+    # (small slack for moments summed in a different order)
+    assert np.all(exact.sfe_max >= sampled.sfe_max - 1e-9)
+    assert np.all(exact.sfe_min <= sampled.sfe_min + 1e-9)
+    assert np.all(exact.bme_max >= sampled.bme_max - 1e-6)
+    assert np.all(exact.bme_min <= sampled.bme_min + 1e-6)
+
+
+@pytest.mark.parametrize('loadcase', [1, 2, 3])
+def test_exact_matches_dense_sweep(loadcase):
+    # off grid, on a support, at both ends and at midspan
+    stations = np.array([0.0, 25.0, 310.7, 625.0, 1000.0, 1225.0, 1250.0])
+    exact = exact_envelopes(loadcase, MASS, grid=stations)
+
+    # V and M are linear in the train position between events, so a fine enough sweep
+    # gets within its step times the slope of every value the exact envelope picks
+    x_start, x_end = _train_range(loadcase)
+    sweep = np.linspace(x_start, x_end, 400001)
+    step = sweep[1] - sweep[0]
+    # a wheel sitting exactly on a station counts its load there (same as SFDvals), and the
+    # sweep never lands on those positions, so add every station - wheel offset to it
+    on_station = (stations[:, None] - as_train(loadcase).offsets[None, :]).ravel()
+    positions = np.concatenate([sweep, on_station[(on_station >= x_start) & (on_station <= x_end)]])
+    V, M = point_values(stations[:, None], positions[None, :], loadcase, MASS)
+    # one sided limits at a jump are approached but never reached by the sweep,
+    # so also sweep just either side of every sample
+    V_left, M_left = point_values(stations[:, None], positions[None, :], loadcase, MASS, side=-1)
+    V_right, M_right = point_values(stations[:, None], positions[None, :], loadcase, MASS, side=1)
+    V_all = np.concatenate([V, V_left, V_right], axis=1)
+    M_all = np.concatenate([M, M_left, M_right], axis=1)
+
+    # total wheel load bounds dV/dx (over a span) and dM/dx
+    load = MASS * 9.81
+    V_tol = load / 1200 * step + 1e-9
+    M_tol = load * step + 1e-6
+
+    assert np.allclose(exact.sfe_max, V_all.max(axis=1), rtol=0, atol=V_tol)
+    assert np.allclose(exact.sfe_min, V_all.min(axis=1), rtol=0, atol=V_tol)
+    assert np.allclose(exact.bme_max, M_all.max(axis=1), rtol=0, atol=M_tol)
+    assert np.allclose(exact.bme_min, M_all.min(axis=1), rtol=0, atol=M_tol)
@@ -0,0 +1,59 @@
+"""
+FOS checks: the per-segment numpy sweep against find_FOS one station at a time
+"""
+
+import numpy as np
+import pytest
+
+from src.analysis.failure_loads import calculate_failure_loads
+from src.analysis.fos import find_FOS, FAILURE_MODES
+from src.core.section_cache import get_section_data
+from src.core.stress_envelope import get_stress_envelope, get_max_glue_stress, get_web_compression_stress
+from src.core.stresses import tau_cent
+from src.core.station_grid import StationGrid
+from src.cross_section_geometry.designs import design0, deep_midspan, get_segment_ranges, get_diaphragm_spacing_at_x
+from src.materials.material_properties import get_matboard_properties, get_glue_properties
+
+MATERIAL = {**get_matboard_properties(), **get_glue_properties()}
+GRID = StationGrid.uniform(1001)
+FOS_KEYS = [key for _, key in FAILURE_MODES] + ['min_fos']
+
+
+@pytest.mark.parametrize('design', [design0, deep_midspan])
+@pytest.mark.parametrize('loadcase', [1, 2])
+def test_sweep_matches_find_FOS(design, loadcase):
+    geometry = design()
+    results = calculate_failure_loads(geometry, loadcase, 452, MATERIAL, grid=GRID)
+
+    for i, x in enumerate(results['x']):
+        single = find_FOS(float(x), geometry, float(results['V_env'][i]), float(results['M_max'][i]),
+                          float(results['M_min'][i]), MATERIAL)
+        for key in FOS_KEYS:
+            assert results[key][i] == single[key], (x, key)
+        assert results.failure_mode[i] == single['failure_mode']
+
+
+@pytest.mark.parametrize('design', [design0, deep_midspan])
+def test_stress_helpers_same_for_numbers_and_arrays(design):
+    geometry = design()
+    results = calculate_failure_loads(geometry, 2, 452, MATERIAL, grid=GRID)
+    x, V, M_max, M_min = (np.asarray(results[name]) for name in ('x', 'V_env', 'M_max', 'M_min'))
+
+    for x_start, x_end, segment in get_segment_ranges(geometry):
+        on = np.flatnonzero((x >= x_start) & (x < x_end))
+        section_data = get_section_data(segment['plates'], segment['glue_joints'],
+                                        get_diaphragm_spacing_at_x(geometry, x_start), MATERIAL)
+        props = section_data['props']
+        web_plates = section_data['buckling']['web_plates']
+
+        def stresses(V_env, M_hi, M_lo):
+            envelope = get_stress_envelope(M_hi, M_lo, props['y_top'], props['y_bot'], props['I'])
+            return [envelope['tension_max'], envelope['compression_max'], envelope['top_compression'],
+                    tau_cent(V_env, props['Q_cent'], props['I'], props['b_cent']),
+                    get_max_glue_stress(section_data['section'], segment['glue_joints'], V_env, props['I']),
+                    get_web_compression_stress(web_plates, M_hi, M_lo, props['ybar'], props['I'])]
+
+        arrays = stresses(V[on], M_max[on], M_min[on])
+        for j, i in enumerate(on):
+            numbers = stresses(float(V[i]), float(M_max[i]), float(M_min[i]))
+            assert [float(a[j]) for a in arrays] == [float(n) for n in numbers]
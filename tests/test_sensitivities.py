@@ -0,0 +1,38 @@
+"""
+analytic FOS sensitivities against central finite differences
+"""
+
+import numpy as np
+import pytest
+
+from src.analysis.sensitivities import failure_load_sensitivities, finite_difference_sensitivities
+from src.cross_section_geometry.designs import design0, deep_midspan, simple_square
+from src.materials.material_properties import get_matboard_properties, get_glue_properties
+
+MATERIAL = {**get_matboard_properties(), **get_glue_properties()}
+
+
+@pytest.mark.parametrize('design', [design0, deep_midspan, simple_square])
+def test_matches_finite_differences(design):
+    analytic = failure_load_sensitivities(design(), 2, 1000, MATERIAL, num_points=1000)
+    numeric = finite_difference_sensitivities(design(), 2, 1000, MATERIAL, step=1e-5, x=analytic['x'],
+                                              num_points=1000)
+    assert np.allclose(analytic['d_fos'], numeric['d_fos'], rtol=1e-4, atol=1e-5)
+
+
+def test_ties_are_flagged():
+    # design0's top flange and glue tabs are all 1.27 thick, the stacked thickness is the min of a 3 way tie
+    result = failure_load_sensitivities(design0(), 2, 1000, MATERIAL, num_points=1000)
+    assert not result['differentiable']
+    assert any('top flange thickness' in kink for kink in result['kinks'])
+
+    # the thickness derivative is shared, not all given to one of the tied plates
+    h = 1
+    assert result['d_fos'][4, h] == pytest.approx(result['d_fos'][5, h])
+    assert result['d_fos'][4, h] > 0.1
+
+
+def test_no_ties_is_differentiable():
+    result = failure_load_sensitivities(simple_square(), 2, 1000, MATERIAL, num_points=1000)
+    assert result['differentiable']
+    assert result['kinks'] == []
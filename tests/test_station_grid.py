@@ -0,0 +1,46 @@
+"""
+station grid checks
+"""
+
+import numpy as np
+import pytest
+
+from src.core.station_grid import StationGrid, as_grid
+
+
+def test_uniform_matches_original_points():
+    grid = StationGrid.uniform(10000)
+    assert len(grid) == 10000
+    assert np.array_equal(grid.x, [i * 1250 / 9999 for i in range(10000)])
+
+
+def test_unsorted_stations_rejected():
+    with pytest.raises(ValueError):
+        StationGrid([0.0, 500.0, 250.0, 1250.0])
+
+
+def test_duplicate_stations_rejected():
+    with pytest.raises(ValueError):
+        StationGrid([0.0, 250.0, 250.0, 1250.0])
+    with pytest.raises(ValueError):
+        as_grid(np.array([0.0, 625.0, 625.0]))
+
+
+def test_stations_must_be_1d():
+    with pytest.raises(ValueError):
+        StationGrid(np.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        StationGrid([])
+
+
+def test_uniform_needs_two_stations():
+    for num_points in (0, 1):
+        with pytest.raises(ValueError):
+            StationGrid.uniform(num_points)
+    assert np.array_equal(StationGrid.uniform(2).x, [0.0, 1250.0])
+
+
+def test_adaptive_is_strictly_increasing():
+    grid = StationGrid.adaptive(1000, refine_at=[600.0, 625.0])
+    assert np.all(np.diff(grid.x) > 0)
+    assert grid.x[0] == 0 and grid.x[-1] == 1250
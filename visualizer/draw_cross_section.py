@@ -9,13 +9,32 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.cross_section_geometry.designs import simple_square, design0, cigar
+from src.cross_section_geometry.designs import simple_square, design0, cigar, is_prismatic, get_segment_ranges
 
 
 def draw_cross_section(geometry, title="Bridge Cross Section", show_dimensions=True):
+    """
+    draw the plates and glue joints of a design
+    segmented designs get one subplot per segment, titled with its x range
+    """
+    if is_prismatic(geometry):
+        fig, ax = plt.subplots(figsize=(10, 8))
+        draw_section(ax, geometry, title, show_dimensions)
+    else:
+        ranges = get_segment_ranges(geometry)
+        fig, axes = plt.subplots(1, len(ranges), figsize=(8 * len(ranges), 8), squeeze=False)
+        for ax, (x_start, x_end, segment) in zip(axes[0], ranges):
+            draw_section(ax, segment, f"{title}\nx = {x_start} to {x_end} mm", show_dimensions)
+
+    plt.tight_layout()
+
+    plt.show()
 
-    fig, ax = plt.subplots(figsize=(10, 8))
 
+def draw_section(ax, geometry, title, show_dimensions=True):
+    """
+    draw one cross section (dict with 'plates' and optionally 'glue_joints') on ax
+    """
     for plate in geometry['plates']:
         b = plate['b']
         h = plate['h']
@@ -81,10 +100,6 @@ def draw_cross_section(geometry, title="Bridge Cross Section", show_dimensions=T
     handles, labels = ax.get_legend_handles_labels()
     by_label = dict(zip(labels, handles))
     ax.legend(by_label.values(), by_label.keys(), loc='upper right')
-    
-    plt.tight_layout()
-
-    plt.show()
 
 
 if __name__ == "__main__":
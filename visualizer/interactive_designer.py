@@ -5,25 +5,76 @@ interactive cross section designer - drag boxes around and snap them together
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.widgets import TextBox, Button, RadioButtons
+from matplotlib.transforms import Bbox
 import sys
 import os
+import copy
+import time
+import traceback
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.cross_section_geometry.designs import design0, get_geometry_at_x
+from src.cross_section_geometry.designs import (design0, get_geometry_at_x, get_diaphragm_spacing_at_x,
+                                                is_prismatic, get_segment_ranges)
 from src.analysis.failure_loads import calculate_failure_loads
-from src.analysis.fos import find_FOS
+from src.analysis.fos import find_FOS_arrays, get_applied_stresses, fos_from_stresses
 from src.materials.material_properties import get_matboard_properties, get_glue_properties
-from src.core.BME_SFE import SFEvals, BMEvals
-from src.core.stress_envelope import get_section_properties, get_stress_envelope, get_max_glue_stress, get_web_compression_stress
-from src.core.stresses import tau_cent
-from src.core.buckling_analysis import get_buckling_capacities, get_flange_overhang_widths, get_stacked_thickness_vertical, get_stacked_thickness_horizontal
+from src.core.envelope_cache import get_envelopes
+from src.core.station_grid import as_grid
+from src.core.section_cache import get_section_data
+from src.core.section_accumulator import SectionAccumulator
+from src.visualization.edge_index import EdgeIndex
+from src.core.buckling_analysis import get_flange_overhang_widths, get_stacked_thickness_vertical, get_stacked_thickness_horizontal
 from src.core.geometric_properties import glue_width
 
+# how the metrics panel names each failure mode from fos.FAILURE_MODES
+FAILURE_LABELS = {
+    'tension': 'Tension',
+    'compression': 'Compression',
+    'shear': 'Shear',
+    'glue': 'Glue',
+    'flexural_buckling_case1': 'Buck case 1',
+    'flexural_buckling_case2': 'Buck case 2',
+    'flexural_buckling_case3': 'Buck case 3',
+    'shear_buckling': 'Shear buck'
+}
+
+
+def plate_box(plate):
+    """left, right, bottom, top of a plate"""
+    return (plate['x'] - plate['b'] / 2, plate['x'] + plate['b'] / 2,
+            plate['y'] - plate['h'] / 2, plate['y'] + plate['h'] / 2)
+
 
 class InteractiveDesigner:
-    def __init__(self, geometry):
+    def __init__(self, geometry, segment=0, verbose=False):
+        """
+        Input =
+            geometry: design to edit (edited in place)
+            segment: for segmented designs, index of the segment whose cross section is edited
+                (the live metrics and analysis still run over the whole bridge)
+            verbose: print progress of every live metrics job (they run on every edit)
+        """
+        self.verbose = verbose
+        # self.design is the whole bridge, self.geometry is the cross section being edited
+        # (the same dict for prismatic designs, one of design['segments'] otherwise)
+        self.design = geometry
+        self.segment_index = None
+        self.segment_range = None
+        if not is_prismatic(geometry):
+            ranges = get_segment_ranges(geometry)
+            if not 0 <= segment < len(ranges):
+                raise ValueError(f"segment {segment} out of range, design has {len(ranges)} segments")
+            x_start, x_end, geometry = ranges[segment]
+            self.segment_index = segment
+            self.segment_range = (x_start, x_end)
         self.geometry = geometry
+        # ybar / I kept up to date one plate at a time as plates are edited
+        self.section = SectionAccumulator(geometry['plates'])
+        # sorted plate edges for snapping and overlap checks
+        self.edge_index = EdgeIndex((id(p),) + plate_box(p) for p in geometry['plates'])
         self.fig = plt.figure(figsize=(18, 10))  # wider for 3 columns
         self.ax = self.fig.add_axes([0.03, 0.15, 0.38, 0.8])  # main plot area - narrower
         self.rectangles = []  # list of (rect patch, plate dict, index)
@@ -33,6 +84,12 @@ class InteractiveDesigner:
         self.drag_offset = None
         self.snap_threshold = 2.0  # mm - how close to snap
 
+        # blitting while dragging: everything except the dragged artist is cached as the background
+        # (the plot area and the preview line separately, so each can be blitted on its own)
+        self.drag_artist = None
+        self.drag_background = None
+        self.preview_background = None
+
         # glue joint dragging
         self.dragging_glue = False
         self.selected_glue_index = None
@@ -40,13 +97,27 @@ class InteractiveDesigner:
         # editor panel widgets
         self.editor_widgets = {}
 
-        # envelope cache for BME/SFE - key is (loadcase, mass)
-        self.envelope_cache = {}
+        # BME/SFE come from the shared envelope cache (unit mass, scaled)
         self.current_loadcase = 2
         self.current_mass = 1000
 
         # metrics panel text annotations
         self.metrics_text = None
+        self.metrics_display = ''
+
+        # live metrics run on one background thread so the UI doesn't freeze,
+        # every request bumps the generation and results from older generations are dropped
+        self.metrics_executor = ThreadPoolExecutor(max_workers=1)
+        self.metrics_generation = 0
+        self.metrics_future = None
+        self.metrics_timer = None
+        self.metrics_preview = False
+
+        # coarse preview while dragging (refined to the full grid on release)
+        self.preview_points = 300  # stations in the preview grid
+        self.preview_time_budget = 0.05  # s, the preview sweep stops after this
+        self.preview_interval = 0.1  # s, at most one preview per interval
+        self.last_preview = 0.0
 
         # glue joint visuals
         self.glue_lines = []  # list of Line2D objects
@@ -62,8 +133,10 @@ class InteractiveDesigner:
         self.ax.set_aspect('equal')
         self.ax.set_xlabel('Width (mm)', fontsize=12)
         self.ax.set_ylabel('Height (mm)', fontsize=12)
-        self.ax.set_title('Interactive Designer - Drag plates, N=new plate, D=delete, G=add glue joint',
-                         fontsize=11, fontweight='bold')
+        title = 'Interactive Designer - Drag plates, N=new plate, D=delete, G=add glue joint'
+        if self.segment_index is not None:
+            title += f'\nsegment {self.segment_index} (x = {self.segment_range[0]} to {self.segment_range[1]} mm)'
+        self.ax.set_title(title, fontsize=11, fontweight='bold')
         self.ax.grid(True, alpha=0.3)
         self.ax.set_xlim(-20, 120)
         self.ax.set_ylim(-20, 120)
@@ -140,6 +213,15 @@ class InteractiveDesigner:
             family='monospace'
         )
 
+        # one line summary of the coarse preview while dragging, above the full text
+        # (it's the only text redrawn during a drag, the full text is refreshed on release)
+        self.preview_text = metrics_ax.text(0.05, 0.99, '', fontsize=9, va='top', family='monospace',
+                                            color='darkorange')
+
+        # results come back on the worker thread, this polls for them on the GUI thread
+        self.metrics_timer = self.fig.canvas.new_timer(interval=50)
+        self.metrics_timer.add_callback(self.poll_metrics)
+
     def draw_all_plates(self):
         # clear existing rectangles
         for rect, _, _ in self.rectangles:
@@ -203,6 +285,61 @@ class InteractiveDesigner:
         self.fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
         self.fig.canvas.mpl_connect('button_release_event', self.on_release)
         self.fig.canvas.mpl_connect('key_press_event', self.on_key_press)
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def start_blit(self, artist):
+        """start dragging artist: draw everything else once and keep it as the background"""
+        self.drag_artist = artist
+        if not self.fig.canvas.supports_blit:
+            return
+        # the preview line is left out of the backgrounds too so previews can be blitted on their own
+        # (the full metrics text stays in the background, redrawing it on every preview is too slow)
+        artist.set_animated(True)
+        self.preview_text.set_animated(True)
+        # the full draw leaves out the animated artists, on_draw grabs the backgrounds
+        self.fig.canvas.draw()
+
+    def preview_bbox(self):
+        """strip at the top of the metrics column the preview line is drawn in"""
+        metrics_ax = self.editor_widgets['metrics_ax']
+        _, y0 = metrics_ax.transAxes.transform((0, 0.955))
+        return Bbox.from_extents(metrics_ax.bbox.x0, y0, self.fig.bbox.x1, self.fig.bbox.y1)
+
+    def on_draw(self, event):
+        """re-cache the backgrounds after any full redraw (resize...) during a drag"""
+        if self.drag_artist is not None and self.drag_artist.get_animated():
+            self.drag_background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+            self.preview_background = self.fig.canvas.copy_from_bbox(self.preview_bbox())
+            self.ax.draw_artist(self.drag_artist)
+            self.editor_widgets['metrics_ax'].draw_artist(self.preview_text)
+
+    def blit_drag(self):
+        """redraw only the dragged artist on top of the cached plot background"""
+        if self.drag_background is None:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self.drag_background)
+        self.ax.draw_artist(self.drag_artist)
+        self.fig.canvas.blit(self.ax.bbox)
+
+    def blit_preview(self):
+        """redraw only the preview line (new preview result during a drag)"""
+        if self.preview_background is None:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self.preview_background)
+        self.editor_widgets['metrics_ax'].draw_artist(self.preview_text)
+        self.fig.canvas.blit(self.preview_bbox())
+
+    def stop_blit(self):
+        """done dragging, the artists go back to being drawn normally"""
+        if self.drag_artist is not None:
+            self.drag_artist.set_animated(False)
+        self.preview_text.set_animated(False)
+        self.preview_text.set_text('')
+        self.drag_artist = None
+        self.drag_background = None
+        self.preview_background = None
 
     def on_press(self, event):
         if event.inaxes != self.ax:
@@ -219,6 +356,7 @@ class InteractiveDesigner:
                     # start dragging this glue joint
                     self.dragging_glue = True
                     self.selected_glue_index = i
+                    self.start_blit(line)
                     print(f"[glue] selected glue joint {i} for dragging")
                     return
 
@@ -229,6 +367,7 @@ class InteractiveDesigner:
                     self.select_plate(rect, plate, index)
                     self.dragging = True
                     self.drag_offset = (event.xdata - plate['x'], event.ydata - plate['y'])
+                    self.start_blit(rect)
                     return
 
             # clicked empty space - deselect
@@ -245,8 +384,9 @@ class InteractiveDesigner:
             if self.selected_glue_index < len(glue_joints):
                 # update glue joint y position
                 glue_joints[self.selected_glue_index] = event.ydata
-                # redraw glue lines
-                self.draw_glue_joints()
+                # move just this line
+                self.glue_lines[self.selected_glue_index].set_ydata([event.ydata, event.ydata])
+                self.blit_drag()
             return
 
         # dragging plate
@@ -259,18 +399,31 @@ class InteractiveDesigner:
 
             plate['x'] = new_x
             plate['y'] = new_y
+            self.section.update(plate)
 
             # update rectangle
             x_corner = new_x - plate['b'] / 2
             y_corner = new_y - plate['h'] / 2
             rect.set_xy((x_corner, y_corner))
 
-            self.fig.canvas.draw()
+            self.blit_drag()
+            self.preview_metrics()
+
+    def preview_metrics(self):
+        """coarse metrics while dragging, throttled and skipped while the worker is still busy"""
+        now = time.perf_counter()
+        if now - self.last_preview < self.preview_interval:
+            return
+        if self.metrics_future is not None and not self.metrics_future.done():
+            return
+        self.last_preview = now
+        self.update_metrics_panel(num_points=self.preview_points, time_budget=self.preview_time_budget)
 
     def on_release(self, event):
         # releasing glue joint drag
         if self.dragging_glue:
             print(f"[release] glue joint released")
+            self.stop_blit()
             glue_joints = self.geometry.get('glue_joints', [])
             if self.selected_glue_index < len(glue_joints):
                 # snap to nearest plate edge
@@ -300,10 +453,13 @@ class InteractiveDesigner:
             return
 
         print(f"[release] mouse released, plate moved")
+        self.stop_blit()
         rect, plate, _ = self.selected
 
         # snap to nearest edges
         self.snap_to_edges(plate)
+        self.section.update(plate)
+        self.edge_index.update(id(plate), *plate_box(plate))
 
         # update rectangle after snapping
         x_corner = plate['x'] - plate['b'] / 2
@@ -419,6 +575,8 @@ class InteractiveDesigner:
             new_type = self.editor_widgets['type'].value_selected
             print(f"[edit] changing plate type to: {new_type}")
             plate['plate_type'] = new_type
+            self.section.update(plate)
+            self.edge_index.update(id(plate), *plate_box(plate))
 
             self.draw_all_plates()
             # reselect the same plate after redraw
@@ -439,8 +597,11 @@ class InteractiveDesigner:
         if self.selected_plate is None:
             return
 
-        _, _, index = self.selected
-        self.geometry['plates'] = [p for i, p in enumerate(self.geometry['plates']) if i != index]
+        _, plate, index = self.selected
+        self.section.remove(plate)
+        self.edge_index.remove(id(plate))
+        # in place, segments can share one plates list (deep_midspan's ends do)
+        del self.geometry['plates'][index]
         self.selected = None
         self.selected_plate = None
         self.draw_all_plates()
@@ -460,6 +621,8 @@ class InteractiveDesigner:
             'plate_type': 'top_flange'
         }
         self.geometry['plates'].append(new_plate)
+        self.section.add(new_plate)
+        self.edge_index.add(id(new_plate), *plate_box(new_plate))
         self.draw_all_plates()
         # auto-select the new plate
         for rect, p, idx in self.rectangles:
@@ -551,49 +714,24 @@ class InteractiveDesigner:
                 best_snap_x = candidate_x
                 best_dist_x = 0
 
-        # check against all other plates
-        for _, other_plate, _ in self.rectangles:
-            if other_plate is plate:
-                continue
-
-            other_left = other_plate['x'] - other_plate['b'] / 2
-            other_right = other_plate['x'] + other_plate['b'] / 2
-            other_top = other_plate['y'] + other_plate['h'] / 2
-            other_bottom = other_plate['y'] - other_plate['h'] / 2
-
-            # check all edge combinations for x
-            x_snaps = [
-                (left, other_left, 0),  # left to left
-                (left, other_right, 0),  # left to right
-                (right, other_left, 0),  # right to left
-                (right, other_right, 0),  # right to right
-            ]
-
-            for edge, other_edge, _ in x_snaps:
-                dist = abs(edge - other_edge)
-                if dist < best_dist_x:
-                    offset = other_edge - edge
-                    candidate_x = plate['x'] + offset
-                    if not self.would_overlap(plate, plate['y'], candidate_x):
-                        best_dist_x = dist
-                        best_snap_x = candidate_x
-
-            # check all edge combinations for y
-            y_snaps = [
-                (top, other_top, 0),  # top to top
-                (top, other_bottom, 0),  # top to bottom
-                (bottom, other_top, 0),  # bottom to top
-                (bottom, other_bottom, 0),  # bottom to bottom
-            ]
-
-            for edge, other_edge, _ in y_snaps:
-                dist = abs(edge - other_edge)
-                if dist < best_dist_y:
-                    offset = other_edge - edge
-                    candidate_y = plate['y'] + offset
-                    if not self.would_overlap(plate, candidate_y, plate['x']):
-                        best_dist_y = dist
-                        best_snap_y = candidate_y
+        # check against the other plates, the edge index only gives edges within the threshold (nearest first)
+        for dist, offset in self.edge_index.snap_candidates('x', (left, right), self.snap_threshold, exclude=id(plate)):
+            if dist >= best_dist_x:
+                break
+            candidate_x = plate['x'] + offset
+            if not self.would_overlap(plate, plate['y'], candidate_x):
+                best_dist_x = dist
+                best_snap_x = candidate_x
+                break
+
+        for dist, offset in self.edge_index.snap_candidates('y', (top, bottom), self.snap_threshold, exclude=id(plate)):
+            if dist >= best_dist_y:
+                break
+            candidate_y = plate['y'] + offset
+            if not self.would_overlap(plate, candidate_y, plate['x']):
+                best_dist_y = dist
+                best_snap_y = candidate_y
+                break
 
         # apply snaps
         if best_snap_x is not None:
@@ -601,305 +739,379 @@ class InteractiveDesigner:
         if best_snap_y is not None:
             plate['y'] = best_snap_y
 
-    def get_cached_envelopes(self, loadcase, mass):
-        """get or calculate cached BME/SFE"""
-        cache_key = (loadcase, mass)
-        if cache_key not in self.envelope_cache:
-            print(f"[cache] calculating envelopes for loadcase={loadcase}, mass={mass}...")
-            # calculate and cache the envelopes
-            sfe_min, sfe_max = SFEvals(loadcase, mass)
-            bme_min, bme_max = BMEvals(loadcase, mass)
-            self.envelope_cache[cache_key] = {
-                'sfe_min': sfe_min,
-                'sfe_max': sfe_max,
-                'bme_min': bme_min,
-                'bme_max': bme_max
-            }
-            print(f"[cache] envelopes cached")
-        else:
-            print(f"[cache] using cached envelopes for loadcase={loadcase}, mass={mass}")
-        return self.envelope_cache[cache_key]
+    def get_cached_envelopes(self, loadcase, mass, grid=None):
+        """get cached BME/SFE as one Envelope (computed once per loadcase and grid, scaled to mass)"""
+        return get_envelopes(loadcase, mass, grid=grid)
 
-    def calculate_live_metrics(self):
+    def calculate_live_metrics(self, grid=None, geometry=None, loadcase=None, mass=None, num_points=10000, time_budget=None):
         """
         calculate all metrics for live display
+        grid: StationGrid (or array of stations) to sweep, overrides num_points
+        geometry, loadcase, mass: what to analyse, default the designer's current ones
+            (the background worker passes a copy of the geometry so dragging doesn't change it mid sweep)
+        num_points: number of evenly spaced stations to sweep (default 10,000, a few hundred for a preview)
+        time_budget: seconds to spend on the sweep, None for no limit
+            (stations are then visited coarse to fine so stopping early still covers the whole bridge)
         returns dict with section props, stresses, buckling details, FOS, etc
+            (plus num_stations and complete = False if the time budget ran out)
         """
-        print(f"[metrics] starting calculation...")
+        start_time = time.perf_counter()
+        if geometry is None:
+            geometry = self.design
+        if loadcase is None:
+            loadcase = self.current_loadcase
+        if mass is None:
+            mass = self.current_mass
+
+        # previews (time_budget set) come in on every mouse move, they don't log anything
+        preview = time_budget is not None
+        self.log(f"[metrics] starting calculation...", preview)
         # material props
         matboard = get_matboard_properties()
         glue = get_glue_properties()
         material_props = {**matboard, **glue}
 
         # get cached envelopes
-        envelopes = self.get_cached_envelopes(self.current_loadcase, self.current_mass)
-        sfe_min = envelopes['sfe_min']
-        sfe_max = envelopes['sfe_max']
-        bme_min = envelopes['bme_min']
-        bme_max = envelopes['bme_max']
-
-        # find critical location by sweeping all 10,000 points
-        bridge_length = 1250
-        num_points = 10000
-        x_vals = [i * bridge_length / (num_points - 1) for i in range(num_points)]
-
-        min_fos_overall = float('inf')
-        critical_x = 0
-        critical_metrics = None
-
-        for i, x in enumerate(x_vals):
-            # get geometry at x
-            plates, glue_joints = get_geometry_at_x(self.geometry, x)
-            if not plates:
-                continue
+        envelope = self.get_cached_envelopes(loadcase, mass, as_grid(grid, num_points))
+        x_vals = envelope.x
+
+        # sweep with numpy one segment at a time (same as calculate_failure_loads), the cross section is
+        # constant inside a segment so it's a handful of array expressions instead of a python loop per station
+        ranges = get_segment_ranges(geometry)
+        starts = np.array([x_start for x_start, _, _ in ranges], dtype=float)
+        segment_of_station = np.maximum(np.searchsorted(starts, x_vals, side='right') - 1, 0)
+
+        batches = [np.arange(len(x_vals))]
+        if time_budget is not None:
+            # every 16th station first, then the ones in between
+            batches = [np.arange(offset, len(x_vals), 16) for offset in range(16)]
+
+        min_fos = np.full(len(x_vals), np.inf)
+        num_checked = 0
+        for batch in batches:
+            if time_budget is not None and time.perf_counter() - start_time > time_budget:
+                break
+            num_checked += len(batch)
+            for k, (x_start, _, segment) in enumerate(ranges):
+                on = batch[segment_of_station[batch] == k]
+                if not len(on) or not segment['plates']:
+                    continue
+                diaphragm_spacing = get_diaphragm_spacing_at_x(geometry, x_start)
+                section_data = get_section_data(segment['plates'], segment['glue_joints'], diaphragm_spacing,
+                                                material_props)
+                fos = find_FOS_arrays(section_data, segment['glue_joints'], envelope.V_env[on],
+                                      envelope.bme_max[on], envelope.bme_min[on], material_props)
+                min_fos[on] = fos['min_fos']
+
+        # first station with the lowest FOS, the details are only worked out there
+        i = int(np.argmin(min_fos))
+        if not np.isfinite(min_fos[i]):
+            self.log(f"[metrics] done - no FOS ({num_checked} of {len(x_vals)} stations)", preview)
+            return {}
+        critical_metrics = self.station_metrics(geometry, float(x_vals[i]), float(envelope.V_env[i]),
+                                                float(envelope.bme_max[i]), float(envelope.bme_min[i]),
+                                                mass, material_props)
+
+        self.log(f"[metrics] done - min FOS: {critical_metrics['min_fos']:.2f} at x={critical_metrics['critical_x']:.1f}mm ({num_checked} of {len(x_vals)} stations)", preview)
+        critical_metrics['num_stations'] = num_checked
+        critical_metrics['complete'] = num_checked == len(x_vals)
+        return critical_metrics
+
+    def station_metrics(self, geometry, x, V_env, M_max, M_min, mass, material_props):
+        """
+        section props, stresses, buckling details and FOS at one station (the critical one)
+        V_env, M_max, M_min: envelope values at x
+        """
+        plates, glue_joints = get_geometry_at_x(geometry, x)
+
+        # section properties and buckling capacities (cached per distinct cross section)
+        diaphragm_spacing = get_diaphragm_spacing_at_x(geometry, x)
+        section_data = get_section_data(plates, glue_joints, diaphragm_spacing, material_props)
+        props = section_data['props']
+        buckling = section_data['buckling']
+
+        # stresses and FOS (same code as the sweep, for a single station)
+        stresses = get_applied_stresses(section_data, glue_joints, [V_env], [M_max], [M_min])
+        fos = fos_from_stresses(stresses, section_data, material_props)
+        stresses = {name: float(value[0]) for name, value in stresses.items()}
+        fos_tens, fos_comp, fos_shear, fos_glue, fos_buck1, fos_buck2, fos_buck3, fos_buckV, min_fos = (
+            float(fos[name][0]) for name in ('fos_tens', 'fos_comp', 'fos_shear', 'fos_glue',
+                                             'fos_buck1', 'fos_buck2', 'fos_buck3', 'fos_buckV', 'min_fos'))
+
+        # get detailed info for critical location
+        web_plates = [p for p in plates if p.get('plate_type') == 'web']
+        top_plates = [p for p in plates if p.get('plate_type') == 'top_flange']
+
+        # calculate area
+        total_area = sum(p['b'] * p['h'] for p in plates)
+
+        # calculate max glue width
+        max_glue_width = 0
+        if glue_joints:
+            for glue_y in glue_joints:
+                gw = glue_width(plates, glue_y)
+                max_glue_width = max(max_glue_width, gw)
+
+        # buckling dimensions
+        if top_plates:
+            overhang_info = get_flange_overhang_widths(top_plates, web_plates)
+            t_top = get_stacked_thickness_vertical(top_plates)
+            b_case1 = overhang_info['inside_width']
+            b_case2 = overhang_info['max_overhang']
+        else:
+            t_top = 0
+            b_case1 = 0
+            b_case2 = 0
+
+        if web_plates:
+            web_top = max(p['y'] + p['h']/2 for p in web_plates)
+            b_case3 = web_top - props['ybar']  # compression zone height
+            t_web = get_stacked_thickness_horizontal(web_plates)
+            h_web = max(p['h'] for p in web_plates)
+            a_spacing = diaphragm_spacing if diaphragm_spacing else 0
+        else:
+            b_case3 = 0
+            t_web = 0
+            h_web = 0
+            a_spacing = 0
 
+        # failure mode
+        failure_mode = FAILURE_LABELS[str(fos['failure_mode'][0])]
+
+        critical_metrics = {
             # section properties
-            props = get_section_properties(plates, glue_joints)
-
-            # envelope values at this point
-            V_env = max(abs(sfe_min[i]), abs(sfe_max[i]))
-            M_max = bme_max[i]
-            M_min = bme_min[i]
-
-            # stresses
-            stresses = get_stress_envelope(M_max, M_min, props['y_top'], props['y_bot'], props['I'])
-            tau_c = tau_cent(V_env, props['Q_cent'], props['I'], props['b_cent'])
-            tau_glue_max = get_max_glue_stress(plates, glue_joints, V_env, props['I'])
-
-            # buckling
-            E = material_props['E']
-            nu = material_props['nu']
-            diaphragm_spacing = self.geometry.get('diaphragm_spacing')
-            buckling = get_buckling_capacities(plates, E, nu, props['ybar'], diaphragm_spacing=diaphragm_spacing)
-
-            # web compression stress for case 3
-            sigma_web = get_web_compression_stress(buckling['web_plates'], M_max, M_min, props['ybar'], props['I']) if buckling['web_plates'] else 0
-
-            # calculate FOS values
-            def calc_fos(applied, capacity):
-                if abs(applied) < 1e-10:
-                    return float('inf')
-                return capacity / abs(applied)
-
-            fos_tens = calc_fos(stresses['tension_max'], material_props['sigma_tens'])
-            fos_comp = calc_fos(stresses['compression_max'], material_props['sigma_comp'])
-            fos_shear = calc_fos(tau_c, material_props['tau_max'])
-            fos_glue = calc_fos(tau_glue_max, material_props['tau_glue_max'])
-            fos_buck1 = calc_fos(stresses['top_compression'], buckling['top_flange_inside'])
-            fos_buck2 = calc_fos(stresses['top_compression'], buckling['top_flange_overhang'])
-            fos_buck3 = calc_fos(sigma_web, buckling['web']) if buckling['web_plates'] else float('inf')
-            fos_buckV = calc_fos(tau_c, buckling['shear'])
-
-            # find overall min
-            all_fos = [fos_tens, fos_comp, fos_shear, fos_glue, fos_buck1, fos_buck2, fos_buck3, fos_buckV]
-            local_min_fos = min(all_fos)
-
-            if local_min_fos < min_fos_overall:
-                min_fos_overall = local_min_fos
-                critical_x = x
-
-                # get detailed info for critical location
-                web_plates = [p for p in plates if p.get('plate_type') == 'web']
-                top_plates = [p for p in plates if p.get('plate_type') == 'top_flange']
-
-                # calculate area
-                total_area = sum(p['b'] * p['h'] for p in plates)
-
-                # calculate max glue width
-                max_glue_width = 0
-                if glue_joints:
-                    for glue_y in glue_joints:
-                        gw = glue_width(plates, glue_y)
-                        max_glue_width = max(max_glue_width, gw)
-
-                # buckling dimensions
-                if top_plates:
-                    overhang_info = get_flange_overhang_widths(top_plates, web_plates)
-                    t_top = get_stacked_thickness_vertical(top_plates)
-                    b_case1 = overhang_info['inside_width']
-                    b_case2 = overhang_info['max_overhang']
-                else:
-                    t_top = 0
-                    b_case1 = 0
-                    b_case2 = 0
-
-                if web_plates:
-                    web_top = max(p['y'] + p['h']/2 for p in web_plates)
-                    b_case3 = web_top - props['ybar']  # compression zone height
-                    t_web = get_stacked_thickness_horizontal(web_plates)
-                    h_web = max(p['h'] for p in web_plates)
-                    a_spacing = diaphragm_spacing if diaphragm_spacing else 0
-                else:
-                    b_case3 = 0
-                    t_web = 0
-                    h_web = 0
-                    a_spacing = 0
-
-                # failure mode
-                fos_dict = {
-                    'Tension': fos_tens,
-                    'Compression': fos_comp,
-                    'Shear': fos_shear,
-                    'Glue': fos_glue,
-                    'Buck case 1': fos_buck1,
-                    'Buck case 2': fos_buck2,
-                    'Buck case 3': fos_buck3,
-                    'Shear buck': fos_buckV
-                }
-                failure_mode = min(fos_dict, key=fos_dict.get)
-
-                critical_metrics = {
-                    # section properties
-                    'ybar': props['ybar'],
-                    'I': props['I'],
-                    'area': total_area,
-                    'y_top': props['y_top'],
-                    'y_bot': props['y_bot'],
-
-                    # applied stresses
-                    'tension_stress': stresses['tension_max'],
-                    'compression_stress': stresses['compression_max'],
-                    'top_compression_stress': stresses['top_compression'],
-                    'shear_stress': tau_c,
-                    'glue_stress': tau_glue_max,
-                    'web_compression_stress': sigma_web,
-
-                    # buckling case 1
-                    'buck1_t': t_top,
-                    'buck1_b': b_case1,
-                    'buck1_capacity': buckling['top_flange_inside'],
-                    'fos_buck1': fos_buck1,
-
-                    # buckling case 2
-                    'buck2_t': t_top,
-                    'buck2_b': b_case2,
-                    'buck2_capacity': buckling['top_flange_overhang'],
-                    'fos_buck2': fos_buck2,
-
-                    # buckling case 3
-                    'buck3_t': t_web,
-                    'buck3_b': b_case3,
-                    'buck3_capacity': buckling['web'],
-                    'fos_buck3': fos_buck3,
-
-                    # shear buckling
-                    'buckV_h': h_web,
-                    'buckV_t': t_web,
-                    'buckV_a': a_spacing,
-                    'buckV_capacity': buckling['shear'],
-                    'fos_buckV': fos_buckV,
-
-                    # glue
-                    'glue_width': max_glue_width,
-                    'fos_glue': fos_glue,
-
-                    # other FOS
-                    'fos_tens': fos_tens,
-                    'fos_comp': fos_comp,
-                    'fos_shear': fos_shear,
-
-                    # overall
-                    'min_fos': min_fos_overall,
-                    'failure_mode': failure_mode,
-                    'max_load': min_fos_overall * self.current_mass,
-                    'critical_x': critical_x
-                }
-
-        print(f"[metrics] done - min FOS: {min_fos_overall:.2f} at x={critical_x:.1f}mm")
-        return critical_metrics if critical_metrics else {}
-
-    def update_metrics_panel(self):
-        """update the metrics display with current geometry"""
-        print(f"[update] updating metrics panel...")
-        try:
-            metrics = self.calculate_live_metrics()
+            'ybar': props['ybar'],
+            'I': props['I'],
+            'area': total_area,
+            'y_top': props['y_top'],
+            'y_bot': props['y_bot'],
+
+            # applied stresses
+            'tension_stress': stresses['tension_max'],
+            'compression_stress': stresses['compression_max'],
+            'top_compression_stress': stresses['top_compression'],
+            'shear_stress': stresses['shear'],
+            'glue_stress': stresses['glue'],
+            'web_compression_stress': stresses['web_compression'],
+
+            # buckling case 1
+            'buck1_t': t_top,
+            'buck1_b': b_case1,
+            'buck1_capacity': buckling['top_flange_inside'],
+            'fos_buck1': fos_buck1,
+
+            # buckling case 2
+            'buck2_t': t_top,
+            'buck2_b': b_case2,
+            'buck2_capacity': buckling['top_flange_overhang'],
+            'fos_buck2': fos_buck2,
+
+            # buckling case 3
+            'buck3_t': t_web,
+            'buck3_b': b_case3,
+            'buck3_capacity': buckling['web'],
+            'fos_buck3': fos_buck3,
+
+            # shear buckling
+            'buckV_h': h_web,
+            'buckV_t': t_web,
+            'buckV_a': a_spacing,
+            'buckV_capacity': buckling['shear'],
+            'fos_buckV': fos_buckV,
+
+            # glue
+            'glue_width': max_glue_width,
+            'fos_glue': fos_glue,
+
+            # other FOS
+            'fos_tens': fos_tens,
+            'fos_comp': fos_comp,
+            'fos_shear': fos_shear,
+
+            # overall
+            'min_fos': min_fos,
+            'failure_mode': failure_mode,
+            'max_load': min_fos * mass,
+            'critical_x': x
+        }
 
-            if not metrics:
-                text = 'No plates in geometry'
-                print(f"[update] no metrics to display")
-            else:
-                print(f"[update] formatting metrics display...")
-                # format the metrics display
-                lines = []
-                lines.append('SECTION PROPERTIES')
-                lines.append(f'  ybar: {metrics["ybar"]} mm')
-                lines.append(f'  I: {metrics["I"]} mm^4')
-                lines.append(f'  area: {metrics["area"]} mm^2')
-                lines.append(f'  y_top: {metrics["y_top"]} mm')
-                lines.append(f'  y_bot: {metrics["y_bot"]} mm')
-                lines.append('')
-
-                lines.append('APPLIED STRESSES (at critical x)')
-                lines.append(f'  tension: {metrics["tension_stress"]} MPa')
-                lines.append(f'  comp: {metrics["compression_stress"]} MPa')
-                lines.append(f'  top comp: {metrics["top_compression_stress"]} MPa')
-                lines.append(f'  shear: {metrics["shear_stress"]} MPa')
-                lines.append(f'  glue: {metrics["glue_stress"]} MPa')
-                lines.append(f'  web comp: {metrics["web_compression_stress"]} MPa')
-                lines.append('')
-
-                lines.append('BUCKLING CASE 1 (top flange inside)')
-                lines.append(f'  t: {metrics["buck1_t"]} mm')
-                lines.append(f'  b: {metrics["buck1_b"]} mm')
-                cap1 = metrics["buck1_capacity"]
-                lines.append(f'  capacity: {cap1} MPa' if cap1 != float('inf') else '  capacity: inf MPa')
-                fos1 = metrics["fos_buck1"]
-                lines.append(f'  FOS: {fos1}' if fos1 != float('inf') else '  FOS: inf')
-                lines.append('')
-
-                lines.append('BUCKLING CASE 2 (top flange overhang)')
-                lines.append(f'  t: {metrics["buck2_t"]} mm')
-                lines.append(f'  b: {metrics["buck2_b"]} mm')
-                cap2 = metrics["buck2_capacity"]
-                lines.append(f'  capacity: {cap2} MPa' if cap2 != float('inf') else '  capacity: inf MPa')
-                fos2 = metrics["fos_buck2"]
-                lines.append(f'  FOS: {fos2}' if fos2 != float('inf') else '  FOS: inf')
-                lines.append('')
-
-                lines.append('BUCKLING CASE 3 (web)')
-                lines.append(f'  t: {metrics["buck3_t"]} mm')
-                lines.append(f'  b: {metrics["buck3_b"]} mm')
-                cap3 = metrics["buck3_capacity"]
-                lines.append(f'  capacity: {cap3} MPa' if cap3 != float('inf') else '  capacity: inf MPa')
-                fos3 = metrics["fos_buck3"]
-                lines.append(f'  FOS: {fos3}' if fos3 != float('inf') else '  FOS: inf')
-                lines.append('')
-
-                lines.append('SHEAR BUCKLING')
-                lines.append(f'  h: {metrics["buckV_h"]} mm')
-                lines.append(f'  t: {metrics["buckV_t"]} mm')
-                lines.append(f'  a: {metrics["buckV_a"]} mm')
-                capV = metrics["buckV_capacity"]
-                lines.append(f'  capacity: {capV} MPa' if capV != float('inf') else '  capacity: inf MPa')
-                fosV = metrics["fos_buckV"]
-                lines.append(f'  FOS: {fosV}' if fosV != float('inf') else '  FOS: inf')
-                lines.append('')
-
-                lines.append('GLUE SHEAR')
-                lines.append(f'  glue width: {metrics["glue_width"]} mm')
-                lines.append(f'  FOS: {metrics["fos_glue"]}')
-                lines.append('')
-
-                lines.append('SUMMARY')
-                lines.append(f'  min FOS: {metrics["min_fos"]}')
-                lines.append(f'  failure: {metrics["failure_mode"]}')
-                lines.append(f'  max load: {metrics["max_load"]} N')
-                lines.append(f'  at x: {metrics["critical_x"]} mm')
-
-                text = '\n'.join(lines)
-
-            # update text
-            self.metrics_text.set_text(text)
-            print(f"[update] metrics text updated, redrawing canvas...")
-            self.fig.canvas.draw()
-            print(f"[update] done")
+        return critical_metrics
 
+    def log(self, message, preview=False):
+        """progress of the live metrics jobs, only printed if verbose (and never for drag previews)"""
+        if self.verbose and not preview:
+            print(message)
+
+    def update_metrics_panel(self, num_points=10000, time_budget=None):
+        """
+        recalculate the metrics in the background, the panel shows computing... until the newest result is in
+        num_points, time_budget: passed to calculate_live_metrics, less than the full grid is a preview
+            (previews keep the current text up instead of showing computing...)
+        """
+        self.log(f"[update] updating metrics panel...", time_budget is not None)
+        self.metrics_generation += 1
+        generation = self.metrics_generation
+
+        # an older request that hasn't started yet isn't needed any more
+        if self.metrics_future is not None:
+            self.metrics_future.cancel()
+
+        # the UI keeps editing the design while the worker runs, so it gets its own copy
+        geometry = copy.deepcopy(self.design)
+        self.metrics_future = self.metrics_executor.submit(self.metrics_job, generation, geometry,
+                                                           self.current_loadcase, self.current_mass,
+                                                           num_points, time_budget)
+        self.metrics_preview = num_points < 10000 or time_budget is not None
+
+        if not self.metrics_preview:
+            # ybar / I / area are already known from the section accumulator (the edited cross section)
+            quick = (f'  ybar: {self.section.ybar} mm\n  I: {self.section.I} mm^4\n'
+                     f'  area: {self.section.area} mm^2')
+            if self.segment_index is not None:
+                quick = f'  (segment {self.segment_index})\n' + quick
+            self.metrics_text.set_text('computing...\n' + quick + '\n\n' + self.metrics_display)
+            self.metrics_text.set_color('gray')
+            self.fig.canvas.draw_idle()
+        self.metrics_timer.start()
+
+    def metrics_job(self, generation, geometry, loadcase, mass, num_points=10000, time_budget=None):
+        """runs on the worker thread, returns (generation, metrics, error)"""
+        if generation != self.metrics_generation:
+            # a newer edit came in before this one started
+            return generation, None, None
+        try:
+            metrics = self.calculate_live_metrics(geometry=geometry, loadcase=loadcase, mass=mass,
+                                                  num_points=num_points, time_budget=time_budget)
+            return generation, metrics, None
         except Exception as e:
-            print(f"[update] ERROR: {e}")
-            import traceback
             traceback.print_exc()
-            self.metrics_text.set_text(f'Error calculating metrics:\n{str(e)}')
-            self.fig.canvas.draw()
+            return generation, None, e
+
+    def poll_metrics(self):
+        """timer callback on the GUI thread, shows the newest result once it's ready"""
+        future = self.metrics_future
+        if future is None:
+            self.metrics_timer.stop()
+            return
+        if not future.done():
+            return
+
+        self.metrics_timer.stop()
+        self.metrics_future = None
+        if future.cancelled():
+            return
+
+        generation, metrics, error = future.result()
+        if generation != self.metrics_generation:
+            # during a drag the stale ones are previews too
+            self.log(f"[update] dropping stale metrics (generation {generation})", self.metrics_preview)
+            return
+        self.show_metrics(metrics, error)
+
+    def show_metrics(self, metrics, error=None):
+        """put a finished result in the metrics panel (previews only update the one line summary)"""
+        if self.metrics_preview:
+            self.preview_text.set_text(self.format_preview(metrics, error))
+            self.blit_preview()
+            return
+
+        if error is not None:
+            print(f"[update] ERROR: {error}")
+            self.metrics_display = f'Error calculating metrics:\n{str(error)}'
+        elif not metrics:
+            self.log(f"[update] no metrics to display")
+            self.metrics_display = 'No plates in geometry'
+        else:
+            self.metrics_display = self.format_metrics(metrics)
+
+        # update text
+        self.metrics_text.set_text(self.metrics_display)
+        self.metrics_text.set_color('black')
+        self.log(f"[update] metrics text updated, redrawing canvas...")
+        self.fig.canvas.draw_idle()
+        self.log(f"[update] done")
+
+    def format_preview(self, metrics, error=None):
+        """one line summary of a preview result"""
+        if error is not None:
+            return f'PREVIEW: error {error}'
+        if not metrics:
+            return 'PREVIEW: no plates'
+        return (f'PREVIEW: min FOS {metrics["min_fos"]:.3f} ({metrics["failure_mode"]}) '
+                f'at x = {metrics["critical_x"]:.0f} mm, {metrics["num_stations"]} stations')
+
+    def format_metrics(self, metrics):
+        """metrics dict from calculate_live_metrics as the panel text"""
+        self.log(f"[update] formatting metrics display...")
+        # format the metrics display
+        lines = []
+        lines.append('SECTION PROPERTIES')
+        lines.append(f'  ybar: {metrics["ybar"]} mm')
+        lines.append(f'  I: {metrics["I"]} mm^4')
+        lines.append(f'  area: {metrics["area"]} mm^2')
+        lines.append(f'  y_top: {metrics["y_top"]} mm')
+        lines.append(f'  y_bot: {metrics["y_bot"]} mm')
+        lines.append('')
+
+        lines.append('APPLIED STRESSES (at critical x)')
+        lines.append(f'  tension: {metrics["tension_stress"]} MPa')
+        lines.append(f'  comp: {metrics["compression_stress"]} MPa')
+        lines.append(f'  top comp: {metrics["top_compression_stress"]} MPa')
+        lines.append(f'  shear: {metrics["shear_stress"]} MPa')
+        lines.append(f'  glue: {metrics["glue_stress"]} MPa')
+        lines.append(f'  web comp: {metrics["web_compression_stress"]} MPa')
+        lines.append('')
+
+        lines.append('BUCKLING CASE 1 (top flange inside)')
+        lines.append(f'  t: {metrics["buck1_t"]} mm')
+        lines.append(f'  b: {metrics["buck1_b"]} mm')
+        cap1 = metrics["buck1_capacity"]
+        lines.append(f'  capacity: {cap1} MPa' if cap1 != float('inf') else '  capacity: inf MPa')
+        fos1 = metrics["fos_buck1"]
+        lines.append(f'  FOS: {fos1}' if fos1 != float('inf') else '  FOS: inf')
+        lines.append('')
+
+        lines.append('BUCKLING CASE 2 (top flange overhang)')
+        lines.append(f'  t: {metrics["buck2_t"]} mm')
+        lines.append(f'  b: {metrics["buck2_b"]} mm')
+        cap2 = metrics["buck2_capacity"]
+        lines.append(f'  capacity: {cap2} MPa' if cap2 != float('inf') else '  capacity: inf MPa')
+        fos2 = metrics["fos_buck2"]
+        lines.append(f'  FOS: {fos2}' if fos2 != float('inf') else '  FOS: inf')
+        lines.append('')
+
+        lines.append('BUCKLING CASE 3 (web)')
+        lines.append(f'  t: {metrics["buck3_t"]} mm')
+        lines.append(f'  b: {metrics["buck3_b"]} mm')
+        cap3 = metrics["buck3_capacity"]
+        lines.append(f'  capacity: {cap3} MPa' if cap3 != float('inf') else '  capacity: inf MPa')
+        fos3 = metrics["fos_buck3"]
+        lines.append(f'  FOS: {fos3}' if fos3 != float('inf') else '  FOS: inf')
+        lines.append('')
+
+        lines.append('SHEAR BUCKLING')
+        lines.append(f'  h: {metrics["buckV_h"]} mm')
+        lines.append(f'  t: {metrics["buckV_t"]} mm')
+        lines.append(f'  a: {metrics["buckV_a"]} mm')
+        capV = metrics["buckV_capacity"]
+        lines.append(f'  capacity: {capV} MPa' if capV != float('inf') else '  capacity: inf MPa')
+        fosV = metrics["fos_buckV"]
+        lines.append(f'  FOS: {fosV}' if fosV != float('inf') else '  FOS: inf')
+        lines.append('')
+
+        lines.append('GLUE SHEAR')
+        lines.append(f'  glue width: {metrics["glue_width"]} mm')
+        lines.append(f'  FOS: {metrics["fos_glue"]}')
+        lines.append('')
+
+        lines.append('SUMMARY')
+        lines.append(f'  min FOS: {metrics["min_fos"]}')
+        lines.append(f'  failure: {metrics["failure_mode"]}')
+        lines.append(f'  max load: {metrics["max_load"]} N')
+        lines.append(f'  at x: {metrics["critical_x"]} mm')
+        lines.append(f'  stations: {metrics["num_stations"]}' + ('' if metrics['complete'] else ' (ran out of time)'))
+
+        return '\n'.join(lines)
 
     def run_analysis(self, event):
         """run structural analysis on current cross section"""
@@ -915,11 +1127,13 @@ class InteractiveDesigner:
         mass = 1000  # N
 
         try:
-            results = calculate_failure_loads(self.geometry, loadcase, mass, material_props)
+            results = calculate_failure_loads(self.design, loadcase, mass, material_props)
 
             print(f"\nCross section analysis (loadcase {loadcase}, train mass {mass}N)")
             print(f"Diaphragm spacing: {self.geometry.get('diaphragm_spacing', 150)} mm")
             print(f"Number of plates: {len(self.geometry['plates'])}")
+            if self.segment_index is not None:
+                print(f"(editing segment {self.segment_index}, analysis covers all {len(self.design['segments'])} segments)")
             print()
 
             # find minimum FOS for each failure mode
@@ -971,29 +1185,15 @@ class InteractiveDesigner:
         new_top = new_y + plate['h'] / 2
         new_bottom = new_y - plate['h'] / 2
 
-        for _, other_plate, _ in self.rectangles:
-            if other_plate is plate:
-                continue
-
-            other_left = other_plate['x'] - other_plate['b'] / 2
-            other_right = other_plate['x'] + other_plate['b'] / 2
-            other_top = other_plate['y'] + other_plate['h'] / 2
-            other_bottom = other_plate['y'] - other_plate['h'] / 2
-
-            # check if rectangles overlap (not just touching)
-            # touching edges (distance = 0) is allowed, overlapping (distance < 0) is not
-            x_overlap = (new_left < other_right - 0.01) and (new_right > other_left + 0.01)
-            y_overlap = (new_bottom < other_top - 0.01) and (new_top > other_bottom + 0.01)
-
-            if x_overlap and y_overlap:
-                return True
-
-        return False
+        # touching edges (distance = 0) is allowed, overlapping (distance < 0) is not
+        return self.edge_index.overlaps(new_left, new_right, new_bottom, new_top, exclude=id(plate))
 
     def print_geometry(self):
         """print current geometry as python code"""
         print("\n" + "="*60)
         print("current geometry:")
+        if self.segment_index is not None:
+            print(f"(segment {self.segment_index}, x = {self.segment_range[0]} to {self.segment_range[1]} mm)")
         print("="*60)
         print("plates = [")
         for plate in self.geometry['plates']:
@@ -1010,6 +1210,7 @@ class InteractiveDesigner:
 
     def show(self):
         plt.show()
+        self.metrics_executor.shutdown(wait=False, cancel_futures=True)
         # print geometry when window closes
         self.print_geometry()
 
@@ -1028,9 +1229,13 @@ if __name__ == "__main__":
     print("  - click empty space: deselect")
     print()
 
+    # --verbose prints every live metrics update
+    verbose = '--verbose' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--verbose']
+
     # get design from command line argument or default to design0
-    if len(sys.argv) > 1:
-        design_name = sys.argv[1]
+    if len(args) > 0:
+        design_name = args[0]
         try:
             from src.cross_section_geometry.designs import __dict__ as designs_dict
             if design_name in designs_dict and callable(designs_dict[design_name]):
@@ -1045,10 +1250,17 @@ if __name__ == "__main__":
             geometry = design0()
     else:
         print("no design specified, using design0")
-        print("usage: python interactive_designer.py [design_name]")
+        print("usage: python interactive_designer.py [design_name] [segment] [--verbose]")
         geometry = design0()
 
-    print(f"loaded {len(geometry['plates'])} plates")
-    print(f"loaded {len(geometry.get('glue_joints', []))} glue joints")
-    designer = InteractiveDesigner(geometry)
+    # segmented designs edit one segment at a time (second argument, default the first one)
+    segment = int(args[1]) if len(args) > 1 else 0
+    if not is_prismatic(geometry):
+        ranges = get_segment_ranges(geometry)
+        print(f"segmented design with {len(ranges)} segments: " +
+              ', '.join(f"{i}: x = {a} to {b} mm" for i, (a, b, _) in enumerate(ranges)))
+        print(f"editing segment {segment}")
+    designer = InteractiveDesigner(geometry, segment=segment, verbose=verbose)
+    print(f"loaded {len(designer.geometry['plates'])} plates")
+    print(f"loaded {len(designer.geometry.get('glue_joints', []))} glue joints")
     designer.show()
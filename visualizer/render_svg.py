@@ -1,5 +1,11 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.visualization.edge_index import EdgeIndex
 
 rects = [
     {'x': 0, 'y': 393, 'width': 1016, 'height': 420},
@@ -23,10 +29,18 @@ rects = [
 SVG_HEIGHT = 813
 
 
+def rect_box(rect):
+    """left, right, bottom, top of a rect in screen coordinates"""
+    return (rect['x'], rect['x'] + rect['width'],
+            SVG_HEIGHT - rect['y'] - rect['height'], SVG_HEIGHT - rect['y'])
+
+
 class EditableSVGViewer:
     def __init__(self, rects_list):
         self.rects = [dict(r) for r in rects_list]
         self.snap_threshold = 5.0
+        # sorted rect edges for snapping
+        self.edge_index = EdgeIndex((id(r),) + rect_box(r) for r in self.rects)
 
         self.fig, self.ax = plt.subplots(1, 1, figsize=(16, 11))
         self.rectangles = []
@@ -35,6 +49,10 @@ class EditableSVGViewer:
         self.dragging = False
         self.drag_offset = None
 
+        # blitting while dragging: everything except the dragged patch is cached as the background
+        self.drag_artist = None
+        self.drag_background = None
+
         self.setup_plot()
         self.draw_all_rects()
         self.connect_events()
@@ -139,6 +157,36 @@ class EditableSVGViewer:
         self.fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
         self.fig.canvas.mpl_connect('button_release_event', self.on_release)
         self.fig.canvas.mpl_connect('key_press_event', self.on_key_press)
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def start_blit(self, artist):
+        """start dragging artist: draw everything else once and keep it as the background"""
+        self.drag_artist = artist
+        if not self.fig.canvas.supports_blit:
+            return
+        artist.set_animated(True)
+        self.fig.canvas.draw()
+
+    def on_draw(self, _):
+        # re-cache the background after any full redraw (e.g. resize) during a drag
+        if self.drag_artist is not None and self.drag_artist.get_animated():
+            self.drag_background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+            self.ax.draw_artist(self.drag_artist)
+
+    def blit_drag(self):
+        """redraw only the dragged patch on top of the cached background"""
+        if self.drag_background is None:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self.drag_background)
+        self.ax.draw_artist(self.drag_artist)
+        self.fig.canvas.blit(self.ax.bbox)
+
+    def stop_blit(self):
+        if self.drag_artist is not None:
+            self.drag_artist.set_animated(False)
+        self.drag_artist = None
+        self.drag_background = None
 
     def on_press(self, event):
         if event.inaxes != self.ax:
@@ -153,6 +201,7 @@ class EditableSVGViewer:
                     self.select_rect(patch, rect, index)
                     self.dragging = True
                     self.drag_offset = (event.xdata - rect['x'], event.ydata - (SVG_HEIGHT - rect['y'] - rect['height'] + rect['height']/2))
+                    self.start_blit(patch)
                     return
 
             if not clicked:
@@ -174,7 +223,7 @@ class EditableSVGViewer:
         screen_y_corner = SVG_HEIGHT - rect['y'] - rect['height']
         patch.set_xy((new_x, screen_y_corner))
 
-        self.fig.canvas.draw()
+        self.blit_drag()
 
     def on_release(self, _):
         if not self.dragging:
@@ -182,9 +231,11 @@ class EditableSVGViewer:
 
         self.dragging = False
         self.drag_offset = None
+        self.stop_blit()
 
         patch, rect, _ = self.selected
         self.snap_to_edges(rect)
+        self.edge_index.update(id(rect), *rect_box(rect))
 
         screen_y_corner = SVG_HEIGHT - rect['y'] - rect['height']
         patch.set_xy((rect['x'], screen_y_corner))
@@ -203,42 +254,16 @@ class EditableSVGViewer:
         best_dist_x = self.snap_threshold
         best_dist_y = self.snap_threshold
 
-        for other_rect in self.rects:
-            if other_rect is rect:
-                continue
-
-            other_left = other_rect['x']
-            other_right = other_rect['x'] + other_rect['width']
-            other_top_screen = SVG_HEIGHT - other_rect['y']
-            other_bottom_screen = SVG_HEIGHT - other_rect['y'] - other_rect['height']
-
-            x_pairs = [
-                (left, other_left),
-                (left, other_right),
-                (right, other_left),
-                (right, other_right),
-            ]
-
-            for edge, other_edge in x_pairs:
-                dist = abs(edge - other_edge)
-                if dist < best_dist_x:
-                    offset = other_edge - edge
-                    best_snap_x = rect['x'] + offset
-                    best_dist_x = dist
-
-            y_pairs = [
-                (top_screen, other_top_screen),
-                (top_screen, other_bottom_screen),
-                (bottom_screen, other_top_screen),
-                (bottom_screen, other_bottom_screen),
-            ]
-
-            for edge, other_edge in y_pairs:
-                dist = abs(edge - other_edge)
-                if dist < best_dist_y:
-                    offset = other_edge - edge
-                    best_snap_y = rect['y'] + offset
-                    best_dist_y = dist
+        # the edge index only gives edges within the threshold, nearest first
+        x_candidates = self.edge_index.snap_candidates('x', (left, right), self.snap_threshold, exclude=id(rect))
+        if x_candidates:
+            best_dist_x, offset = x_candidates[0]
+            best_snap_x = rect['x'] + offset
+
+        y_candidates = self.edge_index.snap_candidates('y', (top_screen, bottom_screen), self.snap_threshold, exclude=id(rect))
+        if y_candidates:
+            best_dist_y, offset = y_candidates[0]
+            best_snap_y = rect['y'] + offset
 
         if best_snap_x is not None:
             rect['x'] = best_snap_x
@@ -248,7 +273,8 @@ class EditableSVGViewer:
     def on_key_press(self, event):
         if event.key == 'd' or event.key == 'delete':
             if self.selected_rect is not None:
-                _, _, index = self.selected
+                _, rect, index = self.selected
+                self.edge_index.remove(id(rect))
                 self.rects = [r for i, r in enumerate(self.rects) if i != index]
                 self.selected = None
                 self.selected_rect = None
@@ -257,6 +283,7 @@ class EditableSVGViewer:
         elif event.key == 'n':
             new_rect = {'x': 500, 'y': 400, 'width': 100, 'height': 100}
             self.rects.append(new_rect)
+            self.edge_index.add(id(new_rect), *rect_box(new_rect))
             self.draw_all_rects()
 
     def select_rect(self, patch, rect, index):